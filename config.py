@@ -11,6 +11,15 @@ pokemon_mode = None
 run_count = None
 user_to_challenge = None
 gambit_exe_path = ""
+
+# how the nash_equilibrium bot finds an equilibrium: 'zero_sum' solves the game in-process
+# 'gambit' runs gambit-enummixed from `gambit_exe_path` and picks the equilibrium with the highest payoff
+nash_solver = 'zero_sum'
+
+# the nash_equilibrium bot finds the equilibrium of each battle with a double-oracle search, which only scores the
+# cells of the payoff-matrix that the equilibrium depends on. It then searches every battle instead of falling back to
+# the safest decision when there are many of them
+nash_double_oracle = False
 greeting_message = 'hf'
 battle_ending_message = 'gg'
 room_name = None
@@ -19,6 +28,67 @@ use_relative_weights = False
 damage_calc_type = 'average'
 search_depth = 2
 
+# merge the battles generated for the opponent's possible sets that create the same state, so that it is searched once
+merge_equivalent_battles = True
+
+# combine the outcomes of a turn that reach the same state, e.g. a miss and a hit that does nothing, so that the state
+# is searched once. This compares the hashes of the states they reach, so the search keeps the state's hash up to date
+combine_same_states = True
+
+# the maximum number of payoff-matrices remembered during a single decision
+# this caps the memory used by the transposition table - 0 disables it
+transposition_table_size = 10000
+
+# the maximum number of evaluated states remembered during a single decision - 0 disables it
+# about half of the states evaluated by a search are duplicates, but the StateMutator keeps the evaluation up to date
+# so cheaply that this rarely saves time. It saves more when `batch_evaluation` is used
+evaluation_cache_size = 0
+
+# the maximum number of turns whose generated instructions are remembered during a single decision - 0 disables it
+# iterative deepening and the nested searches that pick a pokemon to switch in generate the same turns again
+transition_cache_size = 10000
+
+# keep each battle's transposition table and move ordering from one decision to the next
+# the state reached after a turn was usually searched by the previous decision, so its results are re-used
+search_carry_over = True
+
+# iterative deepening searches to a depth of 1, then 2, and so on until `search_depth` or the time budget is reached
+# the time budget is a fraction of the time left on the battle's timer, kept between a floor and a ceiling (seconds)
+iterative_deepening = True
+search_time_budget_fraction = 0.5
+search_time_budget_floor = 1
+search_time_budget_ceiling = 20
+
+# order the options searched by killer moves, a history table, and damage so that more of the tree is pruned
+move_ordering = True
+
+# outcomes less likely than this to be reached from the root of the search are evaluated instead of searched
+# e.g. 0.001 stops searching below a 0.1% chance - 0 searches every outcome
+probability_cutoff = 0
+
+# search the states likely to be reached after the bot's move while the opponent is choosing their move
+# the results are kept for the next decision, so this needs `search_carry_over`. Only the safest bot ponders: the
+# other bots search without pruning or without a transposition-table, so they would not re-use the results
+# only the opponent's likeliest options are searched, as predicted by the move ordering
+ponder = False
+ponder_opponent_options = 2
+
+# score the states at the last turn of a search that does not prune (e.g. the nash_equilibrium bot) together with numpy
+# the scores are the same as without it. This needs numpy, which is in requirements-docker.txt
+batch_evaluation = False
+
+# search the battles made for each of the opponent's possible sets together when they are not pruned
+# (e.g. by the nash_equilibrium bot). The instructions for a turn are generated once for all of the battles
+# unless they depend on the part of the opponent's set that is different. The scores are the same as without it
+multi_world_search = True
+
+# the number of worker processes used to search the battles generated for a decision at the same time
+# 0 or 1 searches them one after another in the bot's process
+search_processes = 1
+
+# the most iterations the mcts bot will run for a decision. It also stops when the search time budget runs out
+mcts_max_iterations = 20000
+
 save_replay = False
 
 
@@ -29,7 +29,27 @@ def parse_configs():
     config.save_replay = env.bool("SAVE_REPLAY", config.save_replay)
     config.use_relative_weights = env.bool("USE_RELATIVE_WEIGHTS", config.use_relative_weights)
     config.gambit_exe_path = env("GAMBIT_PATH", config.gambit_exe_path)
+    config.nash_solver = env("NASH_SOLVER", config.nash_solver)
+    config.nash_double_oracle = env.bool("NASH_DOUBLE_ORACLE", config.nash_double_oracle)
     config.search_depth = int(env("MAX_SEARCH_DEPTH", config.search_depth))
+    config.merge_equivalent_battles = env.bool("MERGE_EQUIVALENT_BATTLES", config.merge_equivalent_battles)
+    config.combine_same_states = env.bool("COMBINE_SAME_STATES", config.combine_same_states)
+    config.transposition_table_size = int(env("TRANSPOSITION_TABLE_SIZE", config.transposition_table_size))
+    config.evaluation_cache_size = int(env("EVALUATION_CACHE_SIZE", config.evaluation_cache_size))
+    config.transition_cache_size = int(env("TRANSITION_CACHE_SIZE", config.transition_cache_size))
+    config.search_carry_over = env.bool("SEARCH_CARRY_OVER", config.search_carry_over)
+    config.ponder = env.bool("PONDER", config.ponder)
+    config.ponder_opponent_options = int(env("PONDER_OPPONENT_OPTIONS", config.ponder_opponent_options))
+    config.iterative_deepening = env.bool("ITERATIVE_DEEPENING", config.iterative_deepening)
+    config.search_time_budget_fraction = float(env("SEARCH_TIME_BUDGET_FRACTION", config.search_time_budget_fraction))
+    config.search_time_budget_floor = float(env("SEARCH_TIME_BUDGET_FLOOR", config.search_time_budget_floor))
+    config.search_time_budget_ceiling = float(env("SEARCH_TIME_BUDGET_CEILING", config.search_time_budget_ceiling))
+    config.move_ordering = env.bool("MOVE_ORDERING", config.move_ordering)
+    config.probability_cutoff = float(env("PROBABILITY_CUTOFF", config.probability_cutoff))
+    config.multi_world_search = env.bool("MULTI_WORLD_SEARCH", config.multi_world_search)
+    config.batch_evaluation = env.bool("BATCH_EVALUATION", config.batch_evaluation)
+    config.search_processes = int(env("SEARCH_PROCESSES", config.search_processes))
+    config.mcts_max_iterations = int(env("MCTS_MAX_ITERATIONS", config.mcts_max_iterations))
     config.greeting_message = env("GREETING_MESSAGE", config.greeting_message)
     config.battle_ending_message = env("BATTLE_OVER_MESSAGE", config.battle_ending_message)
     config.websocket_uri = env("WEBSOCKET_URI", "sim.smogon.com:8000")
@@ -28,6 +28,7 @@ from data.helpers import get_most_likely_spread
 from data.helpers import get_all_possible_moves_for_random_battle
 
 from showdown.engine.objects import State
+from showdown.engine.search_cache import SearchCarryOver
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon as TransposePokemon
 
@@ -41,12 +42,40 @@ from showdown.engine.helpers import calculate_stats
 logger = logging.getLogger(__name__)
 
 
+def merge_equivalent_battles(battles):
+    """
+    Merges the battles that would be searched the same way: those whose states have the same equivalence-key
+    and that have the same options for each side. e.g. spreads that give the same stats, or items and abilities
+    that are only different after being converted to the engine's state
+
+    :return: the first battle of each group of equivalent battles, in the order they were given in.
+             Its set_weight is the total set_weight of the group
+    """
+    merged_battles = dict()
+    for b in battles:
+        user_options, opponent_options = b.get_all_options()
+        key = b.create_state().equivalence_key(), tuple(user_options), tuple(opponent_options)
+        if key in merged_battles:
+            merged_battles[key].set_weight += b.set_weight
+        else:
+            merged_battles[key] = b
+
+    if len(merged_battles) < len(battles):
+        logger.debug("Merged {} equivalent battles into {}".format(len(battles), len(merged_battles)))
+
+    return list(merged_battles.values())
+
+
 LastUsedMove = namedtuple('LastUsedMove', ['pokemon_name', 'move', 'turn'])
 DamageDealt = namedtuple('DamageDealt', ['attacker', 'defender', 'move', 'percent_damage', 'crit'])
 
 
 class Battle(ABC):
 
+    # whether the bot's decisions re-use the payoff-matrices searched by `ponder`. Pondering prunes its searches and the
+    # transposition-table keeps a payoff-matrix by whether it was pruned, so only a bot whose search prunes re-uses them
+    can_ponder = False
+
     def __init__(self, battle_tag):
         self.battle_tag = battle_tag
         self.user = Battler()
@@ -69,6 +98,18 @@ class Battle(ABC):
 
         self.request_json = None
 
+        # the option picked by the most recent decision, before it was formatted for Pokemon-Showdown
+        self.decision = None
+
+        # the number of the opponent's possible sets that this battle stands for, see `merge_equivalent_battles`
+        self.set_weight = 1
+
+        # the SearchStats for the most recent decision made by `find_best_move`, if the bot keeps them
+        self.search_stats = None
+
+        # what the searches for one decision leave for the next one
+        self.search_carry_over = SearchCarryOver(config.transposition_table_size, config.move_ordering) if config.search_carry_over else None
+
     def initialize_team_preview(self, user_json, opponent_pokemon):
         self.user.from_json(user_json, first_turn=True)
         self.user.reserve.insert(0, self.user.active)
@@ -167,7 +208,12 @@ class Battle(ABC):
 
             new_battle.opponent.lock_moves()
 
-        return battles if battles else [battle_copy]
+        if not battles:
+            return [battle_copy]
+
+        if config.merge_equivalent_battles:
+            battles = merge_equivalent_battles(battles)
+        return battles
 
     def create_state(self):
         user_active = TransposePokemon.from_state_pokemon_dict(self.user.active.to_dict())
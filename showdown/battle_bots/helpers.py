@@ -1,5 +1,27 @@
+import time
+import logging
+from copy import deepcopy
+
+import config
 import constants
 
+from showdown.engine.objects import StateMutator
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_payoff_matrices
+from showdown.engine.select_best_move import get_payoff_matrices_iterative_deepening
+from showdown.engine.select_best_move import ProbabilityCutoff
+from showdown.engine.select_best_move import SEARCH_PHASE
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.search_executor import get_search_executor
+from showdown.engine.multi_world_search import get_multi_world_payoff_matrices
+from showdown.engine.search_cache import TranspositionTable
+from showdown.engine.search_cache import EvaluationCache
+from showdown.engine.search_cache import TransitionCache
+from showdown.engine.move_ordering import MoveOrderer
+
+logger = logging.getLogger(__name__)
+
 
 def format_decision(battle, decision):
     # Formats a decision for communication with Pokemon-Showdown
@@ -28,4 +50,133 @@ def format_decision(battle, decision):
         if battle.user.active.get_move(decision).can_z:
             message = "{} {}".format(message, constants.ZMOVE)
 
+    battle.decision = decision
     return [message, str(battle.rqid)]
+
+
+def get_search_time_budget(battle):
+    # the number of seconds a decision may spend searching
+    # this is a fraction of the time left on the battle's timer, kept within the configured floor and ceiling
+    if battle.time_remaining is None:
+        return config.search_time_budget_ceiling
+
+    time_budget = battle.time_remaining * config.search_time_budget_fraction
+    return min(config.search_time_budget_ceiling, max(config.search_time_budget_floor, time_budget))
+
+
+def search_battles(battles, prune, time_budget=None, search_stats=None, carry_over=None, search_function=None):
+    # returns a payoff-matrix for each of the battles
+    # with a time_budget the battles are searched as deep as time allows, up to the configured search depth
+    # the battles are searched in parallel when there is a SearchExecutor
+    # otherwise battles that are not pruned are searched together when `multi_world_search` is on
+    # a search_function with the same signature as `get_payoff_matrices` can be given to search them instead
+    # the work done by the search is added to the search_stats, if given
+    # the transposition-table and move ordering are taken from the carry_over, if given, and kept for the next decision
+    start_time = time.time()
+    executor = get_search_executor()
+    if carry_over is not None:
+        transposition_table, move_orderer = carry_over.start_search()
+    else:
+        transposition_table = TranspositionTable(config.transposition_table_size) if config.transposition_table_size else None
+        move_orderer = MoveOrderer() if config.move_ordering else None
+    probability_cutoff = ProbabilityCutoff(config.probability_cutoff) if config.probability_cutoff else None
+    evaluation_cache = EvaluationCache(config.evaluation_cache_size) if config.evaluation_cache_size else None
+    transition_cache = TransitionCache(config.transition_cache_size) if config.transition_cache_size else None
+
+    searches = list()
+    for b in battles:
+        state = b.create_state()
+        user_options, opponent_options = b.get_all_options()
+        logger.debug("Searching through the state: {}".format(state))
+        searches.append((state, user_options, opponent_options))
+
+    if search_function is None:
+        if executor is not None:
+            search_function = executor.get_payoff_matrices
+        elif not prune and config.multi_world_search:
+            search_function = get_multi_world_payoff_matrices
+        else:
+            search_function = get_payoff_matrices
+
+    if time_budget is None:
+        payoff_matrices = search_function(searches, config.search_depth, prune=prune, transposition_table=transposition_table, move_orderer=move_orderer, probability_cutoff=probability_cutoff, search_stats=search_stats, evaluation_cache=evaluation_cache, transition_cache=transition_cache)
+    else:
+        payoff_matrices, depth = get_payoff_matrices_iterative_deepening(searches, time_budget, config.search_depth, prune=prune, transposition_table=transposition_table, move_orderer=move_orderer, probability_cutoff=probability_cutoff, search_stats=search_stats, evaluation_cache=evaluation_cache, transition_cache=transition_cache, search_function=search_function)
+        logger.debug("Searched to a depth of {} with a time budget of {}s".format(depth, round(time_budget, 2)))
+
+    if transposition_table is not None:
+        logger.debug("Transposition table: {}".format(transposition_table))
+    if evaluation_cache is not None:
+        logger.debug("Evaluation cache: {}".format(evaluation_cache))
+    if transition_cache is not None:
+        logger.debug("Transition cache: {}".format(transition_cache))
+    if move_orderer is not None and prune:
+        logger.debug("Move ordering: {}".format(move_orderer))
+    if probability_cutoff is not None:
+        logger.debug("Probability cutoff: {}".format(probability_cutoff))
+    if search_stats is not None:
+        search_stats.record_phase(SEARCH_PHASE, time.time() - start_time)
+
+    return payoff_matrices
+
+
+def get_likely_next_states(battles, user_move, move_orderer=None):
+    # returns the states reached by using user_move against the opponent's likeliest options, most likely first
+    # the opponent's options are predicted by the move_orderer, which knows what they have answered with before
+    next_states = list()
+    total_set_weight = sum(b.set_weight for b in battles)
+    for b in battles:
+        mutator = StateMutator(b.create_state())
+        user_options, opponent_options = b.get_all_options()
+        if user_move not in user_options:
+            continue
+
+        if move_orderer is not None:
+            opponent_options = move_orderer.order_opponent_options(mutator, opponent_options, config.search_depth)
+
+        for opponent_move in opponent_options[:config.ponder_opponent_options]:
+            for instructions in get_all_state_instructions(mutator, user_move, opponent_move):
+                mutator.apply(instructions.instructions)
+                next_states.append((instructions.percentage * b.set_weight / total_set_weight, deepcopy(mutator.state)))
+                mutator.reverse(instructions.instructions)
+
+    return [state for _, state in sorted(next_states, key=lambda x: x[0], reverse=True)]
+
+
+def ponder(battle, user_move, deadline):
+    """
+    Searches the states that are likely to be reached after the user's move, until the deadline expires or is cancelled
+    This is run while the opponent is choosing their move. The payoff-matrices are kept in the battle's
+    SearchCarryOver, where the next decision finds them by the state's hash
+
+    :return: the number of states searched at each depth
+    """
+    carry_over = battle.search_carry_over
+    if not battle.can_ponder or carry_over is None or carry_over.transposition_table is None:
+        return dict()
+
+    probability_cutoff = ProbabilityCutoff(config.probability_cutoff) if config.probability_cutoff else None
+    transition_cache = TransitionCache(config.transition_cache_size) if config.transition_cache_size else None
+    battles = battle.prepare_battles(join_moves_together=True)
+    next_states = get_likely_next_states(battles, user_move, carry_over.move_orderer)
+
+    states_searched = dict()
+    try:
+        for depth in range(1, config.search_depth + 1):
+            for state in next_states:
+                user_options, opponent_options = state.get_all_options()
+                get_payoff_matrix(
+                    StateMutator(state, transition_cache),
+                    user_options,
+                    opponent_options,
+                    depth=depth,
+                    transposition_table=carry_over.transposition_table,
+                    deadline=deadline,
+                    move_orderer=carry_over.move_orderer,
+                    probability_cutoff=probability_cutoff
+                )
+                states_searched[depth] = states_searched.get(depth, 0) + 1
+    except SearchTimeout:
+        pass
+
+    return states_searched
@@ -0,0 +1,236 @@
+import math
+import time
+import random
+from collections import defaultdict
+
+import constants
+import config
+from showdown.battle import Battle
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import evaluate_state
+from showdown.engine.select_best_move import get_state_instructions
+from showdown.engine.select_best_move import SearchDeadline
+from showdown.engine.select_best_move import SearchStats
+from showdown.engine.select_best_move import PREPARE_BATTLES_PHASE
+from showdown.engine.select_best_move import SEARCH_PHASE
+from showdown.engine.search_cache import TransitionCache
+
+from ..helpers import format_decision
+from ..helpers import get_search_time_budget
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+EXPLORATION_CONSTANT = math.sqrt(2)
+
+# the score from `evaluate` that is worth ~73% of a win
+EVALUATION_SCALE = 250
+
+
+def normalize_score(score):
+    # squashes a score from `evaluate` into (0, 1) so that it can be averaged with wins and losses
+    return 1 / (1 + math.exp(-score / EVALUATION_SCALE))
+
+
+def create_leaf(mutator, search_stats=None):
+    # Returns:
+    #   the value of a state that was just reached
+    #   what is stored in the tree for that state: an MCTSNode, or the value if the state is not searched any further
+
+    state = mutator.state
+    winner = state.battle_is_finished()
+    if winner:
+        value = 1 if winner == 1 else 0
+        return value, value
+
+    user_options, opponent_options = state.get_all_options()
+    value = normalize_score(evaluate_state(mutator, search_stats))
+
+    # the opponent's pokemon has fainted but they have reserves that have not been seen
+    # the state cannot be searched further because it is not known what they will switch into
+    if opponent_options == [constants.DO_NOTHING_MOVE] and state.opponent.active.hp == 0:
+        return value, value
+
+    return value, MCTSNode(user_options, opponent_options)
+
+
+def select_option(statistics, parent_visits, maximize):
+    # UCB1 - options that have not been tried are picked first
+    log_parent_visits = math.log(parent_visits) if parent_visits else 0
+
+    best_option = None
+    best_ucb = float('-inf')
+    for option, (visits, total) in statistics.items():
+        if not visits:
+            return option
+
+        mean = total / visits
+        if not maximize:
+            mean = 1 - mean
+
+        ucb = mean + EXPLORATION_CONSTANT * math.sqrt(log_parent_visits / visits)
+        if ucb > best_ucb:
+            best_option = option
+            best_ucb = ucb
+
+    return best_option
+
+
+def sample_transition(transitions):
+    # picks one of the outcomes of a turn using the chance of that outcome happening
+    r = random.random()
+    cumulative_percentage = 0
+    for i, transition in enumerate(transitions):
+        cumulative_percentage += transition.percentage
+        if r < cumulative_percentage:
+            return i
+
+    return len(transitions) - 1
+
+
+class MCTSNode:
+    """A state in the search-tree
+    The moves are simultaneous so each side picks its option using only its own statistics (decoupled UCT).
+    The values are from the bot's point of view: the bot maximizes them and the opponent minimizes them"""
+
+    __slots__ = ('user_statistics', 'opponent_statistics', 'visits', 'transitions', 'children')
+
+    def __init__(self, user_options, opponent_options):
+        self.user_statistics = {option: [0, 0] for option in user_options}
+        self.opponent_statistics = {option: [0, 0] for option in opponent_options}
+        self.visits = 0
+
+        # (user_option, opponent_option) -> the list of TransposeInstructions for that turn
+        self.transitions = dict()
+
+        # (user_option, opponent_option, transition index) -> an MCTSNode, or the value of a terminal state
+        self.children = dict()
+
+    def select_options(self):
+        return (
+            select_option(self.user_statistics, self.visits, maximize=True),
+            select_option(self.opponent_statistics, self.visits, maximize=False)
+        )
+
+    def update(self, user_option, opponent_option, value):
+        self.visits += 1
+        self.user_statistics[user_option][0] += 1
+        self.user_statistics[user_option][1] += value
+        self.opponent_statistics[opponent_option][0] += 1
+        self.opponent_statistics[opponent_option][1] += value
+
+
+def run_iteration(mutator, root, search_stats=None):
+    """Walks down the tree from the root, adds one node, and updates the nodes on the path with that node's value
+    The mutator's state is the same afterwards as it was before"""
+    node = root
+    path = list()
+    applied_instructions = list()
+    while True:
+        user_option, opponent_option = node.select_options()
+        path.append((node, user_option, opponent_option))
+
+        try:
+            transitions = node.transitions[(user_option, opponent_option)]
+        except KeyError:
+            transitions = get_state_instructions(mutator, user_option, opponent_option, search_stats)
+            node.transitions[(user_option, opponent_option)] = transitions
+
+        transition_index = sample_transition(transitions)
+        instructions = transitions[transition_index].instructions
+        mutator.apply(instructions)
+        applied_instructions.append(instructions)
+
+        child_key = (user_option, opponent_option, transition_index)
+        child = node.children.get(child_key)
+        if child is None:
+            value, node.children[child_key] = create_leaf(mutator, search_stats)
+            break
+
+        elif isinstance(child, MCTSNode):
+            node = child
+
+        else:
+            value = child
+            break
+
+    for instructions in reversed(applied_instructions):
+        mutator.reverse(instructions)
+
+    for node, user_option, opponent_option in path:
+        node.update(user_option, opponent_option, value)
+
+
+def pick_search(iterations_per_search, set_weights):
+    # the search that is furthest behind its share of the iterations, so that each gets a share proportional to its weight
+    return min(range(len(set_weights)), key=lambda i: iterations_per_search[i] / set_weights[i])
+
+
+def search_battles(battles, time_budget, max_iterations, search_stats=None):
+    """
+    Builds a search-tree for each of the battles until the time budget or the number of iterations runs out
+    Each battle gets a share of the iterations proportional to its set_weight, so that each possible set for the
+    opponent is given the same weight when the battles that create the same state have been merged into one
+    The work done by the search is added to the search_stats, if given
+
+    :return: the root MCTSNode for each of the battles
+    """
+    transition_cache = TransitionCache(config.transition_cache_size) if config.transition_cache_size else None
+    searches = list()
+    for b in battles:
+        state = b.create_state()
+        user_options, opponent_options = b.get_all_options()
+        searches.append((StateMutator(state, transition_cache), MCTSNode(user_options, opponent_options)))
+
+    set_weights = [b.set_weight for b in battles]
+    iterations_per_search = [0] * len(searches)
+
+    start_time = time.time()
+    deadline = SearchDeadline(time_budget)
+    iterations = 0
+    while iterations < max_iterations and not deadline.expired():
+        i = pick_search(iterations_per_search, set_weights)
+        mutator, root = searches[i]
+        run_iteration(mutator, root, search_stats)
+        iterations_per_search[i] += 1
+        iterations += 1
+
+    if search_stats is not None:
+        for mutator, _ in searches:
+            search_stats.record_mutator(mutator)
+        search_stats.record_phase(SEARCH_PHASE, time.time() - start_time)
+
+    logger.debug("Ran {} iterations of MCTS over {} battles".format(iterations, len(battles)))
+    if transition_cache is not None:
+        logger.debug("Transition cache: {}".format(transition_cache))
+    return [root for _, root in searches]
+
+
+def pick_most_visited_option(roots):
+    visits = defaultdict(int)
+    values = defaultdict(int)
+    for root in roots:
+        for option, (option_visits, option_total) in root.user_statistics.items():
+            visits[option] += option_visits
+            values[option] += option_total
+
+    for option in visits:
+        logger.debug("{}: visits={}, value={}".format(option, visits[option], round(values[option] / max(visits[option], 1), 3)))
+
+    return max(visits, key=lambda x: visits[x])
+
+
+class BattleBot(Battle):
+    def __init__(self, *args, **kwargs):
+        super(BattleBot, self).__init__(*args, **kwargs)
+
+    def find_best_move(self):
+        self.search_stats = SearchStats()
+        start_time = time.time()
+        battles = self.prepare_battles()
+        self.search_stats.record_phase(PREPARE_BATTLES_PHASE, time.time() - start_time)
+
+        roots = search_battles(battles, get_search_time_budget(self), config.mcts_max_iterations, self.search_stats)
+        choice = pick_most_visited_option(roots)
+        return format_decision(self, choice)
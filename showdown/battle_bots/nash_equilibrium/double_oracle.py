@@ -0,0 +1,184 @@
+from copy import deepcopy
+
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_terminal_payoff_matrix
+from showdown.engine.select_best_move import get_move_pair_score
+from showdown.engine.select_best_move import SearchTimeout
+
+from .zero_sum import solve_zero_sum_game
+
+
+# a best response must beat the value of the restricted game by more than this to be added to it
+TOLERANCE = 1e-6
+
+
+class DoubleOracle:
+    """Finds an equilibrium of the payoff-matrix of a state without scoring every cell of it
+
+    The search starts from a restricted game of the first option of each side. Each round solves the restricted game,
+    then finds each side's best response to the other side's strategy in it. A best response only needs the cells in
+    the columns (or rows) that the other side plays, so the cells of the options that are never played are not scored.
+    The best responses that do better than the restricted game are added to it, and this repeats until neither side
+    can do better. The equilibrium of the restricted game is then an equilibrium of the full game"""
+
+    def __init__(self, mutator, user_options, opponent_options, depth, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None):
+        self.mutator = mutator
+        self.user_options = user_options
+        self.opponent_options = opponent_options
+        self.depth = depth
+        self.transposition_table = transposition_table
+        self.deadline = deadline
+        self.move_orderer = move_orderer
+        self.probability_cutoff = probability_cutoff
+        self.search_stats = search_stats
+        self.evaluation_cache = evaluation_cache
+
+        # (user_move, opponent_move) -> the score of each cell that has been searched
+        self.scores = dict()
+
+    def get_score(self, user_move, opponent_move):
+        try:
+            return self.scores[(user_move, opponent_move)]
+        except KeyError:
+            pass
+
+        score = get_move_pair_score(
+            self.mutator,
+            user_move,
+            opponent_move,
+            self.depth - 1,
+            prune=False,
+            transposition_table=self.transposition_table,
+            deadline=self.deadline,
+            move_orderer=self.move_orderer,
+            probability_cutoff=self.probability_cutoff,
+            search_stats=self.search_stats,
+            evaluation_cache=self.evaluation_cache
+        )
+        self.scores[(user_move, opponent_move)] = score
+        return score
+
+    def get_best_user_response(self, opponent_strategy):
+        # returns the user's option scoring the most against the opponent's strategy, and what it scores
+        best_move, best_score = None, float('-inf')
+        for user_move in self.user_options:
+            score = sum(probability * self.get_score(user_move, opponent_move) for opponent_move, probability in opponent_strategy)
+            if score > best_score:
+                best_move, best_score = user_move, score
+        return best_move, best_score
+
+    def get_best_opponent_response(self, user_strategy):
+        # returns the opponent's option scoring the least against the user's strategy, and what it scores
+        best_move, best_score = None, float('inf')
+        for opponent_move in self.opponent_options:
+            score = sum(probability * self.get_score(user_move, opponent_move) for user_move, probability in user_strategy)
+            if score < best_score:
+                best_move, best_score = opponent_move, score
+        return best_move, best_score
+
+    def search(self):
+        """
+        :return: the payoff-matrix of the restricted game that the search finished with
+        """
+        user_moves = [self.user_options[0]]
+        opponent_moves = [self.opponent_options[0]]
+        while True:
+            matrix = [[self.get_score(u, o) for o in opponent_moves] for u in user_moves]
+            user_strategy, opponent_strategy, value = solve_zero_sum_game(matrix)
+
+            # only the options that are played are needed to find the best responses
+            user_strategy = [(u, p) for u, p in zip(user_moves, user_strategy) if p > 0]
+            opponent_strategy = [(o, p) for o, p in zip(opponent_moves, opponent_strategy) if p > 0]
+
+            best_user_move, best_user_score = self.get_best_user_response(opponent_strategy)
+            best_opponent_move, best_opponent_score = self.get_best_opponent_response(user_strategy)
+
+            tolerance = TOLERANCE * max(1, abs(value))
+            expanded = False
+            if best_user_score > value + tolerance and best_user_move not in user_moves:
+                user_moves.append(best_user_move)
+                expanded = True
+            if best_opponent_score < value - tolerance and best_opponent_move not in opponent_moves:
+                opponent_moves.append(best_opponent_move)
+                expanded = True
+
+            if not expanded:
+                break
+
+        if self.search_stats is not None:
+            self.search_stats.unsearched_cells += len(self.user_options) * len(self.opponent_options) - len(self.scores)
+
+        # the options are kept in their original order so that ties are broken the same way as the full payoff-matrix
+        return {
+            (u, o): self.get_score(u, o)
+            for u in self.user_options if u in user_moves
+            for o in self.opponent_options if o in opponent_moves
+        }
+
+
+def get_double_oracle_payoff_matrix(mutator, user_options, opponent_options, depth, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None):
+    """
+    Searches the state with a DoubleOracle instead of scoring every cell of its payoff-matrix
+    Every cell of the payoff-matrix returned is scored the same as it would be by `get_payoff_matrix` without pruning,
+    but only the rows and columns of the restricted game are included. Its equilibria have the same value as the
+    full payoff-matrix's, with the options that are left out played with a probability of 0
+
+    :return: a dictionary representing the potential move combinations of the restricted game and their associated scores
+    """
+    if deadline is not None and deadline.expired():
+        raise SearchTimeout()
+
+    if search_stats is not None:
+        search_stats.nodes_per_depth[depth] += 1
+
+    terminal_scores = get_terminal_payoff_matrix(mutator, user_options, opponent_options, depth, search_stats, evaluation_cache)
+    if terminal_scores is not None:
+        return terminal_scores
+
+    return DoubleOracle(
+        mutator,
+        user_options,
+        opponent_options,
+        depth,
+        transposition_table=transposition_table,
+        deadline=deadline,
+        move_orderer=move_orderer,
+        probability_cutoff=probability_cutoff,
+        search_stats=search_stats,
+        evaluation_cache=evaluation_cache
+    ).search()
+
+
+def get_double_oracle_payoff_matrices(searches, depth, prune=False, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None, transition_cache=None):
+    """
+    Has the same signature as `get_payoff_matrices`, searching each of the states with `get_double_oracle_payoff_matrix`
+    A double-oracle search needs the exact score of every cell it looks at, so it cannot be pruned
+    """
+    if prune:
+        raise ValueError("A double-oracle search cannot be pruned")
+
+    payoff_matrices = list()
+    for state, user_options, opponent_options in searches:
+        # a search leaves the state modified when it times-out so a copy is searched when there is a deadline
+        if deadline is not None:
+            state = deepcopy(state)
+        mutator = StateMutator(state, transition_cache)
+        try:
+            payoff_matrices.append(
+                get_double_oracle_payoff_matrix(
+                    mutator,
+                    user_options,
+                    opponent_options,
+                    depth,
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    move_orderer=move_orderer,
+                    probability_cutoff=probability_cutoff,
+                    search_stats=search_stats,
+                    evaluation_cache=evaluation_cache
+                )
+            )
+        finally:
+            if search_stats is not None:
+                search_stats.record_mutator(mutator)
+    return payoff_matrices
@@ -1,3 +1,4 @@
+import time
 import random
 import subprocess
 import logging
@@ -10,17 +11,25 @@ from nashpy import Game
 import config
 from showdown.battle import Battle
 from showdown.engine.select_best_move import remove_guaranteed_opponent_moves
-from showdown.engine.objects import StateMutator
 from showdown.engine.select_best_move import pick_safest
-from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import SearchStats
+from showdown.engine.select_best_move import PREPARE_BATTLES_PHASE
 
+from .zero_sum import solve_zero_sum_game
+from .double_oracle import get_double_oracle_payoff_matrices
 from ..safest.main import pick_safest_move_from_battles
 from ..helpers import format_decision
+from ..helpers import get_search_time_budget
+from ..helpers import search_battles
 
 
 logger = logging.getLogger(__name__)
 
 
+# the values of `config.nash_solver`
+ZERO_SUM_SOLVER = 'zero_sum'
+GAMBIT_SOLVER = 'gambit'
+
 NFG_FORMAT_BASE = """NFG 1 R ""
 { "Player 1" "Player 2" } { %s %s }
 
@@ -102,17 +111,24 @@ def find_all_equilibria(matrix):
     return np.array(equilibria)
 
 
-def find_nash_equilibrium(score_lookup):
-    modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup)
+def find_nash_equilibrium(score_lookup, remove_guaranteed_moves=True):
+    # the opponent's moves are only removed from a full payoff-matrix. In the restricted game of a double-oracle search
+    # a move can look guaranteed only because the rows that would give the bot a choice against it were not scored
+    modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup) if remove_guaranteed_moves else score_lookup
     if not modified_score_lookup:
         modified_score_lookup = score_lookup
 
     df = pd.Series(modified_score_lookup).unstack()
 
-    equilibria = find_all_equilibria(df)
-    best_eq, score = find_best_nash_equilibrium(equilibria, df)
-    bot_percentages = best_eq[0]
-    opponent_percentages = best_eq[1]
+    if config.nash_solver == GAMBIT_SOLVER:
+        equilibria = find_all_equilibria(df)
+        best_eq, score = find_best_nash_equilibrium(equilibria, df)
+        bot_percentages = best_eq[0]
+        opponent_percentages = best_eq[1]
+    else:
+        if not np.isfinite(df.values).all():
+            raise CouldNotFindEquilibriumError("The score lookup is missing scores: {}".format(modified_score_lookup))
+        bot_percentages, opponent_percentages, score = solve_zero_sum_game(df.values)
 
     bot_choices = df.index
     opponent_choices = df.columns
@@ -132,26 +148,30 @@ def log_nash_equilibria(bot_choices, opponent_choices, bot_percentages, opponent
             opponent_options.append((opponent_choices[i], percentage))
 
 
-def get_weighted_choices_from_multiple_score_lookups(score_lookups):
+def get_weighted_choices_from_multiple_score_lookups(score_lookups, weights=None, remove_guaranteed_moves=True):
+    # each score_lookup counts for its weight, which is the number of the opponent's sets it stands for
+    if weights is None:
+        weights = [1] * len(score_lookups)
+
     bot_choice_percentages = defaultdict(lambda: 0)
-    number_of_score_lookups = len(score_lookups)
-    for sl in score_lookups:
-        eq = find_nash_equilibrium(sl)
+    total_weight = sum(weights)
+    for sl, weight in zip(score_lookups, weights):
+        eq = find_nash_equilibrium(sl, remove_guaranteed_moves)
         log_nash_equilibria(*eq)
         for i, bot_choice in enumerate(eq[0]):
-            bot_choice_percentages[bot_choice] += eq[2][i]/number_of_score_lookups
+            bot_choice_percentages[bot_choice] += eq[2][i] * weight / total_weight
 
     return list(bot_choice_percentages.items())
 
 
-def pick_move_in_equilibrium_from_multiple_score_lookups(score_lookups):
+def pick_move_in_equilibrium_from_multiple_score_lookups(score_lookups, weights=None, remove_guaranteed_moves=True):
     # This is the WRONG way to find a Nash Equilibrium from different potential games
     # ... but it is a simple way that works (with crappy results)
     #
     # The games should be modelled properly based on incomplete information (see Harsanyi Transform),
     # however that would require the bot to keep track of what it has revealed to the opponent
     try:
-        weighted_choices = get_weighted_choices_from_multiple_score_lookups(score_lookups)
+        weighted_choices = get_weighted_choices_from_multiple_score_lookups(score_lookups, weights, remove_guaranteed_moves)
     except CouldNotFindEquilibriumError as e:
         logger.warning("Problem finding equilibria: {}".format(e))
         return random.choice([pick_safest(sl)[0][0] for sl in score_lookups])
@@ -173,21 +193,20 @@ class BattleBot(Battle):
         super(BattleBot, self).__init__(*args, **kwargs)
 
     def find_best_move(self):
+        self.search_stats = SearchStats()
+        time_budget = get_search_time_budget(self) if config.iterative_deepening else None
+
+        start_time = time.time()
         battles = self.prepare_battles()
-        if len(battles) > 7:
+        if len(battles) > 7 and not config.nash_double_oracle:
             logger.debug("Not enough is known about the opponent's active pokemon - falling back to safest decision making")
             battles = self.prepare_battles(join_moves_together=True)
-            decision = pick_safest_move_from_battles(battles)
+            self.search_stats.record_phase(PREPARE_BATTLES_PHASE, time.time() - start_time)
+            decision = pick_safest_move_from_battles(battles, time_budget=time_budget, search_stats=self.search_stats, carry_over=self.search_carry_over)
         else:
-            list_of_payoffs = list()
-            for b in battles:
-                state = b.create_state()
-                mutator = StateMutator(state)
-                logger.debug("Attempting to find best move from: {}".format(mutator.state))
-                user_options, opponent_options = b.get_all_options()
-                scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=False)
-                list_of_payoffs.append(scores)
-
-            decision = pick_move_in_equilibrium_from_multiple_score_lookups(list_of_payoffs)
+            self.search_stats.record_phase(PREPARE_BATTLES_PHASE, time.time() - start_time)
+            search_function = get_double_oracle_payoff_matrices if config.nash_double_oracle else None
+            list_of_payoffs = search_battles(battles, prune=False, time_budget=time_budget, search_stats=self.search_stats, carry_over=self.search_carry_over, search_function=search_function)
+            decision = pick_move_in_equilibrium_from_multiple_score_lookups(list_of_payoffs, [b.set_weight for b in battles], remove_guaranteed_moves=not config.nash_double_oracle)
 
         return format_decision(self, decision)
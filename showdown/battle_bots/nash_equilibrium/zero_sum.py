@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# values closer to 0 than this are treated as 0 when choosing a pivot
+EPSILON = 1e-9
+
+
+def pivot(tableau, row, column):
+    # eliminates the column from every row other than the pivot's row
+    pivot_row = tableau[row] / tableau[row, column]
+    tableau -= np.outer(tableau[:, column], pivot_row)
+    tableau[row] = pivot_row
+
+
+def solve_zero_sum_game(matrix):
+    """
+    Finds a maximin strategy for each player of a two-player zero-sum game with the simplex method
+    Every equilibrium of a zero-sum game has the same value, so these strategies are as good as any other equilibrium
+
+    The matrix is shifted so that every payoff is at least 1, which does not change the strategies. The column player's
+    strategy then comes from the linear-program: maximize sum(q) subject to matrix @ q <= 1 and q >= 0.
+    The row player's strategy is the solution to the dual of this linear-program, which is read from the final tableau.
+    Bland's rule is used to choose each pivot so that the method always finishes
+
+    :param matrix: the row player's payoffs, indexed by [row, column]. The column player's payoffs are the negatives
+    :return: a tuple of (the row player's probabilities, the column player's probabilities, the value of the game)
+    """
+    matrix = np.array(matrix, dtype=float)
+    number_of_rows, number_of_columns = matrix.shape
+    shift = 1 - matrix.min()
+
+    # the columns of the tableau are the column player's probabilities, then a slack for each row, then the bounds
+    tableau = np.zeros((number_of_rows + 1, number_of_columns + number_of_rows + 1))
+    tableau[:number_of_rows, :number_of_columns] = matrix + shift
+    tableau[:number_of_rows, number_of_columns:-1] = np.identity(number_of_rows)
+    tableau[:number_of_rows, -1] = 1
+    tableau[-1, :number_of_columns] = -1
+    basis = list(range(number_of_columns, number_of_columns + number_of_rows))
+
+    while True:
+        entering_columns = np.flatnonzero(tableau[-1, :-1] < -EPSILON)
+        if not len(entering_columns):
+            break
+        column = entering_columns[0]
+
+        leaving_row = None
+        for row in np.flatnonzero(tableau[:-1, column] > EPSILON):
+            ratio = tableau[row, -1] / tableau[row, column]
+            if leaving_row is None or ratio < best_ratio or (ratio == best_ratio and basis[row] < basis[leaving_row]):
+                leaving_row = row
+                best_ratio = ratio
+
+        pivot(tableau, leaving_row, column)
+        basis[leaving_row] = column
+
+    column_strategy = np.zeros(number_of_columns)
+    for row, variable in enumerate(basis):
+        if variable < number_of_columns:
+            column_strategy[variable] = tableau[row, -1]
+    row_strategy = tableau[-1, number_of_columns:-1].copy()
+
+    total = column_strategy.sum()
+    return row_strategy / total, column_strategy / total, 1 / total - shift
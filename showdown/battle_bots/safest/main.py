@@ -1,10 +1,14 @@
+import time
+
 from showdown.battle import Battle
 
 from ..helpers import format_decision
+from ..helpers import get_search_time_budget
+from ..helpers import search_battles
 
-from showdown.engine.objects import StateMutator
 from showdown.engine.select_best_move import pick_safest
-from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import SearchStats
+from showdown.engine.select_best_move import PREPARE_BATTLES_PHASE
 
 import config
 
@@ -22,15 +26,9 @@ def prefix_opponent_move(score_lookup, prefix):
     return new_score_lookup
 
 
-def pick_safest_move_from_battles(battles):
+def pick_safest_move_from_battles(battles, time_budget=None, search_stats=None, carry_over=None):
     all_scores = dict()
-    for i, b in enumerate(battles):
-        state = b.create_state()
-        mutator = StateMutator(state)
-        user_options, opponent_options = b.get_all_options()
-        logger.debug("Searching through the state: {}".format(mutator.state))
-        scores = get_payoff_matrix(mutator, user_options, opponent_options, depth = config.search_depth, prune=True)
-
+    for i, scores in enumerate(search_battles(battles, prune=True, time_budget=time_budget, search_stats=search_stats, carry_over=carry_over)):
         prefixed_scores = prefix_opponent_move(scores, str(i))
         all_scores = {**all_scores, **prefixed_scores}
 
@@ -41,10 +39,17 @@ def pick_safest_move_from_battles(battles):
 
 
 class BattleBot(Battle):
+    can_ponder = True
+
     def __init__(self, *args, **kwargs):
         super(BattleBot, self).__init__(*args, **kwargs)
 
     def find_best_move(self):
+        self.search_stats = SearchStats()
+        start_time = time.time()
         battles = self.prepare_battles(join_moves_together=True)
-        safest_move = pick_safest_move_from_battles(battles)
+        self.search_stats.record_phase(PREPARE_BATTLES_PHASE, time.time() - start_time)
+
+        time_budget = get_search_time_budget(self) if config.iterative_deepening else None
+        safest_move = pick_safest_move_from_battles(battles, time_budget=time_budget, search_stats=self.search_stats, carry_over=self.search_carry_over)
         return format_decision(self, safest_move)
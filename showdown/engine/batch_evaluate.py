@@ -0,0 +1,153 @@
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+import constants
+
+from .evaluate import Scoring
+from .objects import boost_attribute_lookup
+
+
+# each side has an active pokemon and up to 5 reserve pokemon
+POKEMON_SLOTS = 6
+
+BOOST_ATTRIBUTES = tuple(boost_attribute_lookup.items())
+
+# the status codes are the positions of the statuses in Scoring.POKEMON_STATIC_STATUSES
+# any other status is scored as a burn, the same as in `evaluate_pokemon`
+STATIC_STATUS_CODES = {status: i for i, status in enumerate(Scoring.POKEMON_STATIC_STATUSES)}
+BURN_STATUS_CODE = len(STATIC_STATUS_CODES)
+
+# the volatile-status codes start at 1 so that 0 is an empty slot
+VOLATILE_STATUS_CODES = {status: i + 1 for i, status in enumerate(Scoring.POKEMON_VOLATILE_STATUSES)}
+VOLATILE_STATUS_SLOTS = len(VOLATILE_STATUS_CODES)
+
+STATIC_SCORED_SIDE_CONDITIONS = tuple(Scoring.STATIC_SCORED_SIDE_CONDITIONS)
+POKEMON_COUNT_SCORED_SIDE_CONDITIONS = tuple(Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS)
+
+# the columns of a pokemon's features
+HP = 0
+MAXHP = 1
+FIRST_BOOST = 2
+BURN_MULTIPLIER = FIRST_BOOST + len(BOOST_ATTRIBUTES)
+STATUS = BURN_MULTIPLIER + 1
+FIRST_VOLATILE_STATUS = STATUS + 1
+POKEMON_FEATURES = FIRST_VOLATILE_STATUS + VOLATILE_STATUS_SLOTS
+
+get_numeric_pokemon_features = attrgetter('hp', 'maxhp', *(attribute for _, attribute in BOOST_ATTRIBUTES), 'burn_multiplier')
+
+EMPTY_POKEMON_SLOT = [0] * POKEMON_FEATURES
+
+# the columns of a side's features
+ALIVE_RESERVE_COUNT = len(STATIC_SCORED_SIDE_CONDITIONS) + len(POKEMON_COUNT_SCORED_SIDE_CONDITIONS)
+SIDE_FEATURES = ALIVE_RESERVE_COUNT + 1
+
+# a state's features are the pokemon's features for each side followed by each side's features
+SIDE_FEATURES_START = 2 * POKEMON_SLOTS * POKEMON_FEATURES
+
+
+def add_pokemon_features(features, pkmn):
+    features.extend(get_numeric_pokemon_features(pkmn))
+    features.append(STATIC_STATUS_CODES.get(pkmn.status, BURN_STATUS_CODE))
+
+    # the volatile-statuses are kept in the order they are scored by `evaluate_pokemon`
+    volatile_statuses = [VOLATILE_STATUS_CODES[v] for v in pkmn.volatile_status if v in VOLATILE_STATUS_CODES]
+    features.extend(volatile_statuses)
+    features.extend([0] * (VOLATILE_STATUS_SLOTS - len(volatile_statuses)))
+
+
+def add_side_features(features, side, alive_reserve_count):
+    side_conditions = side.side_conditions
+    features.extend([side_conditions.get(c, 0) for c in STATIC_SCORED_SIDE_CONDITIONS])
+    features.extend([side_conditions.get(c, 0) for c in POKEMON_COUNT_SCORED_SIDE_CONDITIONS])
+    features.append(alive_reserve_count)
+
+
+def score_pokemon(pokemon_features):
+    # the same arithmetic as `evaluate_pokemon`, done in the same order so that the scores are exactly the same
+    hp = pokemon_features[..., HP]
+    alive = hp > 0
+    hp_fraction = hp / np.where(alive, pokemon_features[..., MAXHP], 1)
+
+    score = Scoring.POKEMON_ALIVE_STATIC + Scoring.POKEMON_HP * hp_fraction
+
+    diminishing_returns = np.array([Scoring.POKEMON_BOOST_DIMINISHING_RETURNS[i] for i in range(-6, 7)])
+    for i, (boost, _) in enumerate(BOOST_ATTRIBUTES):
+        boost_index = pokemon_features[..., FIRST_BOOST + i].astype(int) + 6
+        score = score + diminishing_returns[boost_index] * Scoring.POKEMON_BOOSTS[boost]
+
+    status_scores = np.array(list(Scoring.POKEMON_STATIC_STATUSES.values()) + [0])
+    status = pokemon_features[..., STATUS].astype(int)
+    score = score + np.where(
+        status == BURN_STATUS_CODE,
+        Scoring.BURN(pokemon_features[..., BURN_MULTIPLIER]),
+        status_scores[status]
+    )
+
+    volatile_status_scores = np.array([0] + list(Scoring.POKEMON_VOLATILE_STATUSES.values()))
+    for i in range(VOLATILE_STATUS_SLOTS):
+        score = score + volatile_status_scores[pokemon_features[..., FIRST_VOLATILE_STATUS + i].astype(int)]
+
+    # numpy rounds halves to the nearest even number, the same as python's `round`
+    return np.where(alive, np.round(score), 0)
+
+
+def score_side_conditions(side_features):
+    static_scores = np.array([Scoring.STATIC_SCORED_SIDE_CONDITIONS[c] for c in STATIC_SCORED_SIDE_CONDITIONS])
+    pokemon_count_scores = np.array([Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[c] for c in POKEMON_COUNT_SCORED_SIDE_CONDITIONS])
+
+    static_count = len(STATIC_SCORED_SIDE_CONDITIONS)
+    score = side_features[..., :static_count] @ static_scores
+    score = score + (side_features[..., static_count:ALIVE_RESERVE_COUNT] @ pokemon_count_scores) * side_features[..., ALIVE_RESERVE_COUNT]
+    return score
+
+
+class LeafBatch:
+    """Collects the features of states so that they can all be scored by one call to numpy
+    `evaluate` is called for almost every state at the last turn of a search, so this is where it is called the most.
+    The features are copied out of the state when it is added, so the state can be changed afterwards.
+    The scores are exactly the same as the scores from `evaluate`"""
+
+    def __init__(self):
+        self.features = list()
+
+    def add(self, state):
+        features = list()
+        for side in (state.self, state.opponent):
+            for pkmn in chain((side.active,), side.reserve.values()):
+                add_pokemon_features(features, pkmn)
+            features.extend(EMPTY_POKEMON_SLOT * (POKEMON_SLOTS - 1 - len(side.reserve)))
+
+        bot_alive_reserve_count = len([p for p in state.self.reserve.values() if p.hp > 0])
+        number_of_opponent_reserve_revealed = len(state.opponent.reserve) + 1
+        opponent_alive_reserves_count = len([p for p in state.opponent.reserve.values() if p.hp > 0]) + (6 - number_of_opponent_reserve_revealed)
+        add_side_features(features, state.self, bot_alive_reserve_count)
+        add_side_features(features, state.opponent, opponent_alive_reserves_count)
+
+        self.features.append(features)
+
+    def evaluate(self):
+        # returns the score of each state in the order they were added
+        if not self.features:
+            return list()
+
+        features = np.array(self.features, dtype=float)
+        pokemon_features = features[:, :SIDE_FEATURES_START].reshape(len(features), 2, POKEMON_SLOTS, POKEMON_FEATURES)
+        side_features = features[:, SIDE_FEATURES_START:].reshape(len(features), 2, SIDE_FEATURES)
+
+        # the bot's side is added to the score and the opponent's side is subtracted
+        side_signs = np.array([1, -1])
+        side_scores = score_pokemon(pokemon_features).sum(axis=2) + score_side_conditions(side_features)
+
+        return [int(s) for s in side_scores @ side_signs]
+
+    def __len__(self):
+        return len(self.features)
+
+
+def batch_evaluate(states):
+    leaf_batch = LeafBatch()
+    for state in states:
+        leaf_batch.add(state)
+    return leaf_batch.evaluate()
@@ -0,0 +1,179 @@
+"""
+Remembers the moves returned by `update_attacking_move`, so that generating the same attack again is a lookup
+
+The special-effects that modify a move read a few attributes of the two pokemon, such as their abilities and items,
+the defender's types, or the attacker's hp for eruption. The attributes read are recorded the first time a move is
+modified, and the modified move is re-used for any pokemon with the same value for each of those attributes.
+The moves are shared by every instruction generated with the same StateMutator, so they are frozen: changing one
+raises a TypeError. Code that needs a changed move copies it first, the same as for the moves in `all_move_json`
+"""
+from copy import deepcopy
+from operator import attrgetter
+
+import constants
+
+from .objects import Pokemon
+from .search_cache import LRUCache
+
+# the most EffectiveMoves kept for one key. A move like eruption has a different one for each of the attacker's hp
+EFFECTIVE_MOVES_PER_KEY = 32
+
+# id(pokemon) -> the attributes of that pokemon read while modifying a move, or None when nothing is being recorded
+_read_attributes = None
+
+
+def _recorded_slot(name):
+    slot = getattr(Pokemon, name)
+
+    def get(self):
+        _read_attributes[id(self)].add(name)
+        return slot.__get__(self, Pokemon)
+
+    def set(self, value):
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+class MoveRecordedPokemon(Pokemon):
+    """A Pokemon that records which of its attributes are read
+    The two pokemon have their class changed to this while a move is modified"""
+    __slots__ = ()
+
+
+for _name in Pokemon.__slots__:
+    setattr(MoveRecordedPokemon, _name, _recorded_slot(_name))
+
+
+class FrozenDict(dict):
+    """A dict that cannot be changed. A copy of it is a normal dict that can be changed"""
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("{} is read-only".format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+def freeze(value):
+    # a copy of a move with each of its dicts frozen, its lists and tuples made into tuples, and its sets made into
+    # frozensets, however deeply they are nested
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    elif isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _no_attributes(pkmn):
+    return None
+
+
+def get_attribute_getter(attributes):
+    # returns a function that reads the attributes from a pokemon
+    if not attributes:
+        return _no_attributes
+    return attrgetter(*attributes)
+
+
+def copy_values(values):
+    # values such as the volatile-statuses and the moves are changed in place, so a deep copy of a value that can be
+    # changed is kept. The moves are a list of dicts, so a shallow copy would still share the dicts
+    if isinstance(values, tuple):
+        return tuple(deepcopy(v) if isinstance(v, (set, list, dict)) else v for v in values)
+    return deepcopy(values) if isinstance(values, (set, list, dict)) else values
+
+
+class EffectiveMove:
+    """A modified move, with the attributes of each pokemon that were read to make it and their values"""
+    __slots__ = ('get_attacking_values', 'attacking_values', 'get_defending_values', 'defending_values', 'move', 'original_moves')
+
+    def __init__(self, attacking_attributes, defending_attributes, attacking_pokemon, defending_pokemon, move, original_moves):
+        self.get_attacking_values = get_attribute_getter(attacking_attributes)
+        self.attacking_values = copy_values(self.get_attacking_values(attacking_pokemon))
+        self.get_defending_values = get_attribute_getter(defending_attributes)
+        self.defending_values = copy_values(self.get_defending_values(defending_pokemon))
+        self.move = move
+
+        # the moves are identified by their id(), so they are kept so that the id() is not re-used
+        self.original_moves = original_moves
+
+
+def record_update_attacking_move(update_attacking_move, attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move, weather, terrain):
+    """
+    Calls `update_attacking_move` while recording the attributes of each pokemon that it reads
+
+    :return: an EffectiveMove
+    """
+    global _read_attributes
+
+    # a pokemon may already be recording its reads for `get_multi_world_payoff_matrices`
+    attacking_class = attacking_pokemon.__class__
+    defending_class = defending_pokemon.__class__
+    attacking_pokemon.__class__ = MoveRecordedPokemon
+    defending_pokemon.__class__ = MoveRecordedPokemon
+    _read_attributes = {id(attacking_pokemon): set(), id(defending_pokemon): set()}
+    try:
+        move = freeze(update_attacking_move(attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move, weather, terrain))
+        attacking_attributes = tuple(_read_attributes[id(attacking_pokemon)])
+        defending_attributes = tuple(_read_attributes[id(defending_pokemon)])
+    finally:
+        attacking_pokemon.__class__ = attacking_class
+        defending_pokemon.__class__ = defending_class
+        _read_attributes = None
+
+    # the values are read after the classes are put back so that any other recording sees these reads
+    return EffectiveMove(attacking_attributes, defending_attributes, attacking_pokemon, defending_pokemon, move, (attacking_move, defending_move))
+
+
+class EffectiveMoveCache(LRUCache):
+    """Caches the moves returned by `update_attacking_move` for the moves in `all_move_json`
+    Each StateMutator has its own, made the first time it generates instructions
+    The key is the two moves, whether the attacker moves first, the weather, and the terrain. The moves are identified
+    by their id() and a switch by the pokemon switched in. Each key has a list of the EffectiveMoves made for it,
+    which are checked against the pokemon"""
+
+    def __init__(self, max_entries, update_attacking_move):
+        super().__init__(max_entries)
+        self.update_attacking_move = update_attacking_move
+
+    def get_effective_move(self, attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move, weather, terrain):
+        """Has the same arguments as `update_attacking_move`. The result is the same but frozen"""
+        if constants.SWITCH_STRING in defending_move:
+            defending_key = defending_move[constants.SWITCH_STRING]
+        else:
+            defending_key = id(defending_move)
+
+        key = id(attacking_move), defending_key, first_move, weather, terrain
+        effective_moves = self.entries.get(key)
+        if effective_moves is None:
+            effective_moves = list()
+            self.put(key, effective_moves)
+        else:
+            self.entries.move_to_end(key)
+            for effective_move in effective_moves:
+                if (
+                    effective_move.get_attacking_values(attacking_pokemon) == effective_move.attacking_values and
+                    effective_move.get_defending_values(defending_pokemon) == effective_move.defending_values
+                ):
+                    self.hits += 1
+                    return effective_move.move
+
+        self.misses += 1
+        effective_move = record_update_attacking_move(self.update_attacking_move, attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move, weather, terrain)
+        effective_moves.append(effective_move)
+        if len(effective_moves) > EFFECTIVE_MOVES_PER_KEY:
+            del effective_moves[0]
+        return effective_move.move
+
@@ -65,6 +65,16 @@ class Scoring:
         constants.TOXIC_SPIKES: -7,
     }
 
+    # the most layers of a side-condition that can be on one side. Any other side-condition has 1 layer at most
+    SIDE_CONDITION_MAX_LAYERS = {
+        constants.SPIKES: 3,
+        constants.TOXIC_SPIKES: 2,
+    }
+
+    # the lowest burn_multiplier a pokemon can have
+    LOWEST_BURN_MULTIPLIER = -2
+    HIGHEST_BURN_MULTIPLIER = 4
+
 
 def evaluate_pokemon(pkmn):
     score = 0
@@ -98,12 +108,65 @@ def evaluate_pokemon(pkmn):
     return round(score)
 
 
-def evaluate(state):
+def highest_possible_pokemon_evaluation():
+    score = Scoring.POKEMON_ALIVE_STATIC + Scoring.POKEMON_HP
+    score += max(Scoring.POKEMON_BOOST_DIMINISHING_RETURNS.values()) * sum(Scoring.POKEMON_BOOSTS.values())
+    score += max(max(Scoring.POKEMON_STATIC_STATUSES.values()), Scoring.BURN(Scoring.LOWEST_BURN_MULTIPLIER))
+    score += sum(v for v in Scoring.POKEMON_VOLATILE_STATUSES.values() if v > 0)
+    return round(score)
+
+
+def lowest_possible_pokemon_evaluation():
+    score = Scoring.POKEMON_ALIVE_STATIC
+    score += min(Scoring.POKEMON_BOOST_DIMINISHING_RETURNS.values()) * sum(Scoring.POKEMON_BOOSTS.values())
+    score += min(min(Scoring.POKEMON_STATIC_STATUSES.values()), Scoring.BURN(Scoring.HIGHEST_BURN_MULTIPLIER))
+    score += sum(v for v in Scoring.POKEMON_VOLATILE_STATUSES.values() if v < 0)
+
+    # a fainted pokemon is worth 0
+    return min(0, round(score))
+
+
+def highest_possible_evaluation():
+    """The highest score that `evaluate` can give any state using the current Scoring
+    Every pokemon on the bot's side has the highest score possible, every pokemon on the opponent's side has the lowest,
+    and each side has the most layers of the side-conditions that favour the bot"""
+    score = 6 * highest_possible_pokemon_evaluation()
+    score -= 6 * lowest_possible_pokemon_evaluation()
+
+    for condition, value in Scoring.STATIC_SCORED_SIDE_CONDITIONS.items():
+        layers = Scoring.SIDE_CONDITION_MAX_LAYERS.get(condition, 1)
+        score += layers * max(value, 0)
+        score += layers * max(-value, 0)
+
+    # at most 5 reserve pokemon are alive
+    for condition, value in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS.items():
+        layers = Scoring.SIDE_CONDITION_MAX_LAYERS.get(condition, 1)
+        score += layers * max(value, 0) * 5
+        score += layers * max(-value, 0) * 5
+
+    return score
+
+
+def evaluate_side_conditions(side, count_unrevealed_pokemon):
+    # side-conditions that affect pokemon switching in are scored for each alive reserve pokemon
+    # the opponent's pokemon that have not been revealed yet are counted as alive
+    alive_reserve_count = len([p for p in side.reserve.values() if p.hp > 0])
+    if count_unrevealed_pokemon:
+        number_of_reserve_revealed = len(side.reserve) + 1
+        alive_reserve_count += 6 - number_of_reserve_revealed
+
     score = 0
+    for condition, count in side.side_conditions.items():
+        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
+            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
+        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
+            score += count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * alive_reserve_count
 
-    number_of_opponent_reserve_revealed = len(state.opponent.reserve) + 1
-    bot_alive_reserve_count = len([p.hp for p in state.self.reserve.values() if p.hp > 0])
-    opponent_alive_reserves_count = len([p for p in state.opponent.reserve.values() if p.hp > 0]) + (6-number_of_opponent_reserve_revealed)
+    return score
+
+
+def evaluate(state):
+    score = 0
 
     # evaluate the bot's pokemon
     score += evaluate_pokemon(state.self.active)
@@ -117,18 +180,7 @@ def evaluate(state):
         this_pkmn_score = evaluate_pokemon(pkmn)
         score -= this_pkmn_score
 
-    # evaluate the side-conditions for the bot
-    for condition, count in state.self.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score += count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * bot_alive_reserve_count
-
-    # evaluate the side-conditions for the opponent
-    for condition, count in state.opponent.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score -= count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score -= count * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition] * opponent_alive_reserves_count
+    score += evaluate_side_conditions(state.self, count_unrevealed_pokemon=False)
+    score -= evaluate_side_conditions(state.opponent, count_unrevealed_pokemon=True)
 
     return int(score)
@@ -1,3 +1,4 @@
+from collections import Counter
 from copy import copy
 
 import config
@@ -7,6 +8,7 @@ from data import all_move_json
 from . import instruction_generator
 from .damage_calculator import _calculate_damage
 from .objects import TransposeInstruction
+from .effective_move import EffectiveMoveCache
 from .special_effects.abilities.modify_attack_against import ability_modify_attack_against
 from .special_effects.abilities.modify_attack_being_used import ability_modify_attack_being_used
 from .special_effects.items.modify_attack_against import item_modify_attack_against
@@ -194,6 +196,16 @@ def update_attacking_move(attacking_pokemon, defending_pokemon, attacking_move,
     return attacking_move
 
 
+# the most moves modified by `update_attacking_move` that each StateMutator remembers
+EFFECTIVE_MOVE_CACHE_SIZE = 10000
+
+
+def get_effective_move_cache(mutator):
+    if mutator.effective_move_cache is None:
+        mutator.effective_move_cache = EffectiveMoveCache(EFFECTIVE_MOVE_CACHE_SIZE, update_attacking_move)
+    return mutator.effective_move_cache
+
+
 def cannot_use_move(attacking_pokemon, attacking_move):
     return constants.TAUNT in attacking_pokemon.volatile_status and attacking_move[constants.CATEGORY] not in constants.DAMAGING_CATEGORIES
 
@@ -209,7 +221,7 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     if not first_move and constants.DRAG in defending_move.get(constants.FLAGS, {}):
         return [instructions]
 
-    mutator.apply(instructions.instructions)
+    mutator.cursor.move_to(instructions.instructions)
     attacking_side = instruction_generator.get_side_from_state(mutator.state, attacker)
     defending_side = instruction_generator.get_side_from_state(mutator.state, defender)
     attacking_pokemon = attacking_side.active
@@ -231,10 +243,10 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         # if the attacker is dead, remove the 'flinched' volatile-status if it has it and exit early
         # this triggers if the pokemon moves second but the first attack knocked it out
         instructions = instruction_generator.get_instructions_from_flinched(mutator, attacker, instructions)
-        mutator.reverse(instructions.instructions)
+        mutator.cursor.release()
         return [instructions]
 
-    attacking_move = update_attacking_move(
+    attacking_move = get_effective_move_cache(mutator).get_effective_move(
         attacking_pokemon,
         defending_pokemon,
         attacking_move,
@@ -255,7 +267,7 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         defending_pokemon
     )
     if ability_before_move_instructions is not None and not instructions.frozen:
-        mutator.apply(ability_before_move_instructions)
+        mutator.cursor.apply(ability_before_move_instructions)
         instructions.instructions += ability_before_move_instructions
 
     damage_amounts = None
@@ -333,7 +345,7 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
             boosts_target = attacker if attacking_move[constants.TARGET] == constants.SELF else defender
             boosts_chance = attacking_move[constants.ACCURACY]
 
-    mutator.reverse(instructions.instructions)
+    mutator.cursor.release()
 
     all_instructions = instruction_generator.get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defender, attacking_move, defending_move, instructions)
 
@@ -413,6 +425,8 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         all_instructions = temp_instructions
 
     if switch_out_move_triggered(attacking_move, damage_amounts):
+        # the pokemon switched in is picked by searching the state at the start of the turn
+        mutator.cursor.move_to([])
         temp_instructions = []
         for i in all_instructions:
             best_switch = get_best_switch_pokemon(mutator, i, attacker, attacking_side, defending_move, first_move)
@@ -426,15 +440,34 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     return all_instructions
 
 
-def remove_duplicate_instructions(list_of_instructions):
-    new_instructions = [list_of_instructions[0]]
-    for instruction_1 in list_of_instructions[1:]:
-        for instruction_2 in new_instructions:
-            if instruction_1.has_same_instructions_as(instruction_2):
-                instruction_2.percentage += instruction_1.percentage
-                break
+def remove_duplicate_instructions(list_of_instructions, state_keys=None):
+    """
+    Combines the instructions that are the same, adding their percentages to the first of them
+    When a key of the state that each of the instructions reaches is given, the instructions that reach the same
+    state are combined instead, so a miss is combined with a hit that does nothing.
+    The shortest of the instructions reaching a state are kept so that the search has fewer to apply
+    """
+    new_instructions = list()
+    kept_instructions = dict()
+    for index, instruction_1 in enumerate(list_of_instructions):
+        key = state_keys[index] if state_keys is not None else tuple(instruction_1.instructions)
+
+        try:
+            instruction_2 = kept_instructions.get(key)
+        except TypeError:
+            # a few instructions hold a list, so they are compared with each of the instructions kept
+            instruction_2 = next((i for i in new_instructions if i.has_same_instructions_as(instruction_1)), None)
+
+        if instruction_2 is not None:
+            instruction_2.percentage += instruction_1.percentage
+            if len(instruction_1.instructions) < len(instruction_2.instructions):
+                instruction_2.instructions = instruction_1.instructions
         else:
             new_instructions.append(instruction_1)
+            try:
+                kept_instructions[key] = instruction_1
+            except TypeError:
+                pass
 
     return new_instructions
 
@@ -448,7 +481,21 @@ def end_of_turn_triggered(user_move, opponent_move):
     return True
 
 
-def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
+def get_state_keys(mutator, all_instructions, state_hashes):
+    # a key of the state reached by each of the instructions, for `remove_duplicate_instructions`
+    # two different states can have the same hash, so the instructions sharing a hash are keyed by the state's components
+    hash_counts = Counter(state_hashes)
+    state_keys = list()
+    for instruction_set, state_hash in zip(all_instructions, state_hashes):
+        if hash_counts[state_hash] > 1:
+            mutator.cursor.move_to(instruction_set.instructions)
+            state_keys.append((state_hash, frozenset(mutator.state.hash_components())))
+        else:
+            state_keys.append(state_hash)
+    return state_keys
+
+
+def get_all_state_instructions(mutator, user_move_string, opponent_move_string, combine_same_states=False):
     user_move = lookup_move(user_move_string)
     opponent_move = lookup_move(opponent_move_string)
 
@@ -456,22 +503,43 @@ def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
 
     instructions = TransposeInstruction(1.0, [], False)
 
-    all_instructions = []
-    if bot_moves_first:
-        instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, True, instructions)
-        for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, False, instruction)
-    else:
-        instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, True, instructions)
-        for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, False, instruction)
-
-    if end_of_turn_triggered(user_move_string, opponent_move_string):
-        temp_instructions = []
-        for instruction_set in all_instructions:
-            temp_instructions += instruction_generator.get_end_of_turn_instructions(mutator, instruction_set, user_move, opponent_move, bot_moves_first)
-        all_instructions = temp_instructions
-
-    all_instructions = remove_duplicate_instructions(all_instructions)
+    # the state is left where each stage of generating the turn moves the cursor to, and is put back once at the end
+    cursor = mutator.cursor
+    held = cursor.held
+    cursor.held = True
+    try:
+        all_instructions = []
+        if bot_moves_first:
+            instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, True, instructions)
+            for instruction in instructions:
+                all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, False, instruction)
+        else:
+            instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, True, instructions)
+            for instruction in instructions:
+                all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, False, instruction)
+
+        # with combine_same_states, the hash of the state reached by each of the instructions is read while the cursor
+        # is at that state. This makes the mutator keep the state's hash up to date from then on
+        # the end-of-turn instructions are added to each of the instructions without splitting them, and the
+        # cursor is left at the state they reach
+        state_hashes = []
+        if end_of_turn_triggered(user_move_string, opponent_move_string):
+            temp_instructions = []
+            for instruction_set in all_instructions:
+                temp_instructions += instruction_generator.get_end_of_turn_instructions(mutator, instruction_set, user_move, opponent_move, bot_moves_first)
+                if combine_same_states:
+                    state_hashes.append(mutator.state_hash)
+            all_instructions = temp_instructions
+        elif combine_same_states:
+            for instruction_set in all_instructions:
+                cursor.move_to(instruction_set.instructions)
+                state_hashes.append(mutator.state_hash)
+
+        state_keys = get_state_keys(mutator, all_instructions, state_hashes) if combine_same_states else None
+    finally:
+        cursor.held = held
+        cursor.move_to([])
+
+    all_instructions = remove_duplicate_instructions(all_instructions, state_keys)
 
     return all_instructions
@@ -62,10 +62,10 @@ def get_instructions_from_move_special_effect(mutator, attacking_side, attacking
     except AttributeError:
         new_instructions = list()
     else:
-        mutator.apply(instructions.instructions)
+        mutator.cursor.move_to(instructions.instructions)
         new_instructions = special_logic_move_function(mutator, attacking_side, attacking_pokemon, defending_pokemon)
         new_instructions = new_instructions or list()
-        mutator.reverse(instructions.instructions)
+        mutator.cursor.release()
 
     for i in new_instructions:
         instructions.add_instruction(i)
@@ -86,9 +86,9 @@ def get_state_from_volatile_status(mutator, volatile_status, attacker, affected_
         return [instruction]
 
     side = get_side_from_state(mutator.state, affected_side)
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
     if volatile_status in side.active.volatile_status:
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         return [instruction]
 
     if can_be_volatile_statused(side, volatile_status, first_move) and volatile_status not in side.active.volatile_status:
@@ -97,7 +97,7 @@ def get_state_from_volatile_status(mutator, volatile_status, attacker, affected_
             affected_side,
             volatile_status
         )
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         instruction.add_instruction(apply_status_instruction)
         if volatile_status == constants.SUBSTITUTE:
             instruction.add_instruction(
@@ -108,7 +108,7 @@ def get_state_from_volatile_status(mutator, volatile_status, attacker, affected_
                 )
             )
     else:
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
 
     return [instruction]
 
@@ -119,9 +119,9 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
 
     attacking_side = get_side_from_state(mutator.state, attacker)
     defending_side = get_side_from_state(mutator.state, opposite_side[attacker])
-    mutator.apply(instructions.instructions)
+    mutator.cursor.move_to(instructions.instructions)
     instruction_additions = remove_volatile_status_and_boosts_instructions(attacking_side, attacker)
-    mutator.apply(instruction_additions)
+    mutator.cursor.apply(instruction_additions)
 
     for move in filter(lambda x: x[constants.DISABLED] is True and x[constants.CURRENT_PP], attacking_side.active.moves):
         remove_disabled_instruction = (
@@ -129,7 +129,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
             attacker,
             move[constants.ID]
         )
-        mutator.apply_one(remove_disabled_instruction)
+        mutator.cursor.apply_one(remove_disabled_instruction)
         instruction_additions.append(remove_disabled_instruction)
 
     if attacking_side.active.ability == 'regenerator' and attacking_side.active.hp:
@@ -139,7 +139,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
             attacker,
             int(min(1 / 3 * attacking_side.active.maxhp, hp_missing))
         )
-        mutator.apply_one(regenerator_instruction)
+        mutator.cursor.apply_one(regenerator_instruction)
         instruction_additions.append(regenerator_instruction)
     elif attacking_side.active.ability == 'naturalcure' and attacking_side.active.status is not None:
         naturalcure_instruction = (
@@ -147,7 +147,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
             attacker,
             attacking_side.active.status
         )
-        mutator.apply_one(naturalcure_instruction)
+        mutator.cursor.apply_one(naturalcure_instruction)
         instruction_additions.append(naturalcure_instruction)
 
     switch_instruction = (
@@ -156,7 +156,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
         attacking_side.active.id,
         switch_pokemon_name
     )
-    mutator.apply_one(switch_instruction)
+    mutator.cursor.apply_one(switch_instruction)
     instruction_additions.append(switch_instruction)
 
     switch_pkmn = attacking_side.active
@@ -170,7 +170,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
                 attacker,
                 min(1 / 8 * multiplier * switch_pkmn.maxhp, switch_pkmn.hp)
             )
-            mutator.apply_one(stealth_rock_instruction)
+            mutator.cursor.apply_one(stealth_rock_instruction)
             instruction_additions.append(stealth_rock_instruction)
 
         # account for spikes damage
@@ -181,7 +181,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
                 attacker,
                 min(1 / 8 * spike_count * switch_pkmn.maxhp, switch_pkmn.hp)
             )
-            mutator.apply_one(spikes_instruction)
+            mutator.cursor.apply_one(spikes_instruction)
             instruction_additions.append(spikes_instruction)
 
         # account for stickyweb speed drop
@@ -192,7 +192,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
                 constants.SPEED,
                 1
             )
-            mutator.apply_one(sticky_web_instruction)
+            mutator.cursor.apply_one(sticky_web_instruction)
             instruction_additions.append(sticky_web_instruction)
 
         # account for toxic spikes effect
@@ -219,7 +219,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
                     attacking_side.side_conditions[constants.TOXIC_SPIKES]
                 )
             if toxic_spike_instruction is not None:
-                mutator.apply_one(toxic_spike_instruction)
+                mutator.cursor.apply_one(toxic_spike_instruction)
                 instruction_additions.append(toxic_spike_instruction)
 
     # account for switch-in abilities
@@ -233,7 +233,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
     )
     if ability_switch_in_instructions is not None:
         for i in ability_switch_in_instructions:
-            mutator.apply_one(i)
+            mutator.cursor.apply_one(i)
             instruction_additions.append(i)
 
     # account for switch-in items
@@ -247,13 +247,12 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
     )
     if item_switch_in_instructions is not None:
         for i in item_switch_in_instructions:
-            mutator.apply_one(i)
+            mutator.cursor.apply_one(i)
             instruction_additions.append(i)
 
-    mutator.reverse(instruction_additions)
-    mutator.reverse(instructions.instructions)
     for i in instruction_additions:
         instructions.add_instruction(i)
+    mutator.cursor.release()
 
     return [instructions]
 
@@ -270,7 +269,7 @@ def get_instructions_from_flinched(mutator, attacker, instruction):
             attacker,
             constants.FLINCH
         )
-        mutator.apply_one(remove_flinch_instruction)
+        mutator.cursor.apply_one(remove_flinch_instruction)
         instruction.add_instruction(remove_flinch_instruction)
         instruction.frozen = True
         return instruction
@@ -283,7 +282,7 @@ def get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defe
     attacker_side = get_side_from_state(mutator.state, attacker)
     defender_side = get_side_from_state(mutator.state, defender)
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     if constants.PARALYZED == attacker_side.active.status:
         fully_paralyzed_instruction = copy(instruction)
@@ -327,7 +326,7 @@ def get_instructions_from_statuses_that_freeze_the_state(mutator, attacker, defe
     if move[constants.TYPE] == 'electric' and 'ground' in defender_side.active.types:
         instruction.frozen = True
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
 
     return instructions
 
@@ -347,7 +346,7 @@ def get_states_from_damage(mutator, defender, damage, accuracy, attacking_move,
     drain = attacking_move.get(constants.DRAIN)
     move_flags = attacking_move.get(constants.FLAGS, {})
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     if accuracy is True:
         accuracy = 100
@@ -366,10 +365,10 @@ def get_states_from_damage(mutator, defender, damage, accuracy, attacking_move,
                 attacker,
                 min(int(crash_percent * attacker_side.active.maxhp), attacker_side.active.hp)
             )
-            mutator.reverse(instruction.instructions)
+            mutator.cursor.release()
             instruction.add_instruction(crash_instruction)
         else:
-            mutator.reverse(instruction.instructions)
+            mutator.cursor.release()
         instruction.frozen = True
         return [instruction]
 
@@ -480,7 +479,7 @@ def get_states_from_damage(mutator, defender, damage, accuracy, attacking_move,
 
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -539,7 +538,7 @@ def get_instructions_from_side_conditions(mutator, attacker_string, side_string,
 
     instruction_additions = []
     side = get_side_from_state(mutator.state, side_string)
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     if condition == constants.WISH:
         if side.wish[0] == 0:
@@ -572,7 +571,7 @@ def get_instructions_from_side_conditions(mutator, attacker_string, side_string,
                 )
             )
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -589,7 +588,7 @@ def get_instructions_from_hazard_clearing_moves(mutator, attacker_string, move,
     defender_string = opposite_side[attacker_string]
 
     instruction_additions = []
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     attacker_side = get_side_from_state(mutator.state, attacker_string)
     defender_side = get_side_from_state(mutator.state, defender_string)
@@ -664,7 +663,7 @@ def get_instructions_from_hazard_clearing_moves(mutator, attacker_string, move,
     else:
         raise ValueError("{} is not a hazard clearing move".format(move[constants.ID]))
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -684,17 +683,17 @@ def get_states_from_status_effects(mutator, defender, status, accuracy, instruct
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
     instruction_additions = []
     defending_side = get_side_from_state(mutator.state, defender)
     attacking_side = get_side_from_state(mutator.state, opposite_side[defender])
 
     if sleep_clause_activated(defending_side, status):
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         return [instruction]
 
     if immune_to_status(mutator.state, defending_side.active, attacking_side.active, status):
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         return [instruction]
 
     move_missed_instruction = copy(instruction)
@@ -722,7 +721,7 @@ def get_states_from_status_effects(mutator, defender, status, accuracy, instruct
             move_missed_instruction.add_instruction(blunder_policy_increase_speed_instruction)
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -745,10 +744,10 @@ def get_states_from_boosts(mutator, side_string, boosts, accuracy, instruction):
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
     side = get_side_from_state(mutator.state, side_string)
     if side.active.ability in constants.IMMUNE_TO_STAT_LOWERING_ABILITIES:
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         return [instruction]
 
     instruction_additions = []
@@ -785,7 +784,7 @@ def get_states_from_boosts(mutator, side_string, boosts, accuracy, instruction):
         move_missed_instruction.update_percentage(1 - percent_hit)
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -826,7 +825,7 @@ def get_state_from_attacker_recovery(mutator, attacker_string, move, instruction
     if instruction.frozen:
         return [instruction]
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     target = move[constants.HEAL_TARGET]
     if target in opposing_side_strings:
@@ -841,7 +840,7 @@ def get_state_from_attacker_recovery(mutator, attacker_string, move, instruction
         health_recovered = 0
 
     if health_recovered == 0:
-        mutator.reverse(instruction.instructions)
+        mutator.cursor.release()
         return [instruction]
 
     final_health = pkmn.hp + health_recovered
@@ -856,7 +855,7 @@ def get_state_from_attacker_recovery(mutator, attacker_string, move, instruction
         health_recovered
     )
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
 
     if health_recovered:
         instruction.add_instruction(heal_instruction)
@@ -871,7 +870,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
     else:
         sides = [constants.OPPONENT, constants.SELF]
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
 
     # weather damage - sand and hail
     for attacker in sides:
@@ -887,7 +886,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(sand_damage_instruction)
+            mutator.cursor.apply_one(sand_damage_instruction)
             instruction.add_instruction(sand_damage_instruction)
 
         elif mutator.state.weather == constants.HAIL and 'ice' not in pkmn.types and pkmn.ability != 'icebody':
@@ -896,7 +895,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(ice_damage_instruction)
+            mutator.cursor.apply_one(ice_damage_instruction)
             instruction.add_instruction(ice_damage_instruction)
 
     # wish
@@ -908,14 +907,14 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 min(side.wish[1], side.active.maxhp - side.active.hp)
             )
-            mutator.apply_one(wish_heal_instruction)
+            mutator.cursor.apply_one(wish_heal_instruction)
             instruction.add_instruction(wish_heal_instruction)
         if side.wish[0] > 0:
             wish_decrement_instruction = (
                 constants.MUTATOR_WISH_DECREMENT,
                 attacker
             )
-            mutator.apply_one(wish_decrement_instruction)
+            mutator.cursor.apply_one(wish_decrement_instruction)
             instruction.add_instruction(wish_decrement_instruction)
 
     # item and ability - they can add one instruction each
@@ -928,12 +927,12 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
 
         item_instruction = item_end_of_turn(side.active.item, mutator.state, attacker, pkmn, defender, defending_pkmn)
         if item_instruction is not None:
-            mutator.apply_one(item_instruction)
+            mutator.cursor.apply_one(item_instruction)
             instruction.add_instruction(item_instruction)
 
         ability_instruction = ability_end_of_turn(side.active.ability, mutator.state, attacker, pkmn, defender, defending_pkmn)
         if ability_instruction is not None:
-            mutator.apply_one(ability_instruction)
+            mutator.cursor.apply_one(ability_instruction)
             instruction.add_instruction(ability_instruction)
 
     # poison, toxic, and burn damage
@@ -960,8 +959,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 constants.TOXIC_COUNT,
                 1
             )
-            mutator.apply_one(toxic_damage_instruction)
-            mutator.apply_one(toxic_count_instruction)
+            mutator.cursor.apply_one(toxic_damage_instruction)
+            mutator.cursor.apply_one(toxic_count_instruction)
 
             instruction.add_instruction(toxic_damage_instruction)
             instruction.add_instruction(toxic_count_instruction)
@@ -972,7 +971,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.0625, pkmn.hp)))
             )
-            mutator.apply_one(burn_damage_instruction)
+            mutator.cursor.apply_one(burn_damage_instruction)
             instruction.add_instruction(burn_damage_instruction)
 
         elif constants.POISON == pkmn.status and pkmn.ability != 'poisonheal':
@@ -981,7 +980,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 max(0, int(min(pkmn.maxhp * 0.125, pkmn.hp)))
             )
-            mutator.apply_one(poison_damage_instruction)
+            mutator.cursor.apply_one(poison_damage_instruction)
             instruction.add_instruction(poison_damage_instruction)
 
     # leechseed sap damage
@@ -1012,8 +1011,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 min(damage_sapped, damage_from_full)
             )
 
-            mutator.apply_one(sap_instruction)
-            mutator.apply_one(heal_instruction)
+            mutator.cursor.apply_one(sap_instruction)
+            mutator.cursor.apply_one(heal_instruction)
             instruction.add_instruction(sap_instruction)
             instruction.add_instruction(heal_instruction)
 
@@ -1044,8 +1043,8 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                     constants.PROTECT,
                     1
             )
-            mutator.apply_one(remove_protect_volatile_status_instruction)
-            mutator.apply_one(start_protect_side_condition_instruction)
+            mutator.cursor.apply_one(remove_protect_volatile_status_instruction)
+            mutator.cursor.apply_one(start_protect_side_condition_instruction)
             instruction.add_instruction(remove_protect_volatile_status_instruction)
             instruction.add_instruction(start_protect_side_condition_instruction)
 
@@ -1056,7 +1055,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 constants.PROTECT,
                 side.side_conditions[constants.PROTECT]
             )
-            mutator.apply_one(end_protect_side_condition_instruction)
+            mutator.cursor.apply_one(end_protect_side_condition_instruction)
             instruction.add_instruction(end_protect_side_condition_instruction)
 
         if constants.ROOST in pkmn.volatile_status:
@@ -1065,7 +1064,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 constants.ROOST,
             )
-            mutator.apply_one(remove_roost_instruction)
+            mutator.cursor.apply_one(remove_roost_instruction)
             instruction.add_instruction(remove_roost_instruction)
 
         if constants.PARTIALLY_TRAPPED in pkmn.volatile_status:
@@ -1075,7 +1074,7 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                 attacker,
                 damage_taken
             )
-            mutator.apply_one(partially_trapped_damage_instruction)
+            mutator.cursor.apply_one(partially_trapped_damage_instruction)
             instruction.add_instruction(partially_trapped_damage_instruction)
 
     # disable not used moves if choice-item is held
@@ -1108,10 +1107,10 @@ def get_end_of_turn_instructions(mutator, instruction, bot_move, opponent_move,
                     attacker,
                     m[constants.ID]
                 )
-                mutator.apply_one(disable_instruction)
+                mutator.cursor.apply_one(disable_instruction)
                 instruction.add_instruction(disable_instruction)
 
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
 
     return [instruction]
 
@@ -1131,10 +1130,10 @@ def get_state_from_drag(mutator, attacking_side_string, move_target, instruction
     else:
         raise ValueError("Invalid value for move_target: {}".format(move_target))
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
     alive_reserves = [s.id for s in affected_side.reserve.values() if s.hp > 0]
     num_reserve_alive = len(alive_reserves)
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
     if num_reserve_alive == 0:
         return [instruction]
 
@@ -1154,13 +1153,13 @@ def get_instructions_from_boost_reset_moves(mutator, attacking_move, attacking_s
     defending_side_string = opposite_side[attacking_side_string]
     defending_side = get_side_from_state(mutator.state, defending_side_string)
 
-    mutator.apply(instruction.instructions)
+    mutator.cursor.move_to(instruction.instructions)
     new_instructions = []
     if attacking_move[constants.TARGET] in constants.MOVE_TARGET_SELF:
         new_instructions += remove_volatile_status_and_boosts_instructions(attacking_side, attacking_side_string)
     if attacking_move[constants.TARGET] in constants.MOVE_TARGET_OPPONENT:
         new_instructions += remove_volatile_status_and_boosts_instructions(defending_side, defending_side_string)
-    mutator.reverse(instruction.instructions)
+    mutator.cursor.release()
 
     for new_instruction in new_instructions:
         instruction.add_instruction(new_instruction)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+import constants
+
+from .damage_calculator import calculate_damage
+
+
+# the number of killer moves remembered for each depth
+KILLER_MOVES_PER_DEPTH = 2
+
+
+def get_static_score(state, attacking_side_string, option):
+    # a cheap guess at how good an option is: the damage it does to the other side's active pokemon
+    if option.startswith(constants.SWITCH_STRING + " ") or option == constants.DO_NOTHING_MOVE:
+        return 0
+
+    damage_amounts = calculate_damage(state, attacking_side_string, option, constants.DO_NOTHING_MOVE)
+    return damage_amounts[0] if damage_amounts else 0
+
+
+class MoveOrderer:
+    """Orders the options at each node of `get_payoff_matrix` so that rows are pruned as early as possible
+
+    The user's options are ordered so that the best row is likely searched first, raising the score the other rows
+    must beat. The opponent's options are ordered so that the column that causes a row to be pruned is likely
+    searched first. Options are ordered by:
+        - killer moves: the opponent's moves that most recently caused a prune at the same depth
+        - the history table: how often and how deep an option has been the best row or caused a prune
+        - the damage the option does to the other side's active pokemon. This is only used above the last turn of
+          the search because it costs about as much as scoring the cells of the last turn
+    Options that are equal on all of these stay in the order they were given in"""
+
+    def __init__(self):
+        # (side, option) -> a score that increases each time the option is the best row or causes a prune
+        self.history = defaultdict(int)
+
+        # depth -> the opponent's options that most recently caused a prune at that depth, newest first
+        self.killers = defaultdict(list)
+
+        self.cutoffs = 0
+        self.first_column_cutoffs = 0
+
+    def order_user_options(self, mutator, user_options, depth):
+        return sorted(
+            user_options,
+            key=lambda x: (
+                -self.history[(constants.SELF, x)],
+                -get_static_score(mutator.state, constants.SELF, x) if depth else 0
+            )
+        )
+
+    def order_opponent_options(self, mutator, opponent_options, depth):
+        killers = self.killers[depth]
+        return sorted(
+            opponent_options,
+            key=lambda x: (
+                killers.index(x) if x in killers else len(killers),
+                -self.history[(constants.OPPONENT, x)],
+                -get_static_score(mutator.state, constants.OPPONENT, x) if depth else 0
+            )
+        )
+
+    def record_best_row(self, user_move, depth):
+        self.history[(constants.SELF, user_move)] += (depth + 1) ** 2
+
+    def record_cutoff(self, opponent_move, depth, column_index):
+        self.history[(constants.OPPONENT, opponent_move)] += (depth + 1) ** 2
+
+        killers = self.killers[depth]
+        if opponent_move in killers:
+            killers.remove(opponent_move)
+        killers.insert(0, opponent_move)
+        del killers[KILLER_MOVES_PER_DEPTH:]
+
+        self.cutoffs += 1
+        if column_index == 0:
+            self.first_column_cutoffs += 1
+
+    def age(self):
+        # called between decisions: the history from earlier turns counts for less than the history of this one
+        for key in self.history:
+            self.history[key] //= 2
+
+        self.cutoffs = 0
+        self.first_column_cutoffs = 0
+
+    def first_column_cutoff_rate(self):
+        # how often the first column searched was the one that caused the prune. Higher means better ordering
+        if not self.cutoffs:
+            return 0
+        return self.first_column_cutoffs / self.cutoffs
+
+    def __repr__(self):
+        return "{}(cutoffs={}, first_column_cutoff_rate={})".format(
+            self.__class__.__name__,
+            self.cutoffs,
+            round(self.first_column_cutoff_rate(), 3)
+        )
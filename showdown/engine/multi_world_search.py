@@ -0,0 +1,362 @@
+from copy import deepcopy
+from itertools import chain
+
+import constants
+import config
+
+from .objects import Pokemon
+from .objects import StateMutator
+from .select_best_move import WON_BATTLE
+from .select_best_move import SearchTimeout
+from .select_best_move import evaluate_state
+from .select_best_move import get_state_instructions
+from .select_best_move import get_payoff_matrices
+from .select_best_move import get_terminal_payoff_matrix
+from .select_best_move import pick_safest
+
+
+# the attributes of the world's pokemon read while generating instructions, or None when nothing is being recorded
+_read_attributes = None
+
+
+def _recorded_slot(name):
+    slot = getattr(Pokemon, name)
+
+    def get(self):
+        _read_attributes.add(name)
+        return slot.__get__(self, Pokemon)
+
+    def set(self, value):
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+class RecordedPokemon(Pokemon):
+    """A Pokemon that records which of its attributes are read
+    A world's pokemon has its class changed to this while instructions are generated for it,
+    so only the reads made by the instruction generation are recorded"""
+    __slots__ = ()
+
+
+for _name in Pokemon.__slots__:
+    setattr(RecordedPokemon, _name, _recorded_slot(_name))
+
+
+class World:
+    """One of the states searched together by `get_multi_world_payoff_matrices`
+    The states of the worlds searched together are the same except for one of the opponent's pokemon: the world's
+    pokemon. This is the opponent's active pokemon at the root of the search, whose set is not known"""
+    __slots__ = ('mutator', 'pokemon')
+
+    def __init__(self, mutator, pokemon):
+        self.mutator = mutator
+        self.pokemon = pokemon
+
+
+def get_world_key(state):
+    # states with the same key are the same except for the opponent's active pokemon, so they can be searched together
+    pokemon_id = state.opponent.active.id
+    return pokemon_id, tuple(
+        c for c in chain(state.hash_components(), state.unhashed_components())
+        if c[:2] != (constants.OPPONENT, pokemon_id)
+    )
+
+
+def get_state_instructions_for_worlds(worlds, user_move, opponent_move, search_stats=None):
+    """
+    Generates the instructions for the move pair once for each group of worlds that they are the same for
+    The instructions are generated for the first world while recording which attributes of its pokemon are read.
+    They are the same for every world whose pokemon has the same value for each of those attributes.
+    The instructions for the rest of the worlds are generated the same way
+
+    A switch that is reversed puts the pokemon switched out at the end of the reserve, so generating instructions
+    can change the order of the reserve. This order is the order of the switch options, which breaks ties between
+    equal switches. The instructions are only shared between worlds with the same order, and the order left by
+    generating them is copied to each of those worlds so that they are the same as if they had generated them
+
+    :return: a list of (the indexes of a group of worlds, the state-instructions for that group)
+    """
+    global _read_attributes
+
+    groups = list()
+    remaining_indexes = list(range(len(worlds)))
+    reserve_orders = [w.mutator.state.get_reserve_order() for w in worlds]
+    while remaining_indexes:
+        world = worlds[remaining_indexes[0]]
+        if len(remaining_indexes) == 1:
+            groups.append((remaining_indexes, get_state_instructions(world.mutator, user_move, opponent_move, search_stats)))
+            break
+
+        # generating instructions can evaluate states, e.g. to pick the pokemon switched in after u-turn
+        # the mutator's evaluation of the pokemon and the opponent's side-conditions is re-calculated when this happens
+        # so that the attributes it reads are recorded
+        world.mutator.pokemon_changed(constants.OPPONENT, world.pokemon)
+        world.mutator.side_conditions_changed(constants.OPPONENT)
+
+        # the instructions reaching the same state are combined by comparing the hashes of the states they reach
+        # the mutator reads every attribute that an instruction changes, so they are recorded and the states are the
+        # same for every world in the group. Calculating the hash from scratch reads every attribute, so it is done
+        # before recording so that the rest are not recorded
+        if config.combine_same_states:
+            world.mutator.state_hash
+
+        # instructions found in the transition-cache would not record any reads, so it is not used while recording
+        transition_cache = world.mutator.transition_cache
+        world.mutator.transition_cache = None
+        world.pokemon.__class__ = RecordedPokemon
+        _read_attributes = set()
+        try:
+            state_instructions = get_state_instructions(world.mutator, user_move, opponent_move, search_stats)
+            read_attributes = _read_attributes
+        finally:
+            world.pokemon.__class__ = Pokemon
+            _read_attributes = None
+            world.mutator.transition_cache = transition_cache
+
+        read_values = [getattr(world.pokemon, a) for a in read_attributes]
+        group_indexes = list()
+        other_indexes = list()
+        for i in remaining_indexes:
+            if reserve_orders[i] == reserve_orders[remaining_indexes[0]] and read_values == [getattr(worlds[i].pokemon, a) for a in read_attributes]:
+                group_indexes.append(i)
+            else:
+                other_indexes.append(i)
+
+        reserve_order = world.mutator.state.get_reserve_order()
+        if reserve_order != reserve_orders[remaining_indexes[0]]:
+            for i in group_indexes[1:]:
+                worlds[i].mutator.state.set_reserve_order(reserve_order)
+
+        if search_stats is not None:
+            search_stats.shared_instruction_generations += len(group_indexes) - 1
+
+        groups.append((group_indexes, state_instructions))
+        remaining_indexes = other_indexes
+
+    return groups
+
+
+def get_move_pair_scores(worlds, user_move, opponent_move, depth, transposition_table=None, deadline=None, probability_cutoff=None, path_probability=1, search_stats=None, evaluation_cache=None):
+    """
+    The same as `get_move_pair_score` without pruning, for each of the worlds
+    Each outcome is applied to every world in a group and the worlds are searched further together
+
+    :return: the expected score of the user and opponent using these moves in each of the worlds
+    """
+    scores = [0] * len(worlds)
+    for group_indexes, state_instructions in get_state_instructions_for_worlds(worlds, user_move, opponent_move, search_stats):
+        group = [worlds[i] for i in group_indexes]
+        for instructions in state_instructions:
+            for w in group:
+                w.mutator.apply(instructions.instructions)
+
+            outcome_probability = path_probability * instructions.percentage
+            if depth == 0:
+                t_scores = [evaluate_state(w.mutator, search_stats, evaluation_cache) for w in group]
+            elif probability_cutoff is not None and probability_cutoff.cuts(outcome_probability):
+                t_scores = [
+                    evaluate_state(w.mutator, search_stats, evaluation_cache) + WON_BATTLE*depth*w.mutator.state.battle_is_finished()
+                    for w in group
+                ]
+            else:
+                payoff_matrices = get_world_payoff_matrices(
+                    group,
+                    [w.mutator.state.get_all_options() for w in group],
+                    depth=depth,
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    probability_cutoff=probability_cutoff,
+                    path_probability=outcome_probability,
+                    search_stats=search_stats,
+                    evaluation_cache=evaluation_cache
+                )
+                t_scores = [pick_safest(payoff_matrix)[1] for payoff_matrix in payoff_matrices]
+
+            for i, t_score in zip(group_indexes, t_scores):
+                scores[i] += t_score * instructions.percentage
+
+            for w in group:
+                w.mutator.reverse(instructions.instructions)
+
+    return scores
+
+
+def merge_orders(sequences):
+    # returns every item of the sequences in an order that has the items of each sequence in the order they are in
+    # or None if there is no such order
+    merged = list()
+    remaining = [list(sequence) for sequence in sequences]
+    while any(remaining):
+        for sequence in remaining:
+            if sequence and not any(sequence[0] in other[1:] for other in remaining):
+                break
+        else:
+            return None
+
+        item = sequence[0]
+        merged.append(item)
+        for other in remaining:
+            if other and other[0] == item:
+                other.pop(0)
+
+    return merged
+
+
+def get_move_pairs(options):
+    """
+    Returns the move pairs of all of the worlds in an order that has the move pairs of each world in the order that
+    `get_payoff_matrix` searches them, or None if there is no such order
+    The order that a world searches its move pairs in changes the order of its reserve,
+    see `get_state_instructions_for_worlds`
+
+    :param options: a (user_options, opponent_options) tuple for each of the worlds
+    """
+    first_options = options[0]
+    if all(o == first_options for o in options):
+        user_options, opponent_options = first_options
+    else:
+        user_options = merge_orders([o[0] for o in options])
+        opponent_options = merge_orders([o[1] for o in options])
+        if user_options is None or opponent_options is None:
+            return None
+
+    return [(user_move, opponent_move) for user_move in user_options for opponent_move in opponent_options]
+
+
+def get_world_payoff_matrices(worlds, options, depth, transposition_table=None, deadline=None, probability_cutoff=None, path_probability=1, search_stats=None, evaluation_cache=None):
+    """
+    The same as `get_payoff_matrix` without pruning, for each of the worlds
+
+    :param worlds: the worlds that are searched together
+    :param options: a (user_options, opponent_options) tuple for each of the worlds
+    :return: a payoff-matrix for each of the worlds
+    """
+    if deadline is not None and deadline.expired():
+        raise SearchTimeout()
+
+    if search_stats is not None:
+        search_stats.nodes_per_depth[depth] += 1
+
+    payoff_matrices = [None] * len(worlds)
+    searched_indexes = list()
+    table_keys = dict()
+    table_path_probability = path_probability if probability_cutoff is not None else 0
+    for i, (world, (user_options, opponent_options)) in enumerate(zip(worlds, options)):
+        payoff_matrices[i] = get_terminal_payoff_matrix(world.mutator, user_options, opponent_options, depth, search_stats, evaluation_cache)
+        if payoff_matrices[i] is not None:
+            continue
+
+        if transposition_table is not None:
+            table_keys[i] = transposition_table.make_key(world.mutator.state_hash, user_options, opponent_options, depth - 1, False)
+            cached_scores = transposition_table.get_scores(table_keys[i], float('-inf'), table_path_probability)
+            if cached_scores is not None:
+                payoff_matrices[i] = dict(cached_scores)
+                continue
+
+        payoff_matrices[i] = dict()
+        searched_indexes.append(i)
+
+    depth -= 1
+
+    # the worlds can have different options, e.g. when the opponent's pokemon has different moves in each of them
+    # each move pair is searched in the worlds that have both of its options
+    # when there is no order of the move pairs that suits every world, the worlds with the same options are searched together
+    blocks = [searched_indexes]
+    move_pairs = get_move_pairs([options[i] for i in searched_indexes]) if searched_indexes else list()
+    if move_pairs is None:
+        blocks = dict()
+        for i in searched_indexes:
+            user_options, opponent_options = options[i]
+            blocks.setdefault((tuple(user_options), tuple(opponent_options)), list()).append(i)
+        blocks = list(blocks.values())
+
+    for block in blocks:
+        block_move_pairs = move_pairs if len(blocks) == 1 else get_move_pairs([options[block[0]]])
+        for user_move, opponent_move in block_move_pairs:
+            indexes = [i for i in block if user_move in options[i][0] and opponent_move in options[i][1]]
+            if not indexes:
+                continue
+
+            scores = get_move_pair_scores(
+                [worlds[i] for i in indexes],
+                user_move,
+                opponent_move,
+                depth,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                probability_cutoff=probability_cutoff,
+                path_probability=path_probability,
+                search_stats=search_stats,
+                evaluation_cache=evaluation_cache
+            )
+            for i, score in zip(indexes, scores):
+                payoff_matrices[i][(user_move, opponent_move)] = score
+
+    if transposition_table is not None:
+        for i in searched_indexes:
+            transposition_table.put_scores(table_keys[i], float('-inf'), table_path_probability, payoff_matrices[i])
+
+    return payoff_matrices
+
+
+def get_multi_world_payoff_matrices(searches, depth, prune=False, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None, transition_cache=None):
+    """
+    Has the same signature and result as `get_payoff_matrices`, but searches states that are the same except for the
+    opponent's active pokemon together. These are the battles made by `Battle.prepare_battles` for each of the
+    opponent's possible sets. The tree is walked once for all of them, and the instructions for a turn are only
+    generated again for the worlds where they depend on the attributes of the pokemon that are different.
+    Nothing is pruned, so the move_orderer is not used. The last turn is not scored by a LeafBatch
+    """
+    if prune:
+        raise ValueError("Searching multiple worlds together does not prune")
+
+    world_groups = dict()
+    for i, (state, _, _) in enumerate(searches):
+        world_groups.setdefault(get_world_key(state), list()).append(i)
+
+    payoff_matrices = [None] * len(searches)
+    for indexes in world_groups.values():
+        if len(indexes) == 1:
+            payoff_matrices[indexes[0]] = get_payoff_matrices(
+                [searches[indexes[0]]],
+                depth,
+                prune=False,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                probability_cutoff=probability_cutoff,
+                search_stats=search_stats,
+                evaluation_cache=evaluation_cache,
+                transition_cache=transition_cache
+            )[0]
+            continue
+
+        worlds = list()
+        for i in indexes:
+            state = searches[i][0]
+
+            # a search leaves the state modified when it times-out so a copy is searched when there is a deadline
+            if deadline is not None:
+                state = deepcopy(state)
+            worlds.append(World(StateMutator(state, transition_cache), state.opponent.active))
+
+        try:
+            group_payoff_matrices = get_world_payoff_matrices(
+                worlds,
+                [searches[i][1:] for i in indexes],
+                depth,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                probability_cutoff=probability_cutoff,
+                search_stats=search_stats,
+                evaluation_cache=evaluation_cache
+            )
+        finally:
+            if search_stats is not None:
+                for w in worlds:
+                    search_stats.record_mutator(w.mutator)
+
+        for i, payoff_matrix in zip(indexes, group_payoff_matrices):
+            payoff_matrices[i] = payoff_matrix
+
+    return payoff_matrices
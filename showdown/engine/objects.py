@@ -1,9 +1,14 @@
 from collections import defaultdict
 from copy import copy
+from hashlib import blake2b
 
 import constants
 from data import all_move_json
 
+from .evaluate import evaluate
+from .evaluate import evaluate_pokemon
+from .evaluate import evaluate_side_conditions
+
 
 boost_multiplier_lookup = {
     -6: 2/8,
@@ -22,6 +27,43 @@ boost_multiplier_lookup = {
 }
 
 
+boost_attribute_lookup = {
+    constants.ATTACK: 'attack_boost',
+    constants.DEFENSE: 'defense_boost',
+    constants.SPECIAL_ATTACK: 'special_attack_boost',
+    constants.SPECIAL_DEFENSE: 'special_defense_boost',
+    constants.SPEED: 'speed_boost',
+    constants.ACCURACY: 'accuracy_boost',
+    constants.EVASION: 'evasion_boost',
+}
+
+
+# the most keys kept in `_component_keys`. The keys are re-made the same way, so the table can be cleared when it is full
+COMPONENT_KEY_TABLE_SIZE = 1 << 20
+
+# component -> its 64-bit key
+_component_keys = dict()
+
+
+def make_component_key(component):
+    # python's hash() can not be used for the keys: hash(-1) == hash(-2), so a boost of -1 and -2 would hash the same
+    # the key is made from the component's repr so that it is the same in every process
+    return int.from_bytes(blake2b(repr(component).encode(), digest_size=8).digest(), 'little')
+
+
+def hash_component(component):
+    # the state-hash is the XOR of a 64-bit key for each of these components (zobrist hashing)
+    # the keys are not random: each is made from the component by `make_component_key`, so it is the same every time
+    # a mutation XORs out the component's old value and XORs in its new value
+    try:
+        return _component_keys[component]
+    except KeyError:
+        if len(_component_keys) >= COMPONENT_KEY_TABLE_SIZE:
+            _component_keys.clear()
+        key = _component_keys[component] = make_component_key(component)
+        return key
+
+
 class State(object):
     __slots__ = ('self', 'opponent', 'weather', 'field', 'trick_room')
 
@@ -107,6 +149,39 @@ class State(object):
 
         return False
 
+    def hash(self):
+        # a full re-computation of the 64-bit hash that the StateMutator keeps up to date
+        state_hash = 0
+        for component in self.hash_components():
+            state_hash ^= hash_component(component)
+        return state_hash
+
+    def equivalence_key(self):
+        # states with the same key are searched the same way: they have the same value for everything the engine reads
+        # this is the hash's components along with the few things the engine reads that are not hashed
+        return tuple(self.hash_components()) + tuple(self.unhashed_components())
+
+    def get_reserve_order(self):
+        # reversing a switch puts the pokemon switched out at the end of the reserve, so this order can change
+        return tuple(self.self.reserve), tuple(self.opponent.reserve)
+
+    def set_reserve_order(self, reserve_order):
+        self_reserve_order, opponent_reserve_order = reserve_order
+        self.self.reserve = {pkmn_id: self.self.reserve[pkmn_id] for pkmn_id in self_reserve_order}
+        self.opponent.reserve = {pkmn_id: self.opponent.reserve[pkmn_id] for pkmn_id in opponent_reserve_order}
+
+    def unhashed_components(self):
+        for side_string, side in ((constants.SELF, self.self), (constants.OPPONENT, self.opponent)):
+            for pkmn in [side.active] + list(side.reserve.values()):
+                yield from pkmn.unhashed_components(side_string)
+
+    def hash_components(self):
+        yield from self.self.hash_components(constants.SELF)
+        yield from self.opponent.hash_components(constants.OPPONENT)
+        yield constants.WEATHER, self.weather
+        yield constants.FIELD, self.field
+        yield constants.TRICK_ROOM, self.trick_room
+
     @classmethod
     def from_dict(cls, state_dict):
         return State(
@@ -159,6 +234,16 @@ class Side(object):
         else:
             return False
 
+    def hash_components(self, side_string):
+        yield side_string, constants.ACTIVE, self.active.id
+        yield from self.active.hash_components(side_string)
+        for pkmn in self.reserve.values():
+            yield from pkmn.hash_components(side_string)
+        yield side_string, constants.WISH, self.wish
+        for condition, count in self.side_conditions.items():
+            if count:
+                yield side_string, constants.SIDE_CONDITIONS, condition, count
+
     @classmethod
     def from_dict(cls, side_dict):
         return Side(
@@ -168,6 +253,14 @@ class Side(object):
             defaultdict(int, side_dict[constants.SIDE_CONDITIONS])
         )
 
+    def __getstate__(self):
+        # the side-conditions are usually a defaultdict with a lambda as its default, which cannot be pickled
+        return self.active, self.reserve, self.wish, dict(self.side_conditions)
+
+    def __setstate__(self, state):
+        self.active, self.reserve, self.wish, side_conditions = state
+        self.side_conditions = defaultdict(int, side_conditions)
+
     def __repr__(self):
         return str({
             constants.ACTIVE: self.active,
@@ -260,6 +353,32 @@ class Pokemon(object):
         # it is calculated here to save time during evaluation
         self.burn_multiplier = self.calculate_burn_multiplier()
 
+    def hash_components(self, side_string):
+        yield side_string, self.id, self.level, self.ability, tuple(m[constants.ID] for m in self.moves), self.burn_multiplier
+        yield side_string, self.id, constants.TYPES, tuple(self.types)
+        yield side_string, self.id, constants.ITEM, self.item
+        yield side_string, self.id, constants.STATS, self.stats_tuple()
+        yield side_string, self.id, constants.HITPOINTS, self.hp
+        yield side_string, self.id, constants.STATUS, self.status
+        for attribute in boost_attribute_lookup.values():
+            yield side_string, self.id, attribute, getattr(self, attribute)
+        for volatile_status in self.volatile_status:
+            yield side_string, self.id, constants.VOLATILE_STATUS, volatile_status
+        for move in self.moves:
+            if move.get(constants.DISABLED):
+                yield side_string, self.id, constants.DISABLED, move[constants.ID]
+
+    def unhashed_components(self, side_string):
+        # a disabled move is re-enabled at the end of the turn only if it has pp left
+        yield side_string, self.id, constants.CURRENT_PP, tuple(bool(m.get(constants.CURRENT_PP)) for m in self.moves)
+
+        # stance change re-calculates the pokemon's stats from its nature and evs
+        if self.ability == 'stancechange':
+            yield side_string, self.id, constants.NATURE, self.nature, tuple(self.evs)
+
+    def stats_tuple(self):
+        return self.maxhp, self.attack, self.defense, self.special_attack, self.special_defense, self.speed
+
     def calculate_burn_multiplier(self):
         # this will result in a positive evaluation for a burned pokemon
         if self.ability in ['guts', 'marvelscale', 'quickfeet']:
@@ -440,10 +559,98 @@ class TransposeInstruction:
             self.frozen == other.frozen
 
 
+class InstructionCursor:
+    """The instructions applied to a StateMutator's state by the stages of generating a turn's instructions
+    Each stage looks at the state reached by one of the branches generated so far. A branch shares most of its
+    instructions with the branch looked at before it, so the cursor only reverses its instructions after the first
+    one that is different, and applies the rest of the branch's instructions from there.
+
+    While a turn is being generated, `get_all_state_instructions` holds the cursor: the state is left where the last
+    stage moved it to and is only returned to the start of the turn once the turn is done. When it is not held,
+    the state is returned to where the cursor started after each stage"""
+    __slots__ = ('mutator', 'instructions', 'held')
+
+    def __init__(self, mutator):
+        self.mutator = mutator
+        self.instructions = list()
+        self.held = False
+
+    def move_to(self, instructions):
+        # changes the state to the one reached by applying `instructions` to the state that the cursor started from
+        applied = self.instructions
+        if instructions[:len(applied)] == applied:
+            # the usual case of a stage moving further down the branch that the cursor is on
+            common = len(applied)
+        else:
+            common = 0
+            shortest = min(len(applied), len(instructions))
+            while common < shortest and applied[common] == instructions[common]:
+                common += 1
+
+        if common < len(applied):
+            self.mutator.reverse(applied[common:])
+            del applied[common:]
+        if common < len(instructions):
+            self.mutator.apply(instructions[common:])
+            applied.extend(instructions[common:])
+
+    def apply(self, instructions):
+        # applies instructions on top of the ones the cursor is at
+        self.mutator.apply(instructions)
+        self.instructions.extend(instructions)
+
+    def apply_one(self, instruction):
+        self.mutator.apply_one(instruction)
+        self.instructions.append(instruction)
+
+    def release(self):
+        # called by a stage once it is done looking at the state
+        if not self.held:
+            self.move_to([])
+
+
 class StateMutator:
 
-    def __init__(self, state):
+    # set to True to check the evaluation kept by each StateMutator against `evaluate` after every apply and reverse
+    # this is very slow and is only meant for finding a mutation that the evaluation is not kept up to date with
+    check_evaluation = False
+
+    # the bot's side is added to the evaluation and the opponent's side is subtracted
+    evaluation_signs = {constants.SELF: 1, constants.OPPONENT: -1}
+
+    def __init__(self, state, transition_cache=None):
         self.state = state
+
+        # an optional TransitionCache of the instructions generated for the states reached by this object
+        self.transition_cache = transition_cache
+
+        # the EffectiveMoveCache of the moves modified while generating instructions for this object's state
+        # it is made by find_state_instructions the first time it is needed, so it is never shared between searches
+        self.effective_move_cache = None
+
+        # a 64-bit hash of the state that is kept up to date as instructions are applied and reversed
+        # it is calculated the first time it is used. After that, the state must only be modified
+        # through this object for the hash to stay accurate
+        self._state_hash = None
+
+        # a hash of the state's unhashed components. Instructions do not change these, so it is only calculated once
+        self._unhashed_hash = None
+
+        # the same as `evaluate(state)`, kept up to date in the same way as the hash
+        # the score of each pokemon and each side's side-conditions are kept so that only the ones that a mutation
+        # has changed are re-calculated. They are re-calculated the next time the evaluation is read
+        self._evaluation = None
+        self._pokemon_evaluations = dict()
+        self._side_condition_evaluations = dict()
+        self._changed_pokemon = dict()
+        self._changed_side_conditions = set()
+
+        # the number of instructions applied and reversed by this object
+        self.apply_count = 0
+        self.reverse_count = 0
+
+        self.cursor = InstructionCursor(self)
+
         self.apply_instructions = {
             constants.MUTATOR_SWITCH: self.switch,
             constants.MUTATOR_APPLY_VOLATILE_STATUS: self.apply_volatile_status,
@@ -494,195 +701,343 @@ class StateMutator:
         }
 
     def apply_one(self, instruction):
+        self.apply_count += 1
         method = self.apply_instructions[instruction[0]]
         method(*instruction[1:])
+        if self.check_evaluation:
+            self.assert_evaluation_is_accurate()
 
     def apply(self, instructions):
+        self.apply_count += len(instructions)
         for instruction in instructions:
             method = self.apply_instructions[instruction[0]]
             method(*instruction[1:])
+        if self.check_evaluation:
+            self.assert_evaluation_is_accurate()
 
     def reverse(self, instructions):
+        self.reverse_count += len(instructions)
         for instruction in reversed(instructions):
             method = self.reverse_instructions[instruction[0]]
             method(*instruction[1:])
+        if self.check_evaluation:
+            self.assert_evaluation_is_accurate()
 
     def get_side(self, side):
         return getattr(self.state, side)
 
-    def disable_move(self, side, move_name):
-        side = self.get_side(side)
+    @property
+    def state_hash(self):
+        if self._state_hash is None:
+            self._state_hash = self.state.hash()
+        return self._state_hash
+
+    @property
+    def unhashed_hash(self):
+        # the components are hashed as a set because a switch changes the order of the pokemon they come from
+        if self._unhashed_hash is None:
+            self._unhashed_hash = hash(frozenset(self.state.unhashed_components()))
+        return self._unhashed_hash
+
+    # the callers check that the hash is being kept before building the components, so that a search that never
+    # reads the hash does not pay for it. The keys are looked up directly because this is done for almost every instruction
+    def update_hash(self, old_component, new_component):
         try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
-            raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
-
-        move[constants.DISABLED] = True
+            self._state_hash ^= _component_keys[old_component] ^ _component_keys[new_component]
+        except KeyError:
+            self._state_hash ^= hash_component(old_component) ^ hash_component(new_component)
 
-    def enable_move(self, side, move_name):
-        side = self.get_side(side)
+    def toggle_hash(self, component):
+        try:
+            self._state_hash ^= _component_keys[component]
+        except KeyError:
+            self._state_hash ^= hash_component(component)
+
+    @property
+    def evaluation(self):
+        if self._evaluation is None:
+            self._evaluation = 0
+            for side_string in self.evaluation_signs:
+                side = self.get_side(side_string)
+                for pkmn in [side.active] + list(side.reserve.values()):
+                    self._changed_pokemon[(side_string, pkmn.id)] = pkmn
+                self._changed_side_conditions.add(side_string)
+
+        for (side_string, pkmn_id), pkmn in self._changed_pokemon.items():
+            pokemon_evaluation = evaluate_pokemon(pkmn)
+            self._evaluation += self.evaluation_signs[side_string] * (pokemon_evaluation - self._pokemon_evaluations.get((side_string, pkmn_id), 0))
+            self._pokemon_evaluations[(side_string, pkmn_id)] = pokemon_evaluation
+
+        for side_string in self._changed_side_conditions:
+            side_condition_evaluation = evaluate_side_conditions(self.get_side(side_string), count_unrevealed_pokemon=side_string == constants.OPPONENT)
+            self._evaluation += self.evaluation_signs[side_string] * (side_condition_evaluation - self._side_condition_evaluations.get(side_string, 0))
+            self._side_condition_evaluations[side_string] = side_condition_evaluation
+
+        self._changed_pokemon.clear()
+        self._changed_side_conditions.clear()
+        return self._evaluation
+
+    def side_conditions_changed(self, side_string):
+        if self._evaluation is not None:
+            self._changed_side_conditions.add(side_string)
+
+    def pokemon_changed(self, side_string, pkmn):
+        # the mutations below check that the evaluation is being kept and mark the pokemon they change themselves
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
+
+    def assert_evaluation_is_accurate(self):
+        if self._evaluation is not None and self.evaluation != evaluate(self.state):
+            raise AssertionError("Incremental evaluation {} does not match evaluate: {}".format(self.evaluation, evaluate(self.state)))
+
+    def set_move_disabled(self, side_string, move_name, disabled):
+        side = self.get_side(side_string)
         try:
             move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
         except StopIteration:
             raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
 
-        move[constants.DISABLED] = False
+        if self._state_hash is not None and bool(move.get(constants.DISABLED)) != disabled:
+            self.toggle_hash((side_string, side.active.id, constants.DISABLED, move_name))
+        move[constants.DISABLED] = disabled
+
+    def disable_move(self, side, move_name):
+        self.set_move_disabled(side, move_name, True)
+
+    def enable_move(self, side, move_name):
+        self.set_move_disabled(side, move_name, False)
 
-    def switch(self, side, _, switch_pokemon_name):
+    def switch(self, side_string, _, switch_pokemon_name):
         # the second parameter to this function is the current active pokemon
         # this value must be here for reversing purposes
-        side = self.get_side(side)
+        side = self.get_side(side_string)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, constants.ACTIVE, side.active.id),
+                (side_string, constants.ACTIVE, switch_pokemon_name)
+            )
 
         side.reserve[side.active.id] = side.active
         side.active = side.reserve.pop(switch_pokemon_name)
 
+        # the number of alive reserve pokemon changes the score of some side-conditions
+        if self._evaluation is not None:
+            self._changed_side_conditions.add(side_string)
+
     def reverse_switch(self, side, previous_active, current_active):
         self.switch(side, current_active, previous_active)
 
-    def apply_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
-        side.active.volatile_status.add(volatile_status)
-
-    def remove_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
-        side.active.volatile_status.remove(volatile_status)
+    def apply_volatile_status(self, side_string, volatile_status):
+        pkmn = self.get_side(side_string).active
+        if self._state_hash is not None and volatile_status not in pkmn.volatile_status:
+            self.toggle_hash((side_string, pkmn.id, constants.VOLATILE_STATUS, volatile_status))
+        pkmn.volatile_status.add(volatile_status)
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
+
+    def remove_volatile_status(self, side_string, volatile_status):
+        pkmn = self.get_side(side_string).active
+        pkmn.volatile_status.remove(volatile_status)
+        if self._state_hash is not None:
+            self.toggle_hash((side_string, pkmn.id, constants.VOLATILE_STATUS, volatile_status))
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
 
     def damage(self, side, amount):
-        side = self.get_side(side)
-        side.active.hp -= amount
-
-    def heal(self, side, amount):
-        side = self.get_side(side)
-        side.active.hp += amount
-
-    def boost(self, side, stat, amount):
-        side = self.get_side(side)
-        if stat == constants.ATTACK:
-            side.active.attack_boost += amount
-        elif stat == constants.DEFENSE:
-            side.active.defense_boost += amount
-        elif stat == constants.SPECIAL_ATTACK:
-            side.active.special_attack_boost += amount
-        elif stat == constants.SPECIAL_DEFENSE:
-            side.active.special_defense_boost += amount
-        elif stat == constants.SPEED:
-            side.active.speed_boost += amount
-        elif stat == constants.ACCURACY:
-            side.active.accuracy_boost += amount
-        elif stat == constants.EVASION:
-            side.active.evasion_boost += amount
-        else:
+        self.heal(side, -1*amount)
+
+    def heal(self, side_string, amount):
+        pkmn = self.get_side(side_string).active
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, pkmn.id, constants.HITPOINTS, pkmn.hp),
+                (side_string, pkmn.id, constants.HITPOINTS, pkmn.hp + amount)
+            )
+        pkmn.hp += amount
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
+
+    def boost(self, side_string, stat, amount):
+        side = self.get_side(side_string)
+        try:
+            attribute = boost_attribute_lookup[stat]
+        except KeyError:
             raise ValueError("Invalid stat: {}".format(stat))
 
+        pkmn = side.active
+        old_boost = getattr(pkmn, attribute)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, pkmn.id, attribute, old_boost),
+                (side_string, pkmn.id, attribute, old_boost + amount)
+            )
+        setattr(pkmn, attribute, old_boost + amount)
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
+
     def unboost(self, side, stat, amount):
         self.boost(side, stat, -1*amount)
 
-    def apply_status(self, side, status):
-        side = self.get_side(side)
-        side.active.status = status
+    def apply_status(self, side_string, status):
+        pkmn = self.get_side(side_string).active
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, pkmn.id, constants.STATUS, pkmn.status),
+                (side_string, pkmn.id, constants.STATUS, status)
+            )
+        pkmn.status = status
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, pkmn.id)] = pkmn
 
     def remove_status(self, side, _):
         # the second parameter of this function is the status being removed
         # this value must be here for reverse purposes
         self.apply_status(side, None)
 
-    def side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] += amount
+    def side_start(self, side_string, effect, amount):
+        side = self.get_side(side_string)
+        old_count = side.side_conditions[effect]
+        new_count = old_count + amount
+        if self._state_hash is not None:
+            if old_count:
+                self.toggle_hash((side_string, constants.SIDE_CONDITIONS, effect, old_count))
+            if new_count:
+                self.toggle_hash((side_string, constants.SIDE_CONDITIONS, effect, new_count))
+        side.side_conditions[effect] = new_count
+        if self._evaluation is not None:
+            self._changed_side_conditions.add(side_string)
 
     def reverse_side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.side_start(side, effect, -1*amount)
 
     def side_end(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.side_start(side, effect, -1*amount)
 
     def reverse_side_end(self, side, effect, amount):
         self.side_start(side, effect, amount)
 
+    def set_wish(self, side_string, wish):
+        side = self.get_side(side_string)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, constants.WISH, side.wish),
+                (side_string, constants.WISH, wish)
+            )
+        side.wish = wish
+
     def start_wish(self, side, health, _):
         # the third parameter is the current wish amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.wish = (2, health)
+        self.set_wish(side, (2, health))
 
     def reserve_start_wish(self, side, _, previous_wish_amount):
-        side = self.get_side(side)
-        side.wish = (0, previous_wish_amount)
+        self.set_wish(side, (0, previous_wish_amount))
 
     def decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] - 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self.set_wish(side, (wish[0] - 1, wish[1]))
 
     def reverse_decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] + 1, side.wish[1])
+        wish = self.get_side(side).wish
+        self.set_wish(side, (wish[0] + 1, wish[1]))
+
+    def set_weather(self, weather):
+        if self._state_hash is not None:
+            self.update_hash((constants.WEATHER, self.state.weather), (constants.WEATHER, weather))
+        self.state.weather = weather
 
     def start_weather(self, weather, _):
         # the second parameter is the current weather
         # the value is here for reversing purposes
-        self.state.weather = weather
+        self.set_weather(weather)
 
     def reverse_start_weather(self, _, old_weather):
-        self.state.weather = old_weather
+        self.set_weather(old_weather)
+
+    def set_field(self, field):
+        if self._state_hash is not None:
+            self.update_hash((constants.FIELD, self.state.field), (constants.FIELD, field))
+        self.state.field = field
 
     def start_field(self, field, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = field
+        self.set_field(field)
 
     def reverse_start_field(self, _, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def end_field(self, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = None
+        self.set_field(None)
 
     def reverse_end_field(self, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def toggle_trickroom(self):
+        if self._state_hash is not None:
+            self.update_hash(
+                (constants.TRICK_ROOM, self.state.trick_room),
+                (constants.TRICK_ROOM, self.state.trick_room ^ True)
+            )
         self.state.trick_room ^= True
 
+    def set_types(self, side_string, types):
+        side = self.get_side(side_string)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, side.active.id, constants.TYPES, tuple(side.active.types)),
+                (side_string, side.active.id, constants.TYPES, tuple(types))
+            )
+        side.active.types = types
+
     def change_types(self, side, new_types, _):
         # the third parameter is the current types of the active pokemon
         # they must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.types = new_types
+        self.set_types(side, new_types)
 
     def reverse_change_types(self, side, _, old_types):
-        side = self.get_side(side)
-        side.active.types = old_types
+        self.set_types(side, old_types)
+
+    def set_item(self, side_string, item):
+        side = self.get_side(side_string)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, side.active.id, constants.ITEM, side.active.item),
+                (side_string, side.active.id, constants.ITEM, item)
+            )
+        side.active.item = item
 
     def change_item(self, side, new_item, _):
         # the third parameter is the current item
         # it must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.item = new_item
+        self.set_item(side, new_item)
 
     def reverse_change_item(self, side, _, old_item):
-        side = self.get_side(side)
-        side.active.item = old_item
+        self.set_item(side, old_item)
+
+    def set_stats(self, side_string, stats):
+        side = self.get_side(side_string)
+        if self._state_hash is not None:
+            self.update_hash(
+                (side_string, side.active.id, constants.STATS, side.active.stats_tuple()),
+                (side_string, side.active.id, constants.STATS, tuple(stats[:6]))
+            )
+        side.active.maxhp = stats[0]
+        side.active.attack = stats[1]
+        side.active.defense = stats[2]
+        side.active.special_attack = stats[3]
+        side.active.special_defense = stats[4]
+        side.active.speed = stats[5]
+        if self._evaluation is not None:
+            self._changed_pokemon[(side_string, side.active.id)] = side.active
 
     def change_stats(self, side, new_stats, _):
         # the third parameter is the old stats
         # is must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.maxhp = new_stats[0]
-        side.active.attack = new_stats[1]
-        side.active.defense = new_stats[2]
-        side.active.special_attack = new_stats[3]
-        side.active.special_defense = new_stats[4]
-        side.active.speed = new_stats[5]
+        self.set_stats(side, new_stats)
 
     def reverse_change_stats(self, side, _, old_stats):
         # the second parameter are the new stats
-        side = self.get_side(side)
-        side.active.maxhp = old_stats[0]
-        side.active.attack = old_stats[1]
-        side.active.defense = old_stats[2]
-        side.active.special_attack = old_stats[3]
-        side.active.special_defense = old_stats[4]
-        side.active.speed = old_stats[5]
+        self.set_stats(side, old_stats)
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+
+from .move_ordering import MoveOrderer
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least-recently-used entry once it is full
+    Hits, misses, and evictions are counted so that the effectiveness of a cache can be logged"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_counts(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0
+        return self.hits / lookups
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return "{}(entries={}, hits={}, misses={}, evictions={}, hit_rate={})".format(
+            self.__class__.__name__,
+            len(self.entries),
+            self.hits,
+            self.misses,
+            self.evictions,
+            round(self.hit_rate(), 3)
+        )
+
+
+class TranspositionTable(LRUCache):
+    """Caches the payoff-matrices calculated by `get_payoff_matrix`
+    The same state is often reached through different move orders or chance outcomes.
+    A payoff-matrix only depends on the state, the remaining depth, the options for each side, and whether or not
+    the search is pruned, so these make up the key. The state is identified by the hash kept by the StateMutator.
+
+    A pruned payoff-matrix also depends on the alpha it was searched with: only the rows scoring at least alpha
+    are exact. It can be re-used by a search with the same or a higher alpha, so the alpha is stored with it.
+
+    When there is a ProbabilityCutoff, a payoff-matrix reached with a lower chance has more of its outcomes
+    approximated. It can be re-used by a search reaching the state with the same or a lower chance"""
+
+    @staticmethod
+    def make_key(state_hash, user_options, opponent_options, depth, prune):
+        return state_hash, depth, tuple(user_options), tuple(opponent_options), prune
+
+    def get_scores(self, key, alpha, path_probability=1):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] > alpha or entry[1] < path_probability:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put_scores(self, key, alpha, path_probability, scores):
+        self.put(key, (alpha, path_probability, scores))
+
+
+class EvaluationCache(LRUCache):
+    """Caches the scores given by `evaluate`, keyed by the hash kept by the StateMutator
+    Different branches of a search often reach the same state: a move that misses and a move that is protected
+    against, a status move into a pokemon that is immune to it, or the same damage from different rolls"""
+
+
+class TransitionCache(LRUCache):
+    """Caches the instructions generated by `get_all_state_instructions` for a state and a pair of moves
+    The same turn is generated again by the nested searches that pick the pokemon switched in after a faint or u-turn,
+    and for the same state reached by different branches of a search.
+    The instructions only depend on the state and the moves. The state is identified by the hash kept by the
+    StateMutator, along with the few things the engine reads that are not hashed and the order of each side's reserve.
+
+    Generating the instructions can change the order of the reserve, which is the order of the switch options.
+    The order left by generating them is stored with the instructions so that it is the same after a hit"""
+
+    @staticmethod
+    def make_key(mutator, user_move, opponent_move):
+        return mutator.state_hash, mutator.unhashed_hash, mutator.state.get_reserve_order(), user_move, opponent_move
+
+
+class SearchCarryOver:
+    """Keeps a battle's TranspositionTable and MoveOrderer from one decision to the next
+    The state reached after a turn was usually searched by the previous decision as one of the outcomes of the move
+    pair that was used. Its payoff-matrices are found in the transposition-table by the state's hash, so iterative
+    deepening gets through the depths that were already searched quickly and spends its time on the next depth.
+    Only the searches run in the bot's process use the carried over transposition-table, a SearchExecutor's workers
+    have their own.
+
+    The copies of a battle made for each decision share its SearchCarryOver: `deepcopy` returns the same object"""
+
+    def __init__(self, transposition_table_size, move_ordering):
+        self.transposition_table = TranspositionTable(transposition_table_size) if transposition_table_size else None
+        self.move_orderer = MoveOrderer() if move_ordering else None
+        self.searches = 0
+
+    def start_search(self):
+        # returns the transposition_table and move_orderer for the next decision's search
+        # the counts are reset so that what is logged after the search is for that decision only
+        if self.transposition_table is not None:
+            self.transposition_table.reset_counts()
+        if self.move_orderer is not None:
+            self.move_orderer.age()
+
+        self.searches += 1
+        return self.transposition_table, self.move_orderer
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return "{}(searches={}, transposition_table={}, move_orderer={})".format(
+            self.__class__.__name__,
+            self.searches,
+            self.transposition_table,
+            self.move_orderer
+        )
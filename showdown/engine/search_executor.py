@@ -0,0 +1,274 @@
+import atexit
+import logging
+import multiprocessing
+
+import config
+from data.mods.apply_mods import apply_mods
+
+from .evaluate import Scoring
+from .objects import StateMutator
+from .select_best_move import get_payoff_matrix
+from .select_best_move import get_terminal_payoff_matrix
+from .select_best_move import get_move_pair_score
+from .select_best_move import move_item_to_front_of_list
+from .select_best_move import SearchTimeout
+from .select_best_move import SearchStats
+from .search_cache import TranspositionTable
+from .search_cache import EvaluationCache
+from .search_cache import TransitionCache
+
+logger = logging.getLogger(__name__)
+
+
+def get_search_settings():
+    # values read during a search that may change after the worker processes have started
+    return (
+        Scoring.POKEMON_ALIVE_STATIC,
+        config.damage_calc_type,
+        config.transposition_table_size,
+        config.evaluation_cache_size,
+        config.transition_cache_size,
+        config.batch_evaluation
+    )
+
+
+def apply_search_settings(search_settings):
+    (
+        Scoring.POKEMON_ALIVE_STATIC,
+        config.damage_calc_type,
+        config.transposition_table_size,
+        config.evaluation_cache_size,
+        config.transition_cache_size,
+        config.batch_evaluation
+    ) = search_settings
+
+
+def get_worker_caches():
+    # each worker's search has its own transposition-table, evaluation-cache, and transition-cache
+    transposition_table = TranspositionTable(config.transposition_table_size) if config.transposition_table_size else None
+    evaluation_cache = EvaluationCache(config.evaluation_cache_size) if config.evaluation_cache_size else None
+    transition_cache = TransitionCache(config.transition_cache_size) if config.transition_cache_size else None
+    return transposition_table, evaluation_cache, transition_cache
+
+
+# the best row-minimum found so far by any worker taking part in a root-split search
+# this is a multiprocessing.Value given to each worker when it starts
+shared_best_score = None
+
+
+def initialize_worker(pokemon_mode, best_score):
+    global shared_best_score
+    shared_best_score = best_score
+
+    # a worker that was not forked from the main process starts without the mods for the game-mode
+    # the mods only overwrite values so applying them to a forked worker has no further effect
+    if pokemon_mode is not None:
+        apply_mods(pokemon_mode)
+
+
+def search_in_worker(search_settings, state, user_options, opponent_options, depth, prune, deadline, move_orderer, probability_cutoff, search_stats):
+    # returns the payoff-matrix and the search_stats, which are a copy of the caller's
+    apply_search_settings(search_settings)
+    transposition_table, evaluation_cache, transition_cache = get_worker_caches()
+    mutator = StateMutator(state, transition_cache)
+    scores = get_payoff_matrix(
+        mutator,
+        user_options,
+        opponent_options,
+        depth=depth,
+        prune=prune,
+        transposition_table=transposition_table,
+        deadline=deadline,
+        move_orderer=move_orderer,
+        probability_cutoff=probability_cutoff,
+        search_stats=search_stats,
+        evaluation_cache=evaluation_cache
+    )
+    if search_stats is not None:
+        search_stats.record_mutator(mutator)
+    return scores, search_stats
+
+
+def search_root_cells_in_worker(search_settings, state, user_move, opponent_options, depth, prune, deadline, move_orderer, probability_cutoff, search_stats):
+    """
+    Scores the root cells for `user_move` and each of the opponent_options
+    When pruning, this is one row of the root's payoff-matrix. The rest of the row is skipped once a cell scores lower
+    than the best row-minimum found by any worker, and this row's minimum is shared with the other workers when it is done
+
+    :param depth: the remaining depth after the root's turn
+    :return: a dictionary of the scores for each cell in the order they appear in the payoff-matrix,
+             and the search_stats, which are a copy of the caller's
+    """
+    apply_search_settings(search_settings)
+    transposition_table, evaluation_cache, transition_cache = get_worker_caches()
+    mutator = StateMutator(state, transition_cache)
+
+    if prune and move_orderer is not None:
+        opponent_options = move_orderer.order_opponent_options(mutator, opponent_options, depth)
+
+    row_scores = dict()
+    worst_score_for_this_row = float('inf')
+    skip = False
+    for opponent_move in opponent_options[:]:
+        if skip:
+            row_scores[(user_move, opponent_move)] = float('nan')
+            continue
+
+        score = get_move_pair_score(
+            mutator,
+            user_move,
+            opponent_move,
+            depth,
+            prune=prune,
+            transposition_table=transposition_table,
+            deadline=deadline,
+            best_score=shared_best_score.value if prune else float('-inf'),
+            move_orderer=move_orderer,
+            probability_cutoff=probability_cutoff,
+            search_stats=search_stats,
+            evaluation_cache=evaluation_cache
+        )
+        row_scores[(user_move, opponent_move)] = score
+
+        if score < worst_score_for_this_row:
+            worst_score_for_this_row = score
+
+        if prune and score < shared_best_score.value:
+            skip = True
+            opponent_options = move_item_to_front_of_list(opponent_options, opponent_move)
+            if search_stats is not None:
+                search_stats.pruned_rows += 1
+
+    if prune:
+        with shared_best_score.get_lock():
+            if worst_score_for_this_row > shared_best_score.value:
+                shared_best_score.value = worst_score_for_this_row
+
+    if search_stats is not None:
+        search_stats.record_mutator(mutator)
+    return row_scores, search_stats
+
+
+class SearchExecutor:
+    """Searches several states at the same time using a pool of worker processes
+    The pool is started the first time it is needed and is re-used by every decision after that.
+    Each state is pickled and sent to a worker, so a worker's search never modifies the caller's state.
+
+    A single state is split at the root: each worker scores a row of the payoff-matrix when pruning,
+    or a single cell when not pruning. Only one search can be run at a time because the workers
+    share the best row-minimum of the search that is running"""
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._pool = None
+        self._best_score = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            logger.debug("Starting {} search processes".format(self.processes))
+            self._best_score = multiprocessing.Value('d', float('-inf'))
+            self._pool = multiprocessing.Pool(
+                self.processes,
+                initializer=initialize_worker,
+                initargs=(config.pokemon_mode, self._best_score)
+            )
+        return self._pool
+
+    def get_payoff_matrices(self, searches, depth, prune=True, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None, transition_cache=None):
+        """
+        Has the same signature and result as `get_payoff_matrices`
+        The transposition_table, evaluation_cache, and transition_cache are not used because each worker has its own.
+        Each worker is sent a copy of the move_orderer and probability_cutoff, so what the workers count is not kept.
+        The work counted in each worker's search_stats is added to the search_stats given here
+        """
+        if len(searches) == 1:
+            return [self.get_payoff_matrix_split_at_root(*searches[0], depth, prune=prune, deadline=deadline, move_orderer=move_orderer, probability_cutoff=probability_cutoff, search_stats=search_stats)]
+
+        search_settings = get_search_settings()
+        worker_search_stats = SearchStats() if search_stats is not None else None
+        results = [
+            self.pool.apply_async(
+                search_in_worker,
+                (search_settings, state, user_options, opponent_options, depth, prune, deadline, move_orderer, probability_cutoff, worker_search_stats)
+            )
+            for state, user_options, opponent_options in searches
+        ]
+
+        # a SearchTimeout raised in a worker is re-raised here
+        payoff_matrices = list()
+        for r in results:
+            scores, this_search_stats = r.get()
+            payoff_matrices.append(scores)
+            if search_stats is not None:
+                search_stats.merge(this_search_stats)
+
+        return payoff_matrices
+
+    def get_payoff_matrix_split_at_root(self, state, user_options, opponent_options, depth, prune=True, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None):
+        """
+        Has the same result as `get_payoff_matrix`, except that different cells may be skipped when pruning
+        because the rows are searched at the same time instead of one after another
+        """
+        if deadline is not None and deadline.expired():
+            raise SearchTimeout()
+
+        if search_stats is not None:
+            search_stats.nodes_per_depth[depth] += 1
+
+        terminal_scores = get_terminal_payoff_matrix(StateMutator(state), user_options, opponent_options, depth, search_stats)
+        if terminal_scores is not None:
+            return terminal_scores
+
+        pool = self.pool
+        self._best_score.value = float('-inf')
+
+        search_settings = get_search_settings()
+        worker_search_stats = SearchStats() if search_stats is not None else None
+        if prune:
+            tasks = [(user_move, opponent_options) for user_move in user_options]
+        else:
+            tasks = [(user_move, [opponent_move]) for user_move in user_options for opponent_move in opponent_options]
+
+        results = [
+            pool.apply_async(
+                search_root_cells_in_worker,
+                (search_settings, state, user_move, task_opponent_options, depth - 1, prune, deadline, move_orderer, probability_cutoff, worker_search_stats)
+            )
+            for user_move, task_opponent_options in tasks
+        ]
+
+        cell_scores = dict()
+        for r in results:
+            these_cell_scores, this_search_stats = r.get()
+            cell_scores.update(these_cell_scores)
+            if search_stats is not None:
+                search_stats.merge(this_search_stats)
+
+        return {
+            (user_move, opponent_move): cell_scores[(user_move, opponent_move)]
+            for user_move in user_options
+            for opponent_move in opponent_options
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+_search_executor = None
+
+
+def get_search_executor():
+    """Returns the SearchExecutor shared by all battles, or None if searches are to be run in this process
+    Its worker processes are shut down when the bot exits"""
+    global _search_executor
+    if config.search_processes <= 1:
+        return None
+
+    if _search_executor is None:
+        _search_executor = SearchExecutor(config.search_processes)
+        atexit.register(_search_executor.shutdown)
+    return _search_executor
@@ -1,14 +1,206 @@
 import math
+import time
+import logging
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
+import config
 
-from .evaluate import evaluate
+from .evaluate import highest_possible_evaluation
 from .find_state_instructions import get_all_state_instructions
+from .objects import StateMutator
+
+logger = logging.getLogger(__name__)
 
 
 WON_BATTLE = 100
 
+# names of the phases timed by SearchStats
+PREPARE_BATTLES_PHASE = 'prepare_battles'
+SEARCH_PHASE = 'search'
+INSTRUCTION_GENERATION_PHASE = 'instruction_generation'
+EVALUATION_PHASE = 'evaluation'
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchDeadline:
+    """The wall-clock time that a search must finish by
+    A deadline can be cancelled from another thread to stop a search that is running"""
+
+    def __init__(self, seconds):
+        self.end_time = time.time() + seconds
+
+    def expired(self):
+        return time.time() > self.end_time
+
+    def cancel(self):
+        self.end_time = float('-inf')
+
+
+class SearchStats:
+    """Counts the work done by the searches for one decision
+    This shows whether a slow decision came from the number of states searched,
+    generating the instructions for each turn, or evaluating the states"""
+
+    def __init__(self):
+        # the remaining depth -> the number of payoff-matrices searched with that depth
+        self.nodes_per_depth = defaultdict(int)
+
+        self.instruction_generation_calls = 0
+        self.outcomes_generated = 0
+        self.instructions_generated = 0
+        self.applied_instructions = 0
+        self.reversed_instructions = 0
+        self.evaluate_calls = 0
+        self.pruned_rows = 0
+        self.chance_cuts = 0
+
+        # the number of times a world searched by `get_multi_world_payoff_matrices` re-used another world's instructions
+        self.shared_instruction_generations = 0
+
+        # the number of root cells that a double-oracle search of the nash_equilibrium bot did not need to score
+        self.unsearched_cells = 0
+
+        # the name of a phase of the decision -> the seconds spent in it
+        self.phase_times = defaultdict(float)
+
+    def record_instruction_generation(self, state_instructions, seconds):
+        self.instruction_generation_calls += 1
+        self.outcomes_generated += len(state_instructions)
+        self.instructions_generated += sum(len(i.instructions) for i in state_instructions)
+        self.phase_times[INSTRUCTION_GENERATION_PHASE] += seconds
+
+    def record_evaluation(self, seconds, states=1):
+        self.evaluate_calls += states
+        self.phase_times[EVALUATION_PHASE] += seconds
+
+    def record_mutator(self, mutator):
+        self.applied_instructions += mutator.apply_count
+        self.reversed_instructions += mutator.reverse_count
+
+    def record_phase(self, phase, seconds):
+        self.phase_times[phase] += seconds
+
+    def merge(self, other):
+        for depth, nodes in other.nodes_per_depth.items():
+            self.nodes_per_depth[depth] += nodes
+        for phase, seconds in other.phase_times.items():
+            self.phase_times[phase] += seconds
+
+        self.instruction_generation_calls += other.instruction_generation_calls
+        self.outcomes_generated += other.outcomes_generated
+        self.instructions_generated += other.instructions_generated
+        self.applied_instructions += other.applied_instructions
+        self.reversed_instructions += other.reversed_instructions
+        self.evaluate_calls += other.evaluate_calls
+        self.pruned_rows += other.pruned_rows
+        self.chance_cuts += other.chance_cuts
+        self.shared_instruction_generations += other.shared_instruction_generations
+        self.unsearched_cells += other.unsearched_cells
+
+    def __repr__(self):
+        return (
+            "{}(nodes_per_depth={}, instruction_generation_calls={}, outcomes_generated={}, instructions_generated={}, "
+            "applied_instructions={}, reversed_instructions={}, evaluate_calls={}, pruned_rows={}, chance_cuts={}, "
+            "shared_instruction_generations={}, unsearched_cells={}, phase_times={})"
+        ).format(
+            self.__class__.__name__,
+            dict(sorted(self.nodes_per_depth.items(), reverse=True)),
+            self.instruction_generation_calls,
+            self.outcomes_generated,
+            self.instructions_generated,
+            self.applied_instructions,
+            self.reversed_instructions,
+            self.evaluate_calls,
+            self.pruned_rows,
+            self.chance_cuts,
+            self.shared_instruction_generations,
+            self.unsearched_cells,
+            {phase: round(seconds, 3) for phase, seconds in self.phase_times.items()}
+        )
+
+
+def get_state_instructions(mutator, user_move, opponent_move, search_stats=None):
+    # the instructions are taken from the mutator's transition_cache when it has them
+    transition_cache = mutator.transition_cache
+    if transition_cache is not None:
+        key = transition_cache.make_key(mutator, user_move, opponent_move)
+        entry = transition_cache.get(key)
+        if entry is not None:
+            state_instructions, reserve_order = entry
+            if reserve_order != key[2]:
+                mutator.state.set_reserve_order(reserve_order)
+            return state_instructions
+
+    if search_stats is None:
+        state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, config.combine_same_states)
+    else:
+        start_time = time.time()
+        state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, config.combine_same_states)
+        search_stats.record_instruction_generation(state_instructions, time.time() - start_time)
+
+    if transition_cache is not None:
+        transition_cache.put(key, (state_instructions, mutator.state.get_reserve_order()))
+    return state_instructions
+
+
+def evaluate_state(mutator, search_stats=None, evaluation_cache=None):
+    # the same as `evaluate(mutator.state)`. The mutator keeps the evaluation up to date as instructions are applied
+    # and reversed, so only the pokemon and side-conditions changed since it was last read are scored again
+    # a state already in the evaluation_cache is not scored again
+    if evaluation_cache is not None:
+        score = evaluation_cache.get(mutator.state_hash)
+        if score is not None:
+            return score
+
+    if search_stats is None:
+        score = mutator.evaluation
+    else:
+        start_time = time.time()
+        score = mutator.evaluation
+        search_stats.record_evaluation(time.time() - start_time)
+
+    if evaluation_cache is not None:
+        evaluation_cache.put(mutator.state_hash, score)
+    return score
+
+
+class ProbabilityCutoff:
+    """Stops the search from expanding outcomes that are unlikely to happen
+    An outcome is scored with `evaluate` instead of being searched further when the chance of reaching it from the
+    root of the search is lower than epsilon. This chance is the product of the outcomes' percentages along the way.
+    The number of outcomes scored this way and their total chance are counted so that they can be logged"""
+
+    def __init__(self, epsilon):
+        self.epsilon = epsilon
+        self.approximated_branches = 0
+        self.searched_branches = 0
+
+        # summed over every cell of the search, so this can be more than 1
+        self.approximated_probability = 0
+
+    def cuts(self, path_probability):
+        if path_probability < self.epsilon:
+            self.approximated_branches += 1
+            self.approximated_probability += path_probability
+            return True
+
+        self.searched_branches += 1
+        return False
+
+    def __repr__(self):
+        return "{}(epsilon={}, approximated_branches={}, searched_branches={}, approximated_probability={})".format(
+            self.__class__.__name__,
+            self.epsilon,
+            self.approximated_branches,
+            self.searched_branches,
+            round(self.approximated_probability, 4)
+        )
+
 
 def remove_guaranteed_opponent_moves(score_lookup):
     """This method removes enemy moves from the score-lookup that do not give the bot a choice.
@@ -42,9 +234,14 @@ def remove_guaranteed_opponent_moves(score_lookup):
 
 
 def pick_safest(score_lookup):
-    modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup)
-    if not modified_score_lookup:
+    # a pruned row's cells that were not searched could show that the bot has a choice against an opponent's move
+    # so the opponent's guaranteed moves are only removed from a payoff-matrix that has no pruned cells
+    if any(math.isnan(score) for score in score_lookup.values()):
         modified_score_lookup = score_lookup
+    else:
+        modified_score_lookup = remove_guaranteed_opponent_moves(score_lookup)
+        if not modified_score_lookup:
+            modified_score_lookup = score_lookup
     worst_case = defaultdict(lambda: (tuple(), float('inf')))
     for move_pair, result in modified_score_lookup.items():
         if worst_case[move_pair[0]][1] > result:
@@ -62,32 +259,158 @@ def move_item_to_front_of_list(l, item):
     return [l[i] for i in all_indicies]
 
 
-def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True):
+def get_terminal_payoff_matrix(mutator, user_options, opponent_options, depth, search_stats=None, evaluation_cache=None):
+    """
+    Returns the payoff-matrix for a state that is not searched any further, or None if the state should be searched
+    This is the case when the battle is over, or when the opponent has no moves
+    """
+    winner = mutator.state.battle_is_finished()
+    if winner:
+        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate_state(mutator, search_stats, evaluation_cache) + WON_BATTLE*depth*winner}
+
+    # if the battle is not over, but the opponent has no moves - we want to return the user options as moves
+    # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
+    # has reserves left that are unseen
+    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
+        score = evaluate_state(mutator, search_stats, evaluation_cache)
+        return {(user_option, constants.DO_NOTHING_MOVE): score for user_option in user_options}
+
+    return None
+
+
+def get_highest_possible_score(depth):
+    """The highest score that `get_move_pair_score` can give a cell when searching `depth` more turns after this one"""
+    return highest_possible_evaluation() + WON_BATTLE*depth
+
+
+def get_move_pair_score(mutator, user_move, opponent_move, depth, prune=True, transposition_table=None, deadline=None, best_score=float('-inf'), move_orderer=None, probability_cutoff=None, path_probability=1, search_stats=None, evaluation_cache=None):
+    """
+    :param depth: the remaining depth after this turn. The resulting states are evaluated when this is 0
+    :param best_score: the score this cell must beat to be of any use. Once the outcomes searched so far prove that
+                       the cell cannot beat it, the rest of the outcomes are not searched and an upper-bound on the
+                       cell's score is returned instead. This upper-bound is still lower than best_score.
+                       Each outcome's search is given the score it must reach for the cell to beat best_score
+    :param probability_cutoff: an optional ProbabilityCutoff used to avoid searching unlikely outcomes
+    :param path_probability: the chance of reaching the mutator's state from the root of the search
+    :param search_stats: an optional SearchStats that the work done is counted in
+    :return: the expected score of the user and opponent using these moves from the mutator's state
+    """
+    score = 0
+    state_instructions = get_state_instructions(mutator, user_move, opponent_move, search_stats)
+
+    # the chance of the outcomes that have not been searched yet
+    # each of those outcomes scores at most highest_possible_score
+    remaining_percentage = 1
+    highest_possible_score = get_highest_possible_score(depth) if best_score > float('-inf') else None
+
+    for instructions in state_instructions:
+        mutator.apply(instructions.instructions)
+        outcome_probability = path_probability * instructions.percentage
+        if depth == 0:
+            t_score = evaluate_state(mutator, search_stats, evaluation_cache)
+        elif probability_cutoff is not None and probability_cutoff.cuts(outcome_probability):
+            winner = mutator.state.battle_is_finished()
+            t_score = evaluate_state(mutator, search_stats, evaluation_cache) + WON_BATTLE*depth*winner
+        else:
+            # the lowest score this outcome can have for the cell to beat best_score
+            # assuming that the outcomes after this one have the highest possible score
+            alpha = float('-inf')
+            if highest_possible_score is not None and instructions.percentage:
+                alpha = (best_score - score - (remaining_percentage - instructions.percentage) * highest_possible_score) / instructions.percentage
+
+            next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
+            t_score = pick_safest(
+                get_payoff_matrix(
+                    mutator,
+                    next_turn_user_options,
+                    next_turn_opponent_options,
+                    depth=depth,
+                    prune=prune,
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    move_orderer=move_orderer,
+                    alpha=alpha,
+                    probability_cutoff=probability_cutoff,
+                    path_probability=outcome_probability,
+                    search_stats=search_stats,
+                    evaluation_cache=evaluation_cache
+                )
+            )[1]
+        score += t_score * instructions.percentage
+        mutator.reverse(instructions.instructions)
+
+        if highest_possible_score is not None:
+            remaining_percentage = max(0, remaining_percentage - instructions.percentage)
+            upper_bound = score + remaining_percentage * highest_possible_score
+            if remaining_percentage and upper_bound < best_score:
+                if search_stats is not None:
+                    search_stats.chance_cuts += 1
+                return upper_bound
+
+    return score
+
+
+def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True, transposition_table=None, deadline=None, move_orderer=None, alpha=float('-inf'), probability_cutoff=None, path_probability=1, search_stats=None, evaluation_cache=None):
     """
     :param mutator: a StateMutator object representing the state of the battle
     :param user_options: options for the bot
     :param opponent_options: options for the opponent
     :param depth: the remaining depth before the state is evaluated
     :param prune: specify whether or not to prune the tree
+    :param transposition_table: an optional TranspositionTable used to re-use the results of states already searched
+    :param deadline: an optional SearchDeadline. SearchTimeout is raised once it expires and the mutator's state is
+                     left part-way through the search
+    :param move_orderer: an optional MoveOrderer used to search the options in an order that prunes more rows
+    :param alpha: when pruning, the score the safest row must reach to be of any use to the caller.
+                  Rows that score lower than alpha are pruned, so if no row reaches alpha the payoff-matrix only
+                  proves that the safest row scores lower than alpha. Rows that do reach alpha are scored exactly
+    :param probability_cutoff: an optional ProbabilityCutoff. Outcomes that are less likely than its epsilon to be
+                               reached from the root of the search are scored with `evaluate` instead of searched
+    :param path_probability: the chance of reaching the mutator's state from the root of the search
+    :param search_stats: an optional SearchStats that the work done is counted in
+    :param evaluation_cache: an optional EvaluationCache used to avoid scoring the same state more than once
     :return: a dictionary representing the potential move combinations and their associated scores
     """
+    if deadline is not None and deadline.expired():
+        raise SearchTimeout()
 
-    winner = mutator.state.battle_is_finished()
-    if winner:
-        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate(mutator.state) + WON_BATTLE*depth*winner}
+    if search_stats is not None:
+        search_stats.nodes_per_depth[depth] += 1
+
+    terminal_scores = get_terminal_payoff_matrix(mutator, user_options, opponent_options, depth, search_stats, evaluation_cache)
+    if terminal_scores is not None:
+        return terminal_scores
 
     depth -= 1
 
-    # if the battle is not over, but the opponent has no moves - we want to return the user options as moves
-    # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
-    # has reserves left that are unseen
-    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
-        return {(user_option, constants.DO_NOTHING_MOVE): evaluate(mutator.state) for user_option in user_options}
+    if transposition_table is not None:
+        # without a probability_cutoff nothing is approximated, so the payoff-matrix can be re-used however likely
+        # the state is to be reached. This includes re-using it as the root of the next decision's search
+        table_path_probability = path_probability if probability_cutoff is not None else 0
+        table_key = transposition_table.make_key(mutator.state_hash, user_options, opponent_options, depth, prune)
+        cached_scores = transposition_table.get_scores(table_key, alpha, table_path_probability)
+        if cached_scores is not None:
+            return dict(cached_scores)
+
+    if depth == 0 and not prune and config.batch_evaluation:
+        state_scores = get_last_turn_payoff_matrix(mutator, user_options, opponent_options, search_stats, evaluation_cache)
+        if transposition_table is not None:
+            transposition_table.put_scores(table_key, alpha, table_path_probability, state_scores)
+        return state_scores
 
     state_scores = dict()
 
-    best_score = float('-inf')
-    for i, user_move in enumerate(user_options):
+    # ordering only changes which cells are skipped so it is not needed when nothing is pruned
+    # the scores are put back in the original order afterwards so that ties are broken the same way
+    ordered_user_options = user_options
+    original_opponent_options = opponent_options
+    if prune and move_orderer is not None:
+        ordered_user_options = move_orderer.order_user_options(mutator, user_options, depth)
+        opponent_options = move_orderer.order_opponent_options(mutator, opponent_options, depth)
+
+    best_score = alpha if prune else float('-inf')
+    best_user_move = None
+    for i, user_move in enumerate(ordered_user_options):
         worst_score_for_this_row = float('inf')
         skip = False
 
@@ -98,24 +421,21 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
                 state_scores[(user_move, opponent_move)] = float('nan')
                 continue
 
-            score = 0
-            state_instructions = get_all_state_instructions(mutator, user_move, opponent_move)
-            if depth == 0:
-                for instructions in state_instructions:
-                    mutator.apply(instructions.instructions)
-                    t_score = evaluate(mutator.state)
-                    score += (t_score * instructions.percentage)
-                    mutator.reverse(instructions.instructions)
-
-            else:
-                for instructions in state_instructions:
-                    this_percentage = instructions.percentage
-                    mutator.apply(instructions.instructions)
-                    next_turn_user_options, next_turn_opponent_options = mutator.state.get_all_options()
-                    safest = pick_safest(get_payoff_matrix(mutator, next_turn_user_options, next_turn_opponent_options, depth=depth, prune=prune))
-                    score += safest[1] * this_percentage
-                    mutator.reverse(instructions.instructions)
-
+            score = get_move_pair_score(
+                mutator,
+                user_move,
+                opponent_move,
+                depth,
+                prune=prune,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                best_score=best_score if prune else float('-inf'),
+                move_orderer=move_orderer,
+                probability_cutoff=probability_cutoff,
+                path_probability=path_probability,
+                search_stats=search_stats,
+                evaluation_cache=evaluation_cache
+            )
             state_scores[(user_move, opponent_move)] = score
 
             if score < worst_score_for_this_row:
@@ -128,7 +448,175 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
                 # move this item to the front of the list to prune faster
                 opponent_options = move_item_to_front_of_list(opponent_options, opponent_move)
 
+                if move_orderer is not None:
+                    move_orderer.record_cutoff(opponent_move, depth, j)
+                if search_stats is not None:
+                    search_stats.pruned_rows += 1
+
         if worst_score_for_this_row > best_score:
             best_score = worst_score_for_this_row
+            best_user_move = user_move
+
+    if prune and move_orderer is not None:
+        if best_user_move is not None:
+            move_orderer.record_best_row(best_user_move, depth)
+        state_scores = {
+            (user_move, opponent_move): state_scores[(user_move, opponent_move)]
+            for user_move in user_options
+            for opponent_move in original_opponent_options
+        }
+
+    if transposition_table is not None:
+        transposition_table.put_scores(table_key, alpha, table_path_probability, state_scores)
 
     return state_scores
+
+
+def get_last_turn_payoff_matrix(mutator, user_options, opponent_options, search_stats=None, evaluation_cache=None):
+    """
+    Scores every cell of a payoff-matrix the same as `get_move_pair_score` does with a depth of 0
+    All of the resulting states are collected first and then scored together by a LeafBatch.
+    Nothing is pruned, so this is only used by searches that do not prune
+    """
+    # numpy is only needed when batch evaluation is turned on
+    from .batch_evaluate import LeafBatch
+
+    leaf_batch = LeafBatch()
+    cells = list()
+
+    # the score of each resulting state, or None if it is scored by the leaf_batch
+    leaf_scores = list()
+    batched_state_hashes = list()
+    for user_move in user_options:
+        for opponent_move in opponent_options:
+            state_instructions = get_state_instructions(mutator, user_move, opponent_move, search_stats)
+            for instructions in state_instructions:
+                mutator.apply(instructions.instructions)
+                score = evaluation_cache.get(mutator.state_hash) if evaluation_cache is not None else None
+                if score is None:
+                    leaf_batch.add(mutator.state)
+                    batched_state_hashes.append(mutator.state_hash)
+                leaf_scores.append(score)
+                mutator.reverse(instructions.instructions)
+            cells.append(((user_move, opponent_move), state_instructions))
+
+    start_time = time.time()
+    batch_scores = leaf_batch.evaluate()
+    if search_stats is not None:
+        search_stats.record_evaluation(time.time() - start_time, len(leaf_batch))
+
+    if evaluation_cache is not None:
+        for state_hash, score in zip(batched_state_hashes, batch_scores):
+            evaluation_cache.put(state_hash, score)
+
+    batch_scores = iter(batch_scores)
+    leaf_scores = iter([next(batch_scores) if score is None else score for score in leaf_scores])
+
+    state_scores = dict()
+    for move_pair, state_instructions in cells:
+        score = 0
+        for instructions in state_instructions:
+            score += next(leaf_scores) * instructions.percentage
+        state_scores[move_pair] = score
+
+    return state_scores
+
+
+def get_payoff_matrices(searches, depth, prune=True, transposition_table=None, deadline=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None, transition_cache=None):
+    """
+    Searches each of the states one after another
+
+    :param searches: a list of (state, user_options, opponent_options) tuples
+    :param depth: the depth to search each state to
+    :param prune: specify whether or not to prune the tree
+    :param transposition_table: an optional TranspositionTable shared by all of the searches
+    :param deadline: an optional SearchDeadline
+    :param move_orderer: an optional MoveOrderer shared by all of the searches
+    :param probability_cutoff: an optional ProbabilityCutoff shared by all of the searches
+    :param search_stats: an optional SearchStats shared by all of the searches
+    :param evaluation_cache: an optional EvaluationCache shared by all of the searches
+    :param transition_cache: an optional TransitionCache shared by all of the searches
+    :return: a list of payoff-matrices in the same order as `searches`
+    """
+    payoff_matrices = list()
+    for state, user_options, opponent_options in searches:
+        # a search leaves the state modified when it times-out so a copy is searched when there is a deadline
+        if deadline is not None:
+            state = deepcopy(state)
+        mutator = StateMutator(state, transition_cache)
+        try:
+            payoff_matrices.append(
+                get_payoff_matrix(
+                    mutator,
+                    user_options,
+                    opponent_options,
+                    depth=depth,
+                    prune=prune,
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    move_orderer=move_orderer,
+                    probability_cutoff=probability_cutoff,
+                    search_stats=search_stats,
+                    evaluation_cache=evaluation_cache
+                )
+            )
+        finally:
+            if search_stats is not None:
+                search_stats.record_mutator(mutator)
+    return payoff_matrices
+
+
+def get_payoff_matrices_iterative_deepening(searches, time_budget, max_depth, prune=True, transposition_table=None, executor=None, move_orderer=None, probability_cutoff=None, search_stats=None, evaluation_cache=None, transition_cache=None, search_function=None):
+    """
+    Searches to a depth of 1, then 2, and so on until `max_depth` is reached or the time budget runs out
+    The payoff-matrices from the deepest search that completed are returned.
+    The first depth is always completed so that there is always an answer
+
+    :param searches: a list of (state, user_options, opponent_options) tuples
+    :param time_budget: the number of seconds that the searches may take
+    :param max_depth: the deepest search that will be attempted
+    :param prune: specify whether or not to prune the tree
+    :param transposition_table: an optional TranspositionTable shared by all of the searches
+    :param executor: an optional SearchExecutor used to run the searches in parallel
+    :param move_orderer: an optional MoveOrderer. What it learns at one depth orders the search of the next depth
+    :param probability_cutoff: an optional ProbabilityCutoff shared by all of the searches
+    :param search_stats: an optional SearchStats shared by all of the searches
+    :param evaluation_cache: an optional EvaluationCache shared by all of the searches
+    :param transition_cache: an optional TransitionCache shared by all of the searches
+    :param search_function: an optional function with the same signature as `get_payoff_matrices` that is used to
+                            search each depth instead of the executor's or `get_payoff_matrices`
+    :return: a tuple of (a list of payoff-matrices in the same order as `searches`, the depth they were searched to)
+    """
+    if search_function is None:
+        search_function = executor.get_payoff_matrices if executor is not None else get_payoff_matrices
+    deadline = SearchDeadline(time_budget)
+
+    payoff_matrices = None
+    completed_depth = 0
+    for depth in range(1, max_depth + 1):
+        # the first depth is given no deadline so that there is always an answer
+        this_deadline = deadline if depth > 1 else None
+        try:
+            this_depth_payoff_matrices = search_function(
+                searches,
+                depth,
+                prune=prune,
+                transposition_table=transposition_table,
+                deadline=this_deadline,
+                move_orderer=move_orderer,
+                probability_cutoff=probability_cutoff,
+                search_stats=search_stats,
+                evaluation_cache=evaluation_cache,
+                transition_cache=transition_cache
+            )
+        except SearchTimeout:
+            logger.debug("Ran out of time searching to a depth of {}".format(depth))
+            break
+
+        payoff_matrices = this_depth_payoff_matrices
+        completed_depth = depth
+
+        if deadline.expired():
+            break
+
+    return payoff_matrices, completed_depth
@@ -13,6 +13,8 @@ from showdown.engine.evaluate import Scoring
 from showdown.battle import Pokemon
 from showdown.battle import LastUsedMove
 from showdown.battle_modifier import async_update_battle
+from showdown.battle_bots.helpers import ponder
+from showdown.engine.select_best_move import SearchDeadline
 
 from showdown.websocket_client import PSWebsocketClient
 
@@ -27,16 +29,24 @@ def battle_is_finished(battle_tag, msg):
     )
 
 
-async def async_pick_move(battle):
+def copy_battle_for_search(battle):
     battle_copy = deepcopy(battle)
     if battle_copy.request_json:
         battle_copy.user.from_json(battle_copy.request_json)
+    return battle_copy
+
+
+async def async_pick_move(battle):
+    battle_copy = copy_battle_for_search(battle)
 
     loop = asyncio.get_event_loop()
     with concurrent.futures.ThreadPoolExecutor() as pool:
         best_move = await loop.run_in_executor(
             pool, battle_copy.find_best_move
         )
+    if battle_copy.search_stats is not None:
+        logger.debug("Search stats: {}".format(battle_copy.search_stats))
+    battle.decision = battle_copy.decision
     choice = best_move[0]
     if constants.SWITCH_STRING in choice:
         battle.user.last_used_move = LastUsedMove(battle.user.active.name, "switch {}".format(choice.split()[-1]), battle.turn)
@@ -45,6 +55,35 @@ async def async_pick_move(battle):
     return best_move
 
 
+class Pondering:
+    """Searches for the next decision in a background thread while the opponent is choosing their move
+    It is stopped as soon as the next turn or request arrives, before the battle is updated"""
+
+    # messages that mean the opponent has chosen and the bot is about to decide again
+    STOP_MESSAGES = ('|turn|', '|request|')
+
+    def __init__(self, battle):
+        self.deadline = SearchDeadline(float('inf'))
+        loop = asyncio.get_event_loop()
+        self.future = loop.run_in_executor(
+            None, ponder, copy_battle_for_search(battle), battle.decision, self.deadline
+        )
+
+    def should_stop(self, msg):
+        return any(m in msg for m in self.STOP_MESSAGES)
+
+    async def stop(self):
+        # the search shares the battle's transposition-table so it must finish before the next search starts
+        self.deadline.cancel()
+        try:
+            states_searched = await self.future
+        except Exception:
+            # pondering only saves time later so a failure must not stop the battle
+            logger.exception("Pondering failed")
+        else:
+            logger.debug("Pondered states at each depth: {}".format(states_searched))
+
+
 async def handle_team_preview(battle, ps_websocket_client):
     battle_copy = deepcopy(battle)
     battle_copy.user.active = Pokemon.get_dummy()
@@ -176,8 +215,13 @@ async def start_battle(ps_websocket_client, pokemon_battle_type):
 
 async def pokemon_battle(ps_websocket_client, pokemon_battle_type):
     battle = await start_battle(ps_websocket_client, pokemon_battle_type)
+    pondering = None
     while True:
         msg = await ps_websocket_client.receive_message()
+        if pondering is not None and (pondering.should_stop(msg) or battle_is_finished(battle.battle_tag, msg)):
+            await pondering.stop()
+            pondering = None
+
         if battle_is_finished(battle.battle_tag, msg):
             if constants.WIN_STRING in msg:
                 winner = msg.split(constants.WIN_STRING)[-1].split('\n')[0].strip()
@@ -190,5 +234,12 @@ async def pokemon_battle(ps_websocket_client, pokemon_battle_type):
         else:
             action_required = await async_update_battle(battle, msg)
             if action_required and not battle.wait:
+                if pondering is not None:
+                    await pondering.stop()
+                    pondering = None
+
                 best_move = await async_pick_move(battle)
                 await ps_websocket_client.send_message(battle.battle_tag, best_move)
+
+                if config.ponder and battle.can_ponder and battle.search_carry_over is not None:
+                    pondering = Pondering(battle)
@@ -1,5 +1,6 @@
 import unittest
 from unittest import mock
+from copy import deepcopy
 
 import constants
 
@@ -8,6 +9,7 @@ from showdown.battle import Battle
 from showdown.battle import Battler
 from showdown.battle import Pokemon
 from showdown.battle import Move
+from showdown.battle import merge_equivalent_battles
 
 
 # so we can instantiate a Battle object for testing
@@ -839,6 +841,70 @@ class TestBattlerActiveLockedIntoMove(unittest.TestCase):
         self.assertFalse(self.battler.active.get_move('doubleteam').disabled)
 
 
+class TestMergeEquivalentBattles(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle(None)
+        self.battle.user.active = Pokemon('Pikachu', 100)
+        self.battle.user.active.moves = [Move('thunderbolt')]
+        self.battle.opponent.active = Pokemon('Garchomp', 100)
+        self.battle.opponent.active.moves = [Move('earthquake'), Move('dragonclaw')]
+
+    def get_battles(self, count):
+        return [deepcopy(self.battle) for _ in range(count)]
+
+    def test_merges_spreads_that_give_the_same_stats(self):
+        battles = self.get_battles(3)
+        battles[0].opponent.active.set_spread('jolly', '0,252,0,0,4,252')
+        battles[1].opponent.active.set_spread('jolly', '0,252,0,0,5,252')
+        battles[2].opponent.active.set_spread('adamant', '0,252,0,0,4,252')
+
+        merged_battles = merge_equivalent_battles(battles)
+
+        self.assertEqual([battles[0], battles[2]], merged_battles)
+        self.assertEqual([2, 1], [b.set_weight for b in merged_battles])
+
+    def test_does_not_merge_different_items(self):
+        battles = self.get_battles(2)
+        battles[0].opponent.active.item = 'leftovers'
+        battles[1].opponent.active.item = 'choicescarf'
+
+        merged_battles = merge_equivalent_battles(battles)
+
+        self.assertEqual(battles, merged_battles)
+        self.assertEqual([1, 1], [b.set_weight for b in merged_battles])
+
+    def test_does_not_merge_different_moves(self):
+        battles = self.get_battles(2)
+        battles[1].opponent.active.moves.append(Move('swordsdance'))
+
+        merged_battles = merge_equivalent_battles(battles)
+
+        self.assertEqual(battles, merged_battles)
+
+    def test_weights_of_merged_battles_are_added_together(self):
+        battles = self.get_battles(2)
+        battles[0].set_weight = 2
+        battles[1].set_weight = 3
+
+        merged_battles = merge_equivalent_battles(battles)
+
+        self.assertEqual([battles[0]], merged_battles)
+        self.assertEqual(5, merged_battles[0].set_weight)
+
+    def test_does_not_merge_different_spreads_for_stancechange(self):
+        # stance change re-calculates the pokemon's stats from its evs
+        self.battle.opponent.active = Pokemon('Aegislash', 100)
+        self.battle.opponent.active.ability = 'stancechange'
+        self.battle.opponent.active.moves = [Move('shadowball'), Move('kingsshield')]
+        battles = self.get_battles(2)
+        battles[0].opponent.active.set_spread('modest', '252,0,4,252,0,0')
+        battles[1].opponent.active.set_spread('modest', '252,0,5,252,0,0')
+
+        merged_battles = merge_equivalent_battles(battles)
+
+        self.assertEqual(battles, merged_battles)
+
+
 class TestBattle(unittest.TestCase):
     def setUp(self):
         self.battle = Battle(None)
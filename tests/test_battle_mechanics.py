@@ -4819,6 +4819,23 @@ class TestBattleMechanics(unittest.TestCase):
 
         self.assertEqual(expected_instructions, instructions)
 
+    def test_flinch_that_is_removed_is_combined_with_no_flinch_when_combining_the_same_states(self):
+        bot_move = "doubleironbash"
+        opponent_move = "splash"
+
+        instructions = get_all_state_instructions(self.mutator, bot_move, opponent_move, combine_same_states=True)
+        expected_instructions = [
+            TransposeInstruction(
+                1.0,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.OPPONENT, 149)
+                ],
+                True
+            )
+        ]
+
+        self.assertEqual(expected_instructions, instructions)
+
     def test_stamina_increases_defence_when_hit_with_damaging_move(self):
         bot_move = "tackle"
         opponent_move = "splash"
@@ -11770,6 +11787,70 @@ class TestRemoveDuplicateInstructions(unittest.TestCase):
 
         self.assertEqual(expected_instructions, new_instructions)
 
+    def test_combines_instructions_with_a_list_in_them(self):
+        instructions = [
+            TransposeInstruction(0.5, [(constants.MUTATOR_CHANGE_TYPE, constants.SELF, ['fire'], ['electric'])], False),
+            TransposeInstruction(0.5, [(constants.MUTATOR_CHANGE_TYPE, constants.SELF, ['fire'], ['electric'])], False),
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions)
+
+        expected_instructions = [
+            TransposeInstruction(1.0, [(constants.MUTATOR_CHANGE_TYPE, constants.SELF, ['fire'], ['electric'])], False)
+        ]
+
+        self.assertEqual(expected_instructions, new_instructions)
+
+    def test_combines_instructions_that_reach_the_same_state(self):
+        instructions = [
+            TransposeInstruction(
+                0.3,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10),
+                    (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.OPPONENT, constants.FLINCH),
+                    (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.OPPONENT, constants.FLINCH)
+                ],
+                True
+            ),
+            TransposeInstruction(
+                0.7,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)
+                ],
+                False
+            )
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions, state_keys=[1, 1])
+
+        expected_instructions = [
+            TransposeInstruction(
+                1.0,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)
+                ],
+                True
+            )
+        ]
+
+        self.assertEqual(expected_instructions, new_instructions)
+
+    def test_keeps_instructions_that_reach_different_states(self):
+        instructions = [
+            TransposeInstruction(0.4, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False),
+            TransposeInstruction(0.3, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 11)], False),
+            TransposeInstruction(0.3, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 12)], False)
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions, state_keys=[1, 2, 1])
+
+        expected_instructions = [
+            TransposeInstruction(0.7, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False),
+            TransposeInstruction(0.3, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 11)], False)
+        ]
+
+        self.assertEqual(expected_instructions, new_instructions)
+
 
 class TestUserMovesFirst(unittest.TestCase):
     def setUp(self):
@@ -1,8 +1,35 @@
 import unittest
+from copy import deepcopy
 from unittest import mock
 
+import config
 from showdown.engine.select_best_move import pick_safest
+from showdown.engine.select_best_move import SearchStats
+from showdown.battle_bots.helpers import get_search_time_budget
+from showdown.battle_bots.helpers import get_likely_next_states
+from showdown.battle_bots.helpers import ponder
+from showdown.battle_bots.safest.main import BattleBot as SafestBattleBot
+from showdown.battle_bots.nash_equilibrium.main import BattleBot as NashBattleBot
+from showdown.battle import Pokemon
+from showdown.battle import Move
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_payoff_matrices
+from showdown.engine.select_best_move import SearchDeadline
+from showdown.battle_bots.mcts.main import MCTSNode
+from showdown.battle_bots.mcts.main import run_iteration
+from showdown.battle_bots.mcts.main import sample_transition
+from showdown.battle_bots.mcts.main import pick_most_visited_option
+from showdown.battle_bots.mcts.main import search_battles
+from showdown.battle_bots.mcts.main import BattleBot as MCTSBattleBot
+from showdown.engine.objects import StateMutator
+from showdown.engine.objects import TransposeInstruction
+
+from .test_select_best_move import get_small_search_state
 from showdown.battle_bots.nash_equilibrium.main import get_weighted_choices_from_multiple_score_lookups
+from showdown.battle_bots.nash_equilibrium.main import find_nash_equilibrium
+from showdown.battle_bots.nash_equilibrium.zero_sum import solve_zero_sum_game
+from showdown.battle_bots.nash_equilibrium.double_oracle import DoubleOracle
+from showdown.battle_bots.nash_equilibrium.double_oracle import get_double_oracle_payoff_matrices
 
 
 class TestPickSafest(unittest.TestCase):
@@ -165,3 +192,315 @@ class TestGetWeightedChoices(unittest.TestCase):
         expected_choices = [('a', 0.75), ('b', 0.25)]
 
         self.assertEqual(expected_choices, choices)
+
+    def test_score_lookups_are_weighted(self):
+        self.find_nash_mock.side_effect = [
+            (['a', 'b'], ['c', 'd'], [1, 0], [0, 1], None),
+            (['a', 'b'], ['c', 'd'], [0, 1], [0, 1], None),
+        ]
+        sl = {
+            ('a', 'c'): 0,
+            ('a', 'd'): 0,
+            ('b', 'c'): 0,
+            ('b', 'd'): 0,
+        }
+
+        choices = get_weighted_choices_from_multiple_score_lookups([sl, sl], weights=[3, 1])
+        expected_choices = [('a', 0.75), ('b', 0.25)]
+
+        self.assertEqual(expected_choices, choices)
+
+
+class TestSolveZeroSumGame(unittest.TestCase):
+    def assert_strategies_are_equal(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertAlmostEqual(e, a)
+
+    def test_rock_paper_scissors_is_played_evenly(self):
+        matrix = [
+            [0, -1, 1],
+            [1, 0, -1],
+            [-1, 1, 0],
+        ]
+        row_strategy, column_strategy, value = solve_zero_sum_game(matrix)
+
+        self.assert_strategies_are_equal([1/3, 1/3, 1/3], row_strategy)
+        self.assert_strategies_are_equal([1/3, 1/3, 1/3], column_strategy)
+        self.assertAlmostEqual(0, value)
+
+    def test_saddle_point_gives_pure_strategies(self):
+        matrix = [
+            [10, 20],
+            [5, -5],
+        ]
+        row_strategy, column_strategy, value = solve_zero_sum_game(matrix)
+
+        self.assert_strategies_are_equal([1, 0], row_strategy)
+        self.assert_strategies_are_equal([1, 0], column_strategy)
+        self.assertAlmostEqual(10, value)
+
+    def test_mixed_strategy_for_matching_pennies_with_different_payoffs(self):
+        matrix = [
+            [3, -1],
+            [-1, 1],
+        ]
+        row_strategy, column_strategy, value = solve_zero_sum_game(matrix)
+
+        self.assert_strategies_are_equal([1/3, 2/3], row_strategy)
+        self.assert_strategies_are_equal([1/3, 2/3], column_strategy)
+        self.assertAlmostEqual(1/3, value)
+
+    def test_strategies_guarantee_the_value_of_the_game(self):
+        matrix = [
+            [120, -30, 45, 10],
+            [-60, 80, 15, 0],
+            [35, 25, -90, 70],
+        ]
+        row_strategy, column_strategy, value = solve_zero_sum_game(matrix)
+
+        for column in range(4):
+            self.assertGreaterEqual(sum(row_strategy[row] * matrix[row][column] for row in range(3)), value - 1e-9)
+        for row in range(3):
+            self.assertLessEqual(sum(column_strategy[column] * matrix[row][column] for column in range(4)), value + 1e-9)
+
+    def test_find_nash_equilibrium_uses_the_zero_sum_solver(self):
+        score_lookup = {
+            ('a', 'c'): 3,
+            ('a', 'd'): -1,
+            ('b', 'c'): -1,
+            ('b', 'd'): 1,
+        }
+        with mock.patch.object(config, 'nash_solver', 'zero_sum'):
+            bot_choices, opponent_choices, bot_percentages, opponent_percentages, score = find_nash_equilibrium(score_lookup)
+
+        self.assertEqual(['a', 'b'], list(bot_choices))
+        self.assertEqual(['c', 'd'], list(opponent_choices))
+        self.assert_strategies_are_equal([1/3, 2/3], bot_percentages)
+        self.assertAlmostEqual(1/3, score)
+
+
+class TestDoubleOracle(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+
+    def get_searches(self):
+        return [(deepcopy(self.state), *self.state.get_all_options())]
+
+    @staticmethod
+    def get_value(score_lookup):
+        return find_nash_equilibrium(score_lookup)[4]
+
+    def get_double_oracle_scores(self, matrix):
+        # searches a DoubleOracle whose cells are scored from the matrix instead of searching a state
+        user_options = ['row{}'.format(i) for i in range(len(matrix))]
+        opponent_options = ['column{}'.format(j) for j in range(len(matrix[0]))]
+        double_oracle = DoubleOracle(None, user_options, opponent_options, 1)
+        double_oracle.get_score = lambda u, o: matrix[user_options.index(u)][opponent_options.index(o)]
+        return double_oracle.search()
+
+    def test_value_is_the_same_as_the_full_payoff_matrix(self):
+        for depth in [1, 2]:
+            expected_payoff_matrix = get_payoff_matrices(self.get_searches(), depth, prune=False)[0]
+            payoff_matrix = get_double_oracle_payoff_matrices(self.get_searches(), depth)[0]
+
+            self.assertAlmostEqual(self.get_value(expected_payoff_matrix), self.get_value(payoff_matrix))
+
+    def test_cells_are_scored_the_same_as_the_full_payoff_matrix(self):
+        expected_payoff_matrix = get_payoff_matrices(self.get_searches(), 2, prune=False)[0]
+        payoff_matrix = get_double_oracle_payoff_matrices(self.get_searches(), 2)[0]
+
+        for move_pair, score in payoff_matrix.items():
+            self.assertEqual(expected_payoff_matrix[move_pair], score)
+
+    def test_cells_that_are_not_needed_are_not_searched(self):
+        search_stats = SearchStats()
+        get_double_oracle_payoff_matrices(self.get_searches(), 1, search_stats=search_stats)
+
+        self.assertGreater(search_stats.unsearched_cells, 0)
+
+    def test_restricted_game_grows_to_the_support_of_a_mixed_equilibrium(self):
+        matrix = [
+            [0, -1, 1, 5],
+            [1, 0, -1, 5],
+            [-1, 1, 0, 5],
+            [-5, -5, -5, 0],
+        ]
+        scores = self.get_double_oracle_scores(matrix)
+
+        self.assertEqual({'row0', 'row1', 'row2'}, {u for u, _ in scores})
+        self.assertEqual({'column0', 'column1', 'column2'}, {o for _, o in scores})
+        self.assertAlmostEqual(0, self.get_value(scores))
+
+    def test_value_of_the_restricted_game_is_the_value_of_the_full_game(self):
+        # column1 scores the same against the rows of the restricted game, but row3 scores differently against it
+        matrix = [
+            [-3, 0, -2, -2],
+            [-3, 0, 3, 1],
+            [1, 0, 1, 2],
+            [-2, -3, 2, 0],
+        ]
+        scores = self.get_double_oracle_scores(matrix)
+        expected_value = solve_zero_sum_game(matrix)[2]
+
+        self.assertLess(len(scores), 16)
+        self.assertAlmostEqual(expected_value, find_nash_equilibrium(scores, remove_guaranteed_moves=False)[4])
+        self.assertNotAlmostEqual(expected_value, find_nash_equilibrium(scores)[4])
+
+    def test_restricted_game_is_a_single_cell_at_a_saddle_point(self):
+        matrix = [
+            [10, 20, 30],
+            [5, -5, 0],
+            [0, 40, -10],
+        ]
+        scores = self.get_double_oracle_scores(matrix)
+
+        self.assertEqual({('row0', 'column0'): 10}, scores)
+
+    def test_pruning_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_double_oracle_payoff_matrices(self.get_searches(), 1, prune=True)
+
+
+class TestGetSearchTimeBudget(unittest.TestCase):
+    def setUp(self):
+        self.battle = mock.Mock()
+        self.config_patch = mock.patch.multiple(
+            config,
+            search_time_budget_fraction=0.5,
+            search_time_budget_floor=1,
+            search_time_budget_ceiling=20
+        )
+        self.config_patch.start()
+        self.addCleanup(self.config_patch.stop)
+
+    def test_unknown_time_remaining_uses_the_ceiling(self):
+        self.battle.time_remaining = None
+        self.assertEqual(20, get_search_time_budget(self.battle))
+
+    def test_budget_is_a_fraction_of_the_time_remaining(self):
+        self.battle.time_remaining = 30
+        self.assertEqual(15, get_search_time_budget(self.battle))
+
+    def test_budget_is_capped_at_the_ceiling(self):
+        self.battle.time_remaining = 150
+        self.assertEqual(20, get_search_time_budget(self.battle))
+
+    def test_budget_is_never_below_the_floor(self):
+        self.battle.time_remaining = 1
+        self.assertEqual(1, get_search_time_budget(self.battle))
+
+
+class TestPonder(unittest.TestCase):
+    def setUp(self):
+        self.battle = SafestBattleBot(None)
+        self.battle.user.active = Pokemon('pikachu', 100)
+        self.battle.user.active.moves = [Move('thunderbolt'), Move('nuzzle')]
+        self.battle.opponent.active = Pokemon('raichu', 100)
+        self.battle.opponent.active.moves = [Move('surf'), Move('calmmind'), Move('nuzzle')]
+
+        self.config_patch = mock.patch.multiple(config, search_depth=2, ponder_opponent_options=2)
+        self.config_patch.start()
+        self.addCleanup(self.config_patch.stop)
+
+        self.prepare_battles_patch = mock.patch.object(self.battle, 'prepare_battles', return_value=[self.battle])
+        self.prepare_battles_patch.start()
+        self.addCleanup(self.prepare_battles_patch.stop)
+
+    def test_only_the_opponents_likeliest_options_are_used(self):
+        self.assertEqual(2, len(get_likely_next_states([self.battle], 'thunderbolt')))
+
+    def test_user_move_that_is_not_an_option_has_no_next_states(self):
+        self.assertEqual([], get_likely_next_states([self.battle], 'surf'))
+
+    def test_next_decision_reuses_the_pondered_search(self):
+        states_searched = ponder(self.battle, 'thunderbolt', SearchDeadline(float('inf')))
+        self.assertEqual({1: 2, 2: 2}, states_searched)
+
+        state = get_likely_next_states([self.battle], 'thunderbolt')[0]
+        transposition_table, move_orderer = self.battle.search_carry_over.start_search()
+        get_payoff_matrix(StateMutator(state), *state.get_all_options(), depth=2, transposition_table=transposition_table, move_orderer=move_orderer)
+
+        self.assertEqual(1, transposition_table.hits)
+        self.assertEqual(0, transposition_table.misses)
+
+    def test_bot_that_does_not_prune_does_not_ponder(self):
+        battle = NashBattleBot(None)
+        battle.user.active = self.battle.user.active
+        battle.opponent.active = self.battle.opponent.active
+
+        self.assertEqual(dict(), ponder(battle, 'thunderbolt', SearchDeadline(float('inf'))))
+
+    def test_cancelled_deadline_stops_pondering(self):
+        deadline = SearchDeadline(float('inf'))
+        deadline.cancel()
+
+        self.assertEqual(dict(), ponder(self.battle, 'thunderbolt', deadline))
+
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.root = MCTSNode(*self.state.get_all_options())
+
+    def test_iteration_does_not_modify_the_state(self):
+        state_hash = self.state.hash()
+        for _ in range(50):
+            run_iteration(self.mutator, self.root)
+
+        self.assertEqual(state_hash, self.state.hash())
+
+    def test_every_iteration_visits_the_root(self):
+        for _ in range(50):
+            run_iteration(self.mutator, self.root)
+
+        self.assertEqual(50, self.root.visits)
+        self.assertEqual(50, sum(visits for visits, _ in self.root.user_statistics.values()))
+        self.assertEqual(50, sum(visits for visits, _ in self.root.opponent_statistics.values()))
+
+    def test_iterations_count_their_work_in_the_search_stats(self):
+        search_stats = SearchStats()
+        for _ in range(10):
+            run_iteration(self.mutator, self.root, search_stats)
+
+        self.assertGreater(search_stats.evaluate_calls, 0)
+        self.assertLessEqual(search_stats.evaluate_calls, 10)
+        self.assertGreater(search_stats.instruction_generation_calls, 0)
+
+    def test_every_option_is_tried_before_any_is_repeated(self):
+        for _ in range(len(self.root.user_statistics) * len(self.root.opponent_statistics)):
+            run_iteration(self.mutator, self.root)
+
+        self.assertTrue(all(visits for visits, _ in self.root.user_statistics.values()))
+
+    @mock.patch('showdown.battle_bots.mcts.main.random.random')
+    def test_sample_transition_uses_the_percentages(self, random_mock):
+        transitions = [TransposeInstruction(0.25, []), TransposeInstruction(0.75, [])]
+
+        random_mock.return_value = 0.2
+        self.assertEqual(0, sample_transition(transitions))
+
+        random_mock.return_value = 0.3
+        self.assertEqual(1, sample_transition(transitions))
+
+    def test_iterations_are_shared_between_the_battles_by_their_set_weight(self):
+        battle = MCTSBattleBot(None)
+        battle.user.active = Pokemon('pikachu', 100)
+        battle.user.active.moves = [Move('thunderbolt'), Move('nuzzle')]
+        battle.opponent.active = Pokemon('raichu', 100)
+        battle.opponent.active.moves = [Move('surf'), Move('calmmind')]
+        merged_battle = deepcopy(battle)
+        merged_battle.set_weight = 3
+
+        roots = search_battles([battle, merged_battle], float('inf'), 20)
+
+        self.assertEqual([5, 15], [root.visits for root in roots])
+
+    def test_most_visited_option_is_summed_over_all_battles(self):
+        root_1 = MCTSNode(['a', 'b'], ['c'])
+        root_1.user_statistics = {'a': [10, 5], 'b': [6, 5]}
+        root_2 = MCTSNode(['a', 'b'], ['d'])
+        root_2.user_statistics = {'a': [2, 1], 'b': [8, 5]}
+
+        self.assertEqual('b', pick_most_visited_option([root_1, root_2]))
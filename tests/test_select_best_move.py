@@ -1,10 +1,51 @@
+import math
+import pickle
 import unittest
+from unittest import mock
+from copy import copy
+from copy import deepcopy
 from collections import defaultdict
 
 import constants
+import config
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import get_payoff_matrices_iterative_deepening
+from showdown.engine.select_best_move import SearchDeadline
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.select_best_move import get_payoff_matrices
+from showdown.engine.select_best_move import pick_safest
+from showdown.engine.select_best_move import get_move_pair_score
+from showdown.engine.select_best_move import get_highest_possible_score
+from showdown.engine.select_best_move import ProbabilityCutoff
+from showdown.engine.select_best_move import SearchStats
+from showdown.engine.select_best_move import evaluate_state
+from showdown.engine.select_best_move import get_state_instructions
+from showdown.engine.select_best_move import INSTRUCTION_GENERATION_PHASE
+from showdown.engine.evaluate import evaluate
+from showdown.engine.evaluate import Scoring
+from showdown.engine.evaluate import highest_possible_evaluation
+from showdown.engine.search_cache import LRUCache
+from showdown.engine.search_executor import SearchExecutor
+from showdown.engine.search_executor import get_search_executor
+from showdown.engine.move_ordering import MoveOrderer
+from showdown.engine.search_cache import TranspositionTable
+from showdown.engine.search_cache import SearchCarryOver
+from showdown.engine.search_cache import EvaluationCache
+from showdown.engine.search_cache import TransitionCache
+from showdown.engine.batch_evaluate import batch_evaluate
+from showdown.engine.multi_world_search import get_multi_world_payoff_matrices
+from showdown.engine.multi_world_search import get_move_pairs
+from showdown.engine.multi_world_search import merge_orders
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.find_state_instructions import update_attacking_move
+from showdown.engine.find_state_instructions import lookup_move
+from showdown.engine.effective_move import EffectiveMoveCache
+from showdown.engine.effective_move import EffectiveMove
+from showdown.engine.effective_move import freeze
 from showdown.battle import Pokemon as StatePokemon
 
 
@@ -527,3 +568,805 @@ class TestGetAllOptions(unittest.TestCase):
         options = self.state.get_all_options()
 
         self.assertEqual(expected_options, options)
+
+
+def get_small_search_state():
+    state = State(
+        Side(
+            Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+            {
+                "xatu": Pokemon.from_state_pokemon_dict(StatePokemon("xatu", 81).to_dict()),
+                "starmie": Pokemon.from_state_pokemon_dict(StatePokemon("starmie", 81).to_dict()),
+            },
+            (0, 0),
+            defaultdict(lambda: 0)
+        ),
+        Side(
+            Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+            {
+                "yveltal": Pokemon.from_state_pokemon_dict(StatePokemon("yveltal", 73).to_dict()),
+                "slurpuff": Pokemon.from_state_pokemon_dict(StatePokemon("slurpuff", 73).to_dict()),
+            },
+            (0, 0),
+            defaultdict(lambda: 0)
+        ),
+        None,
+        None,
+        False
+    )
+    state.self.active.moves = [
+        {constants.ID: 'thunderbolt', constants.DISABLED: False},
+        {constants.ID: 'nuzzle', constants.DISABLED: False},
+        {constants.ID: 'nastyplot', constants.DISABLED: False},
+        {constants.ID: 'surf', constants.DISABLED: False},
+    ]
+    state.opponent.active.moves = [
+        {constants.ID: 'moonblast', constants.DISABLED: False},
+        {constants.ID: 'calmmind', constants.DISABLED: False},
+        {constants.ID: 'protect', constants.DISABLED: False},
+        {constants.ID: 'wish', constants.DISABLED: False},
+    ]
+    return state
+
+
+def scores_are_equal(scores_1, scores_2):
+    if scores_1.keys() != scores_2.keys():
+        return False
+    for k in scores_1:
+        if math.isnan(scores_1[k]) and math.isnan(scores_2[k]):
+            continue
+        if scores_1[k] != scores_2[k]:
+            return False
+    return True
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_returns_none_and_counts_a_miss_for_a_missing_key(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(1, cache.misses)
+
+    def test_get_returns_value_and_counts_a_hit(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(1, cache.hits)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(2, len(cache))
+
+    def test_payoff_matrix_searched_with_a_higher_alpha_is_not_reused_for_a_lower_alpha(self):
+        transposition_table = TranspositionTable(2)
+        transposition_table.put_scores('a', 10, 1, {'scores': 1})
+
+        self.assertIsNone(transposition_table.get_scores('a', 5))
+        self.assertEqual({'scores': 1}, transposition_table.get_scores('a', 10))
+        self.assertEqual({'scores': 1}, transposition_table.get_scores('a', 20))
+
+    def test_payoff_matrix_reached_with_a_lower_chance_is_not_reused_for_a_higher_chance(self):
+        transposition_table = TranspositionTable(2)
+        transposition_table.put_scores('a', 10, 0.5, {'scores': 1})
+
+        self.assertIsNone(transposition_table.get_scores('a', 10, 1))
+        self.assertEqual({'scores': 1}, transposition_table.get_scores('a', 10, 0.5))
+        self.assertEqual({'scores': 1}, transposition_table.get_scores('a', 10, 0.1))
+
+    def test_cache_with_no_size_stores_nothing(self):
+        cache = LRUCache(0)
+        cache.put('a', 1)
+        self.assertEqual(0, len(cache))
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_search_with_an_evaluation_cache_gives_the_same_scores(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False)
+        evaluation_cache = EvaluationCache(10000)
+        scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False, evaluation_cache=evaluation_cache)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertGreater(evaluation_cache.hits, 0)
+
+    def test_batch_evaluation_with_an_evaluation_cache_gives_the_same_scores(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False)
+        evaluation_cache = EvaluationCache(10000)
+        with mock.patch.object(config, 'batch_evaluation', True):
+            scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False, evaluation_cache=evaluation_cache)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertGreater(evaluation_cache.hits, 0)
+
+    def test_cached_state_is_not_evaluated_again(self):
+        evaluation_cache = EvaluationCache(10000)
+        search_stats = SearchStats()
+        mutator = StateMutator(self.state)
+        first_score = evaluate_state(mutator, search_stats, evaluation_cache)
+        second_score = evaluate_state(mutator, search_stats, evaluation_cache)
+
+        self.assertEqual(evaluate(self.state), first_score)
+        self.assertEqual(first_score, second_score)
+        self.assertEqual(1, search_stats.evaluate_calls)
+
+
+class TestTransitionCache(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_search_with_a_transition_cache_gives_the_same_scores(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False)
+        transition_cache = TransitionCache(10000)
+        scores = get_payoff_matrix(StateMutator(self.state, transition_cache), self.user_options, self.opponent_options, depth=2, prune=False)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertEqual(list(expected_scores), list(scores))
+        self.assertGreater(transition_cache.hits, 0)
+
+    def test_cached_turn_is_not_generated_again(self):
+        search_stats = SearchStats()
+        mutator = StateMutator(self.state, TransitionCache(10000))
+        first_instructions = get_state_instructions(mutator, 'thunderbolt', 'moonblast', search_stats)
+        second_instructions = get_state_instructions(mutator, 'thunderbolt', 'moonblast', search_stats)
+
+        self.assertEqual(get_all_state_instructions(StateMutator(get_small_search_state()), 'thunderbolt', 'moonblast'), first_instructions)
+        self.assertIs(first_instructions, second_instructions)
+        self.assertEqual(1, search_stats.instruction_generation_calls)
+
+    def test_a_different_state_is_not_found_in_the_cache(self):
+        transition_cache = TransitionCache(10000)
+        mutator = StateMutator(self.state, transition_cache)
+        get_state_instructions(mutator, 'thunderbolt', 'moonblast')
+        mutator.apply([(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)])
+        get_state_instructions(mutator, 'thunderbolt', 'moonblast')
+
+        self.assertEqual(0, transition_cache.hits)
+        self.assertEqual(2, len(transition_cache))
+
+    def test_reserve_order_left_by_generating_the_instructions_is_restored_by_a_hit(self):
+        transition_cache = TransitionCache(10000)
+        get_state_instructions(StateMutator(get_small_search_state(), transition_cache), 'switch xatu', 'moonblast')
+        expected_reserve_order = get_small_search_state()
+        get_all_state_instructions(StateMutator(expected_reserve_order), 'switch xatu', 'moonblast')
+
+        get_state_instructions(StateMutator(self.state, transition_cache), 'switch xatu', 'moonblast')
+
+        self.assertEqual(1, transition_cache.hits)
+        self.assertEqual(expected_reserve_order.get_reserve_order(), self.state.get_reserve_order())
+
+    def test_least_recently_used_turn_is_evicted(self):
+        transition_cache = TransitionCache(1)
+        mutator = StateMutator(self.state, transition_cache)
+        get_state_instructions(mutator, 'thunderbolt', 'moonblast')
+        get_state_instructions(mutator, 'nuzzle', 'moonblast')
+        get_state_instructions(mutator, 'thunderbolt', 'moonblast')
+
+        self.assertEqual(0, transition_cache.hits)
+        self.assertEqual(2, transition_cache.evictions)
+
+
+class TestEffectiveMoveCache(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.effective_move_cache = EffectiveMoveCache(10000, update_attacking_move)
+
+    def get_effective_move(self, move, defending_move):
+        args = (self.state.self.active, self.state.opponent.active, lookup_move(move), lookup_move(defending_move), True, None, None)
+        return self.effective_move_cache.get_effective_move(*args), update_attacking_move(*args)
+
+    def test_move_is_modified_once_for_the_same_pokemon(self):
+        self.state.self.active.ability = 'technician'
+        first_move, expected_move = self.get_effective_move('bulletpunch', 'moonblast')
+        second_move, _ = self.get_effective_move('bulletpunch', 'moonblast')
+
+        self.assertEqual(expected_move, first_move)
+        self.assertIs(first_move, second_move)
+        self.assertEqual(1, self.effective_move_cache.hits)
+
+    def test_move_is_modified_again_when_an_attribute_it_read_changes(self):
+        self.get_effective_move('eruption', 'moonblast')
+        self.state.self.active.hp = int(self.state.self.active.maxhp / 2)
+        move, expected_move = self.get_effective_move('eruption', 'moonblast')
+
+        self.assertEqual(expected_move, move)
+        self.assertEqual(0, self.effective_move_cache.hits)
+
+    def test_move_is_modified_again_when_a_volatile_status_is_added(self):
+        self.get_effective_move('moonblast', 'thunderbolt')
+        self.state.opponent.active.volatile_status.add(constants.PROTECT)
+        move, expected_move = self.get_effective_move('moonblast', 'thunderbolt')
+
+        self.assertEqual(expected_move, move)
+        self.assertFalse(move[constants.ACCURACY])
+
+    def test_move_is_reused_when_an_attribute_it_did_not_read_changes(self):
+        self.get_effective_move('thunderbolt', 'moonblast')
+        self.state.self.active.hp -= 10
+        self.get_effective_move('thunderbolt', 'moonblast')
+
+        self.assertEqual(1, self.effective_move_cache.hits)
+
+    def test_changing_a_move_raises_an_error_and_does_not_affect_later_hits(self):
+        move, expected_move = self.get_effective_move('drainingkiss', 'moonblast')
+        with self.assertRaises(TypeError):
+            move[constants.BASE_POWER] = 0
+        with self.assertRaises(TypeError):
+            move[constants.FLAGS][constants.PROTECT] = 0
+
+        self.assertEqual(expected_move[constants.BASE_POWER], self.get_effective_move('drainingkiss', 'moonblast')[0][constants.BASE_POWER])
+        self.assertEqual(1, self.effective_move_cache.hits)
+
+    def test_copy_of_a_move_can_be_changed(self):
+        move, _ = self.get_effective_move('drainingkiss', 'moonblast')
+        copied_move = copy(move)
+        copied_move[constants.BASE_POWER] = 0
+        deepcopied_move = deepcopy(move)
+        deepcopied_move[constants.FLAGS][constants.PROTECT] = 0
+
+        self.assertNotEqual(0, move[constants.BASE_POWER])
+        self.assertNotEqual(0, move[constants.FLAGS][constants.PROTECT])
+
+    def test_nested_containers_in_a_move_are_frozen(self):
+        move = freeze({constants.SECONDARY: ({constants.BOOSTS: {constants.ATTACK: 1}},), constants.FLAGS: {constants.PROTECT}})
+
+        with self.assertRaises(TypeError):
+            move[constants.SECONDARY][0][constants.BOOSTS][constants.ATTACK] = 2
+        self.assertIsInstance(move[constants.FLAGS], frozenset)
+
+    def test_values_read_from_a_pokemon_do_not_change_with_the_pokemon(self):
+        pkmn = self.state.self.active
+        effective_move = EffectiveMove(('moves',), (), pkmn, self.state.opponent.active, freeze({}), ())
+        pkmn.moves[0][constants.DISABLED] = True
+
+        self.assertNotEqual(effective_move.get_attacking_values(pkmn), effective_move.attacking_values)
+
+    def test_each_mutator_has_its_own_cache(self):
+        mutator = StateMutator(self.state)
+        get_all_state_instructions(mutator, 'thunderbolt', 'moonblast')
+        other_mutator = StateMutator(get_small_search_state())
+        get_all_state_instructions(other_mutator, 'thunderbolt', 'moonblast')
+
+        self.assertIsNot(mutator.effective_move_cache, other_mutator.effective_move_cache)
+        self.assertEqual(mutator.effective_move_cache.misses, other_mutator.effective_move_cache.misses)
+
+
+class TestMultiWorldSearch(unittest.TestCase):
+    def setUp(self):
+        self.states = list()
+        for last_move, item in [('wish', 'leftovers'), ('dazzlinggleam', 'leftovers'), ('wish', 'lifeorb'), ('drainingkiss', 'leftovers')]:
+            state = get_small_search_state()
+            state.opponent.active.moves[3] = {constants.ID: last_move, constants.DISABLED: False}
+            state.opponent.active.item = item
+            self.states.append(state)
+
+    def get_searches(self):
+        return [(deepcopy(state), *state.get_all_options()) for state in self.states]
+
+    def test_payoff_matrices_are_the_same_as_searching_each_state(self):
+        expected_payoff_matrices = get_payoff_matrices(self.get_searches(), 2, prune=False)
+        payoff_matrices = get_multi_world_payoff_matrices(self.get_searches(), 2)
+
+        self.assertEqual(expected_payoff_matrices, payoff_matrices)
+        for expected_payoff_matrix, payoff_matrix in zip(expected_payoff_matrices, payoff_matrices):
+            self.assertEqual(list(expected_payoff_matrix), list(payoff_matrix))
+
+    def test_payoff_matrices_are_the_same_with_a_transposition_table(self):
+        expected_payoff_matrices = get_payoff_matrices(self.get_searches(), 2, prune=False)
+        payoff_matrices = get_multi_world_payoff_matrices(self.get_searches(), 2, transposition_table=TranspositionTable(10000))
+
+        self.assertEqual(expected_payoff_matrices, payoff_matrices)
+
+    def test_instructions_are_shared_between_worlds(self):
+        search_stats = SearchStats()
+        expected_search_stats = SearchStats()
+        get_payoff_matrices(self.get_searches(), 1, prune=False, search_stats=expected_search_stats)
+        get_multi_world_payoff_matrices(self.get_searches(), 1, search_stats=search_stats)
+
+        self.assertGreater(search_stats.shared_instruction_generations, 0)
+        self.assertEqual(
+            expected_search_stats.instruction_generation_calls,
+            search_stats.instruction_generation_calls + search_stats.shared_instruction_generations
+        )
+
+    def test_states_that_are_different_elsewhere_are_searched_separately(self):
+        self.states[1].self.active.hp -= 10
+        search_stats = SearchStats()
+        expected_payoff_matrices = get_payoff_matrices(self.get_searches(), 1, prune=False)
+        payoff_matrices = get_multi_world_payoff_matrices(self.get_searches(), 1, search_stats=search_stats)
+
+        self.assertEqual(expected_payoff_matrices, payoff_matrices)
+        self.assertGreater(search_stats.shared_instruction_generations, 0)
+
+    def test_payoff_matrices_are_the_same_with_a_transition_cache(self):
+        expected_payoff_matrices = get_payoff_matrices(self.get_searches(), 2, prune=False)
+        transition_cache = TransitionCache(10000)
+        payoff_matrices = get_multi_world_payoff_matrices(self.get_searches(), 2, transition_cache=transition_cache)
+
+        self.assertEqual(expected_payoff_matrices, payoff_matrices)
+        self.assertGreater(transition_cache.hits, 0)
+
+    def test_pruning_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_multi_world_payoff_matrices(self.get_searches(), 1, prune=True)
+
+    def test_merge_orders_keeps_the_order_of_each_sequence(self):
+        self.assertEqual(['a', 'b', 'd', 'c', 'e'], merge_orders([['a', 'b', 'c'], ['a', 'd', 'c', 'e']]))
+
+    def test_merge_orders_returns_none_when_the_orders_conflict(self):
+        self.assertIsNone(merge_orders([['a', 'b'], ['b', 'a']]))
+
+    def test_move_pairs_are_in_the_order_of_each_world(self):
+        options = [(['u1', 'u2'], ['a', 'c']), (['u1', 'u2'], ['b', 'c'])]
+        expected_move_pairs = [
+            ('u1', 'a'), ('u1', 'b'), ('u1', 'c'),
+            ('u2', 'a'), ('u2', 'b'), ('u2', 'c'),
+        ]
+        self.assertEqual(expected_move_pairs, get_move_pairs(options))
+
+
+class TestSearchCarryOver(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.user_options, self.opponent_options = self.state.get_all_options()
+        self.carry_over = SearchCarryOver(10000, True)
+
+    def test_copies_of_a_battle_share_the_carry_over(self):
+        self.assertIs(self.carry_over, deepcopy(self.carry_over))
+
+    def test_state_reached_after_a_turn_reuses_the_previous_search(self):
+        transposition_table, move_orderer = self.carry_over.start_search()
+        get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, prune=False, transposition_table=transposition_table, move_orderer=move_orderer)
+
+        # play out the first outcome of a turn and build the next decision's state from scratch
+        state_instructions = get_all_state_instructions(self.mutator, self.user_options[0], self.opponent_options[0])
+        self.mutator.apply(state_instructions[0].instructions)
+        next_state = deepcopy(self.state)
+        next_user_options, next_opponent_options = next_state.get_all_options()
+
+        transposition_table, move_orderer = self.carry_over.start_search()
+        scores = get_payoff_matrix(StateMutator(next_state), next_user_options, next_opponent_options, depth=1, prune=False, transposition_table=transposition_table, move_orderer=move_orderer)
+        expected_scores = get_payoff_matrix(StateMutator(deepcopy(next_state)), next_user_options, next_opponent_options, depth=1, prune=False)
+
+        self.assertEqual(1, transposition_table.hits)
+        self.assertEqual(0, transposition_table.misses)
+        self.assertTrue(scores_are_equal(expected_scores, scores))
+
+    def test_starting_a_search_ages_the_history(self):
+        _, move_orderer = self.carry_over.start_search()
+        move_orderer.record_best_row('surf', 1)
+        move_orderer.record_cutoff('wish', 1, 0)
+
+        self.carry_over.start_search()
+
+        self.assertEqual(2, move_orderer.history[(constants.SELF, 'surf')])
+        self.assertEqual(['wish'], move_orderer.killers[1])
+        self.assertEqual(0, move_orderer.cutoffs)
+
+
+class TestBatchEvaluate(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_empty_batch_has_no_scores(self):
+        self.assertEqual([], batch_evaluate([]))
+
+    def test_scores_match_evaluate(self):
+        states = list()
+        for hp in [0, 1, 77, 150]:
+            state = deepcopy(self.state)
+            state.self.active.hp = hp
+            state.self.active.speed_boost = -3
+            state.self.active.status = constants.BURN
+            state.self.active.volatile_status = {constants.SUBSTITUTE, constants.LEECH_SEED, constants.ROOST}
+            state.opponent.active.special_attack_boost = 5
+            state.opponent.active.status = constants.TOXIC
+            state.opponent.side_conditions[constants.SPIKES] = 2
+            state.self.side_conditions[constants.REFLECT] = 1
+            states.append(state)
+
+        self.assertEqual([evaluate(s) for s in states], batch_evaluate(states))
+
+    def test_scores_match_evaluate_with_a_different_static_score_for_an_alive_pokemon(self):
+        self.state.self.active.hp = 1
+        with mock.patch.object(Scoring, 'POKEMON_ALIVE_STATIC', 30):
+            self.assertEqual([evaluate(self.state)], batch_evaluate([self.state]))
+
+    def test_unpruned_search_is_the_same_with_batch_evaluation(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False)
+        with mock.patch.object(config, 'batch_evaluation', True):
+            scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, prune=False)
+
+        self.assertEqual(expected_scores, scores)
+
+
+class TestGetPayoffMatrix(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_transposition_table_does_not_change_the_result(self):
+        expected_scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2)
+        transposition_table = TranspositionTable(10000)
+        scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, transposition_table=transposition_table)
+
+        self.assertTrue(scores_are_equal(expected_scores, scores))
+
+    def test_transposition_table_is_hit_for_repeated_states(self):
+        transposition_table = TranspositionTable(10000)
+        get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, transposition_table=transposition_table)
+
+        self.assertGreater(transposition_table.hits, 0)
+
+    def test_repeated_search_is_answered_from_the_transposition_table(self):
+        transposition_table = TranspositionTable(10000)
+        first_scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, transposition_table=transposition_table)
+        misses = transposition_table.misses
+        second_scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, transposition_table=transposition_table)
+
+        self.assertEqual(misses, transposition_table.misses)
+        self.assertTrue(scores_are_equal(first_scores, second_scores))
+
+    def test_combining_the_outcomes_that_reach_the_same_state_does_not_change_the_result(self):
+        # melmetal moves after scizor, so a flinch from doubleironbash is removed at the end of the turn and reaches the
+        # same state as no flinch
+        state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("melmetal", 80).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("scizor", 80).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            None,
+            None,
+            False
+        )
+        state.self.active.moves = [
+            {constants.ID: 'doubleironbash', constants.DISABLED: False},
+            {constants.ID: 'thunderpunch', constants.DISABLED: False},
+        ]
+        state.opponent.active.moves = [
+            {constants.ID: 'bulletpunch', constants.DISABLED: False},
+            {constants.ID: 'swordsdance', constants.DISABLED: False},
+        ]
+        user_options, opponent_options = state.get_all_options()
+
+        search_stats = SearchStats()
+        with mock.patch.object(config, 'combine_same_states', True):
+            scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=3, prune=False, search_stats=search_stats)
+        expected_search_stats = SearchStats()
+        with mock.patch.object(config, 'combine_same_states', False):
+            expected_scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=3, prune=False, search_stats=expected_search_stats)
+
+        self.assertLess(search_stats.outcomes_generated, expected_search_stats.outcomes_generated)
+        self.assertEqual(expected_scores.keys(), scores.keys())
+        for move_pair, score in scores.items():
+            self.assertAlmostEqual(expected_scores[move_pair], score, msg=move_pair)
+
+    def test_search_does_not_modify_the_state(self):
+        state_hash = self.state.hash()
+        get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, transposition_table=TranspositionTable(10000))
+
+        self.assertEqual(state_hash, self.state.hash())
+        self.assertEqual(state_hash, self.mutator.state_hash)
+
+
+class TestChancePruning(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+
+    def test_highest_possible_evaluation_is_higher_than_a_very_good_state(self):
+        for pkmn in [self.state.self.active] + list(self.state.self.reserve.values()):
+            pkmn.attack_boost = 6
+            pkmn.special_attack_boost = 6
+            pkmn.speed_boost = 6
+            pkmn.volatile_status.add(constants.SUBSTITUTE)
+        for pkmn in [self.state.opponent.active] + list(self.state.opponent.reserve.values()):
+            pkmn.hp = 0
+        self.state.opponent.side_conditions[constants.SPIKES] = 3
+        self.state.opponent.side_conditions[constants.STEALTH_ROCK] = 1
+
+        self.assertLess(evaluate(self.state), highest_possible_evaluation())
+
+    def test_cell_that_cannot_beat_best_score_returns_an_upper_bound(self):
+        # thunderbolt has a chance to paralyze so there is more than one outcome
+        score = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 0)
+        upper_bound = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 0, best_score=get_highest_possible_score(0))
+
+        self.assertGreater(upper_bound, score)
+        self.assertLess(upper_bound, get_highest_possible_score(0))
+
+    def test_cell_that_can_beat_best_score_is_fully_searched(self):
+        score = get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 0)
+        self.assertEqual(score, get_move_pair_score(self.mutator, 'thunderbolt', 'moonblast', 0, best_score=score - 1))
+
+    def test_search_with_an_alpha_below_the_safest_score_is_exact(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2))[1]
+        score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, alpha=expected_score - 1))[1]
+
+        self.assertEqual(expected_score, score)
+
+    def test_search_with_an_alpha_above_the_safest_score_stays_below_alpha(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2))[1]
+        score = pick_safest(get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, alpha=expected_score + 1))[1]
+
+        self.assertLess(score, expected_score + 1)
+
+
+class TestProbabilityCutoff(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_branch_below_epsilon_is_cut_and_counted(self):
+        probability_cutoff = ProbabilityCutoff(0.1)
+
+        self.assertTrue(probability_cutoff.cuts(0.05))
+        self.assertFalse(probability_cutoff.cuts(0.5))
+        self.assertEqual(1, probability_cutoff.approximated_branches)
+        self.assertEqual(1, probability_cutoff.searched_branches)
+        self.assertEqual(0.05, probability_cutoff.approximated_probability)
+
+    def test_search_with_a_cutoff_approximates_unlikely_outcomes(self):
+        probability_cutoff = ProbabilityCutoff(0.5)
+        get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, probability_cutoff=probability_cutoff)
+
+        self.assertGreater(probability_cutoff.approximated_branches, 0)
+        self.assertGreater(probability_cutoff.approximated_probability, 0)
+
+    def test_search_with_a_cutoff_of_zero_is_exact(self):
+        expected_scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2)
+        probability_cutoff = ProbabilityCutoff(0)
+        scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, probability_cutoff=probability_cutoff)
+
+        self.assertTrue(scores_are_equal(expected_scores, scores))
+        self.assertEqual(0, probability_cutoff.approximated_branches)
+
+
+class TestSearchStats(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.user_options, self.opponent_options = self.state.get_all_options()
+
+    def test_search_counts_its_work(self):
+        search_stats = SearchStats()
+        get_payoff_matrices([(self.state, self.user_options, self.opponent_options)], 2, prune=False, search_stats=search_stats)
+
+        self.assertEqual(1, search_stats.nodes_per_depth[2])
+        self.assertGreater(search_stats.nodes_per_depth[1], 0)
+        self.assertGreater(search_stats.instruction_generation_calls, len(self.user_options) * len(self.opponent_options))
+        self.assertGreaterEqual(search_stats.outcomes_generated, search_stats.instruction_generation_calls)
+        self.assertGreater(search_stats.evaluate_calls, 0)
+        self.assertGreater(search_stats.phase_times[INSTRUCTION_GENERATION_PHASE], 0)
+
+    def test_every_applied_instruction_is_reversed(self):
+        search_stats = SearchStats()
+        get_payoff_matrices([(self.state, self.user_options, self.opponent_options)], 2, search_stats=search_stats)
+
+        self.assertGreater(search_stats.applied_instructions, 0)
+        self.assertEqual(search_stats.applied_instructions, search_stats.reversed_instructions)
+
+    def test_search_without_stats_matches_search_with_stats(self):
+        expected_scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2)
+        scores = get_payoff_matrix(self.mutator, self.user_options, self.opponent_options, depth=2, search_stats=SearchStats())
+
+        self.assertTrue(scores_are_equal(expected_scores, scores))
+
+    def test_merge_adds_the_counts_together(self):
+        search_stats = SearchStats()
+        search_stats.nodes_per_depth[1] = 2
+        search_stats.evaluate_calls = 3
+        other_search_stats = SearchStats()
+        other_search_stats.nodes_per_depth[1] = 1
+        other_search_stats.nodes_per_depth[0] = 4
+        other_search_stats.evaluate_calls = 5
+        other_search_stats.phase_times[INSTRUCTION_GENERATION_PHASE] = 0.5
+
+        search_stats.merge(other_search_stats)
+
+        self.assertEqual({1: 3, 0: 4}, dict(search_stats.nodes_per_depth))
+        self.assertEqual(8, search_stats.evaluate_calls)
+        self.assertEqual(0.5, search_stats.phase_times[INSTRUCTION_GENERATION_PHASE])
+
+
+class TestMoveOrderer(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.mutator = StateMutator(self.state)
+        self.move_orderer = MoveOrderer()
+
+    def test_killer_move_is_ordered_first(self):
+        self.move_orderer.record_cutoff('wish', 1, 2)
+        ordered_options = self.move_orderer.order_opponent_options(self.mutator, ['moonblast', 'calmmind', 'wish'], 1)
+
+        self.assertEqual('wish', ordered_options[0])
+
+    def test_killer_move_is_only_used_at_its_own_depth(self):
+        self.move_orderer.killers[1] = ['wish']
+        ordered_options = self.move_orderer.order_opponent_options(self.mutator, ['moonblast', 'calmmind', 'wish'], 0)
+
+        self.assertEqual(['moonblast', 'calmmind', 'wish'], ordered_options)
+
+    def test_only_the_most_recent_killer_moves_are_kept(self):
+        self.move_orderer.record_cutoff('moonblast', 1, 0)
+        self.move_orderer.record_cutoff('calmmind', 1, 0)
+        self.move_orderer.record_cutoff('wish', 1, 0)
+
+        self.assertEqual(['wish', 'calmmind'], self.move_orderer.killers[1])
+
+    def test_best_row_from_history_is_ordered_first(self):
+        self.move_orderer.record_best_row('surf', 0)
+        ordered_options = self.move_orderer.order_user_options(self.mutator, ['thunderbolt', 'nuzzle', 'surf'], 0)
+
+        self.assertEqual('surf', ordered_options[0])
+
+    def test_damaging_moves_are_ordered_before_status_moves(self):
+        ordered_options = self.move_orderer.order_user_options(self.mutator, ['nastyplot', 'switch xatu', 'thunderbolt'], 1)
+
+        self.assertEqual('thunderbolt', ordered_options[0])
+
+    def test_first_column_cutoff_rate(self):
+        self.move_orderer.record_cutoff('moonblast', 1, 0)
+        self.move_orderer.record_cutoff('moonblast', 1, 0)
+        self.move_orderer.record_cutoff('wish', 1, 2)
+
+        self.assertEqual(2 / 3, self.move_orderer.first_column_cutoff_rate())
+
+    def test_ordered_search_picks_the_same_move_and_keeps_the_order_of_the_options(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2)
+        scores = get_payoff_matrix(self.mutator, user_options, opponent_options, depth=2, move_orderer=self.move_orderer)
+
+        self.assertEqual(list(expected_scores.keys()), list(scores.keys()))
+        self.assertEqual(pick_safest(expected_scores), pick_safest(scores))
+        self.assertGreater(self.move_orderer.cutoffs, 0)
+
+    def test_ordered_search_gives_the_same_value_as_the_unordered_search_at_a_depth_of_three(self):
+        state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gengar", 80).to_dict()),
+                {"pikachu": Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 80).to_dict())},
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("scizor", 80).to_dict()),
+                {},
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            None,
+            None,
+            False
+        )
+        state.self.active.moves = [
+            {constants.ID: 'willowisp', constants.DISABLED: False},
+            {constants.ID: 'shadowball', constants.DISABLED: False},
+            {constants.ID: 'sludgebomb', constants.DISABLED: False},
+        ]
+        state.opponent.active.moves = [
+            {constants.ID: 'knockoff', constants.DISABLED: False},
+            {constants.ID: 'bulletpunch', constants.DISABLED: False},
+            {constants.ID: 'swordsdance', constants.DISABLED: False},
+        ]
+        user_options, opponent_options = state.get_all_options()
+
+        expected_scores = get_payoff_matrix(StateMutator(deepcopy(state)), user_options, opponent_options, depth=3)
+        scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=3, move_orderer=self.move_orderer)
+
+        self.assertEqual(pick_safest(expected_scores)[1], pick_safest(scores)[1])
+        self.assertGreater(self.move_orderer.cutoffs, 0)
+
+
+class TestIterativeDeepening(unittest.TestCase):
+    def setUp(self):
+        self.state = get_small_search_state()
+        self.user_options, self.opponent_options = self.state.get_all_options()
+        self.searches = [(self.state, self.user_options, self.opponent_options)]
+
+    def test_search_with_a_large_time_budget_reaches_the_maximum_depth(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2)
+        payoff_matrices, depth = get_payoff_matrices_iterative_deepening(self.searches, 1000, 2)
+
+        self.assertEqual(2, depth)
+        self.assertTrue(scores_are_equal(expected_scores, payoff_matrices[0]))
+
+    def test_search_with_no_time_budget_completes_the_first_depth(self):
+        expected_scores = get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=1)
+        payoff_matrices, depth = get_payoff_matrices_iterative_deepening(self.searches, 0, 2)
+
+        self.assertEqual(1, depth)
+        self.assertTrue(scores_are_equal(expected_scores, payoff_matrices[0]))
+
+    def test_expired_deadline_raises_search_timeout(self):
+        with self.assertRaises(SearchTimeout):
+            get_payoff_matrix(StateMutator(self.state), self.user_options, self.opponent_options, depth=2, deadline=SearchDeadline(0))
+
+
+class TestSearchExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = SearchExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+
+        self.searches = list()
+        for item in ['leftovers', 'choicespecs']:
+            state = get_small_search_state()
+            state.opponent.active.item = item
+            user_options, opponent_options = state.get_all_options()
+            self.searches.append((state, user_options, opponent_options))
+
+    def test_state_can_be_pickled_and_keeps_its_side_conditions(self):
+        state = self.searches[0][0]
+        state.self.side_conditions[constants.STEALTH_ROCK] = 1
+
+        unpickled_state = pickle.loads(pickle.dumps(state))
+
+        self.assertEqual(state.hash(), unpickled_state.hash())
+        self.assertEqual(0, unpickled_state.self.side_conditions[constants.SPIKES])
+
+    def test_parallel_searches_match_searching_in_process(self):
+        expected_payoff_matrices = get_payoff_matrices(self.searches, 1)
+        payoff_matrices = self.executor.get_payoff_matrices(self.searches, 1)
+
+        self.assertEqual(len(expected_payoff_matrices), len(payoff_matrices))
+        for expected_scores, scores in zip(expected_payoff_matrices, payoff_matrices):
+            self.assertTrue(scores_are_equal(expected_scores, scores))
+
+    def test_expired_deadline_in_a_worker_raises_search_timeout(self):
+        with self.assertRaises(SearchTimeout):
+            self.executor.get_payoff_matrices(self.searches, 1, deadline=SearchDeadline(0))
+
+    def test_split_at_root_matches_the_unpruned_search(self):
+        state, user_options, opponent_options = self.searches[0]
+        expected_scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=2, prune=False)
+        scores = self.executor.get_payoff_matrix_split_at_root(state, user_options, opponent_options, 2, prune=False)
+
+        self.assertTrue(scores_are_equal(expected_scores, scores))
+
+    def test_worker_search_stats_are_added_to_the_callers(self):
+        search_stats = SearchStats()
+        self.executor.get_payoff_matrices(self.searches, 1, search_stats=search_stats)
+
+        self.assertEqual(2, search_stats.nodes_per_depth[1])
+        self.assertGreater(search_stats.evaluate_calls, 0)
+
+    def test_split_at_root_picks_the_same_move_as_the_pruned_search(self):
+        state, user_options, opponent_options = self.searches[0]
+        expected_scores = get_payoff_matrix(StateMutator(state), user_options, opponent_options, depth=2, prune=True)
+        scores = self.executor.get_payoff_matrix_split_at_root(state, user_options, opponent_options, 2, prune=True)
+
+        self.assertEqual(expected_scores.keys(), scores.keys())
+        self.assertEqual(pick_safest(expected_scores), pick_safest(scores))
+
+    def test_shared_executor_is_shut_down_when_the_bot_exits(self):
+        with mock.patch.object(config, 'search_processes', 2):
+            with mock.patch('showdown.engine.search_executor._search_executor', None):
+                with mock.patch('showdown.engine.search_executor.atexit.register') as register:
+                    executor = get_search_executor()
+                    get_search_executor()
+
+        register.assert_called_once_with(executor.shutdown)
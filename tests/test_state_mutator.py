@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 
 from collections import defaultdict
+from copy import deepcopy
 import constants
 
 from showdown.battle import Pokemon as StatePokemon
@@ -8,6 +10,7 @@ from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
 from showdown.engine.objects import StateMutator
+from showdown.engine.evaluate import evaluate
 
 
 class TestStatemutator(unittest.TestCase):
@@ -860,3 +863,202 @@ class TestStatemutator(unittest.TestCase):
         self.assertEqual(3, self.state.self.active.special_attack)
         self.assertEqual(4, self.state.self.active.special_defense)
         self.assertEqual(5, self.state.self.active.speed)
+
+
+class TestStateHash(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                    "squirtle": Pokemon.from_state_pokemon_dict(StatePokemon("squirtle", 100).to_dict()),
+                    "bulbasaur": Pokemon.from_state_pokemon_dict(StatePokemon("bulbasaur", 100).to_dict()),
+                    "pidgey": Pokemon.from_state_pokemon_dict(StatePokemon("pidgey", 100).to_dict())
+                },
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                    "squirtle": Pokemon.from_state_pokemon_dict(StatePokemon("squirtle", 100).to_dict()),
+                    "bulbasaur": Pokemon.from_state_pokemon_dict(StatePokemon("bulbasaur", 100).to_dict()),
+                    "pidgey": Pokemon.from_state_pokemon_dict(StatePokemon("pidgey", 100).to_dict())
+                },
+                (0, 0),
+                defaultdict(lambda: 0)
+            ),
+            None,
+            None,
+            False
+        )
+        self.state.self.active.moves = [
+            {constants.ID: 'thunderbolt', constants.DISABLED: False},
+            {constants.ID: 'tackle', constants.DISABLED: False},
+        ]
+        self.mutator = StateMutator(self.state)
+
+        self.all_instructions = [
+            (constants.MUTATOR_DAMAGE, constants.SELF, 10),
+            (constants.MUTATOR_HEAL, constants.OPPONENT, 5),
+            (constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 2),
+            (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+            (constants.MUTATOR_APPLY_STATUS, constants.SELF, constants.BURN),
+            (constants.MUTATOR_REMOVE_STATUS, constants.SELF, constants.BURN),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.OPPONENT, constants.CONFUSION),
+            (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.OPPONENT, constants.CONFUSION),
+            (constants.MUTATOR_SIDE_START, constants.SELF, constants.SPIKES, 1),
+            (constants.MUTATOR_SIDE_END, constants.SELF, constants.SPIKES, 1),
+            (constants.MUTATOR_WISH_START, constants.SELF, 50, 0),
+            (constants.MUTATOR_WISH_DECREMENT, constants.SELF),
+            (constants.MUTATOR_DISABLE_MOVE, constants.SELF, 'tackle'),
+            (constants.MUTATOR_ENABLE_MOVE, constants.SELF, 'tackle'),
+            (constants.MUTATOR_WEATHER_START, constants.RAIN, None),
+            (constants.MUTATOR_FIELD_START, constants.ELECTRIC_TERRAIN, None),
+            (constants.MUTATOR_FIELD_END, constants.ELECTRIC_TERRAIN),
+            (constants.MUTATOR_TOGGLE_TRICKROOM,),
+            (constants.MUTATOR_CHANGE_TYPE, constants.SELF, ['water'], ['electric']),
+            (constants.MUTATOR_CHANGE_ITEM, constants.OPPONENT, 'leftovers', 'unknown_item'),
+            (constants.MUTATOR_CHANGE_STATS, constants.SELF, (1, 2, 3, 4, 5, 6), self.state.self.active.stats_tuple()),
+            (constants.MUTATOR_SWITCH, constants.SELF, 'pikachu', 'rattata'),
+            (constants.MUTATOR_DAMAGE, constants.SELF, 15),
+        ]
+
+    def test_hash_is_the_same_for_identical_states(self):
+        self.assertEqual(self.state.hash(), deepcopy(self.state).hash())
+
+    def test_hash_changes_when_the_state_changes(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply_one((constants.MUTATOR_DAMAGE, constants.SELF, 1))
+
+        self.assertNotEqual(original_hash, self.mutator.state_hash)
+
+    def test_incremental_hash_matches_full_hash_after_each_instruction(self):
+        self.mutator.state_hash
+        for instruction in self.all_instructions:
+            self.mutator.apply_one(instruction)
+            self.assertEqual(self.state.hash(), self.mutator.state_hash, instruction)
+
+    def test_reversing_instructions_restores_the_original_hash(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply(self.all_instructions)
+        self.mutator.reverse(self.all_instructions)
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+        self.assertEqual(original_hash, self.state.hash())
+
+    def test_different_orders_of_the_same_instructions_give_the_same_hash(self):
+        instructions = [
+            (constants.MUTATOR_DAMAGE, constants.SELF, 10),
+            (constants.MUTATOR_BOOST, constants.OPPONENT, constants.ATTACK, 1),
+            (constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1),
+        ]
+        self.mutator.apply(instructions)
+        first_hash = self.mutator.state_hash
+        self.mutator.reverse(instructions)
+
+        self.mutator.apply(list(reversed(instructions)))
+
+        self.assertEqual(first_hash, self.mutator.state_hash)
+
+    def test_a_side_condition_returning_to_zero_restores_the_hash(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply_one((constants.MUTATOR_SIDE_START, constants.SELF, constants.SPIKES, 1))
+        self.mutator.apply_one((constants.MUTATOR_SIDE_END, constants.SELF, constants.SPIKES, 1))
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_states_with_a_boost_of_minus_one_and_minus_two_have_different_hashes(self):
+        self.state.self.active.attack_boost = -1
+        other_state = deepcopy(self.state)
+        other_state.self.active.attack_boost = -2
+
+        self.assertNotEqual(self.state.hash(), other_state.hash())
+
+    def test_boosting_and_reversing_the_boost_restores_the_hash(self):
+        self.state.self.active.special_attack_boost = -1
+        original_hash = self.mutator.state_hash
+        instruction = (constants.MUTATOR_UNBOOST, constants.SELF, constants.SPECIAL_ATTACK, 1)
+        self.mutator.apply_one(instruction)
+        unboosted_hash = self.mutator.state_hash
+        self.mutator.reverse([instruction])
+
+        self.assertNotEqual(original_hash, unboosted_hash)
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_applying_a_volatile_status_that_already_exists_does_not_change_the_hash(self):
+        self.state.self.active.volatile_status.add(constants.CONFUSION)
+        original_hash = self.mutator.state_hash
+        self.mutator.apply_one((constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, constants.CONFUSION))
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_incremental_evaluation_matches_evaluate_after_each_instruction(self):
+        self.mutator.evaluation
+        for instruction in self.all_instructions:
+            self.mutator.apply_one(instruction)
+            self.assertEqual(evaluate(self.state), self.mutator.evaluation, instruction)
+
+    def test_incremental_evaluation_matches_evaluate_when_a_side_condition_is_scored_for_each_reserve(self):
+        self.mutator.apply_one((constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1))
+        self.mutator.evaluation
+        self.mutator.apply_one((constants.MUTATOR_DAMAGE, constants.SELF, self.state.self.active.hp))
+        self.mutator.apply_one((constants.MUTATOR_SWITCH, constants.SELF, 'pikachu', 'rattata'))
+
+        self.assertEqual(evaluate(self.state), self.mutator.evaluation)
+
+    def test_reversing_instructions_restores_the_original_evaluation(self):
+        original_evaluation = self.mutator.evaluation
+        self.mutator.apply(self.all_instructions)
+        self.mutator.evaluation
+        self.mutator.reverse(self.all_instructions)
+
+        self.assertEqual(original_evaluation, self.mutator.evaluation)
+
+    def test_checking_the_evaluation_finds_a_change_made_outside_of_the_mutator(self):
+        self.mutator.evaluation
+        self.state.self.reserve['rattata'].hp -= 10
+
+        with mock.patch.object(StateMutator, 'check_evaluation', True):
+            with self.assertRaises(AssertionError):
+                self.mutator.apply_one((constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 1))
+
+    def test_cursor_only_applies_the_instructions_after_the_ones_it_is_at(self):
+        first_instruction = (constants.MUTATOR_DAMAGE, constants.SELF, 10)
+        second_instruction = (constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 1)
+        self.mutator.cursor.move_to([first_instruction])
+        self.mutator.cursor.move_to([first_instruction, second_instruction])
+
+        self.assertEqual(2, self.mutator.apply_count)
+        self.assertEqual(0, self.mutator.reverse_count)
+        self.assertEqual(1, self.state.self.active.attack_boost)
+
+    def test_cursor_only_reverses_the_instructions_after_the_first_difference(self):
+        first_instruction = (constants.MUTATOR_DAMAGE, constants.SELF, 10)
+        self.mutator.cursor.move_to([first_instruction, (constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 1)])
+        self.mutator.cursor.move_to([first_instruction, (constants.MUTATOR_BOOST, constants.SELF, constants.DEFENSE, 1)])
+
+        self.assertEqual(3, self.mutator.apply_count)
+        self.assertEqual(1, self.mutator.reverse_count)
+        self.assertEqual(0, self.state.self.active.attack_boost)
+        self.assertEqual(1, self.state.self.active.defense_boost)
+
+    def test_releasing_the_cursor_returns_the_state_to_where_it_started(self):
+        original_state = deepcopy(self.state)
+        self.mutator.cursor.move_to([(constants.MUTATOR_DAMAGE, constants.SELF, 10)])
+        self.mutator.cursor.apply_one((constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 1))
+        self.mutator.cursor.release()
+
+        self.assertEqual(original_state.hash(), self.state.hash())
+        self.assertEqual([], self.mutator.cursor.instructions)
+
+    def test_releasing_a_held_cursor_leaves_the_state_where_it_is(self):
+        self.mutator.cursor.held = True
+        self.mutator.cursor.move_to([(constants.MUTATOR_DAMAGE, constants.SELF, 10)])
+        self.mutator.cursor.release()
+
+        self.assertEqual(self.state.self.active.maxhp - 10, self.state.self.active.hp)